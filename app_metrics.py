@@ -0,0 +1,384 @@
+"""
+Process Metrics Module
+
+This module keeps process-level metrics (counters, gauges and histograms) shared by all
+sessions of the app, and renders them in the Prometheus text exposition format. Unlike
+the per-session sales metrics they survive page reloads and add up across sessions, so
+replicas can be scraped and compared.
+
+The metrics can be served over HTTP on a local port (GET /metrics) from a background
+thread, or written to a file for node_exporter's textfile collector. Values that other
+objects already track (cache statistics, for example) are read when the metrics are
+rendered, through collectors, instead of being copied on every change.
+"""
+
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Content type of the Prometheus text format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default histogram buckets (upper bounds, in seconds)
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# Sessions seen within this many seconds count as active
+ACTIVE_SESSION_WINDOW = 300
+
+METRIC_NAME_PATTERN = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+LABEL_NAME_PATTERN = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+
+def format_value(value):
+    """A sample value as Prometheus writes it."""
+    if value is None:
+        return "NaN"
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def escape_label_value(value):
+    """A label value with backslashes, quotes and newlines escaped."""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def escape_help(text):
+    """A HELP text with backslashes and newlines escaped."""
+    return str(text).replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def format_labels(labels):
+    """The {name="value",...} part of a sample, or "" without labels."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+class Metric:
+    """A named metric with a fixed set of label names; one value (or series) per label set."""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        if not METRIC_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid metric name: {name!r}")
+        for label in labelnames:
+            if not LABEL_NAME_PATTERN.match(label) or label.startswith("__"):
+                raise ValueError(f"Invalid label name: {label!r}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        # Metrics without labels are exported from the start, at zero
+        if not self.labelnames:
+            self._values[()] = self._new_series()
+
+    def _new_series(self):
+        return 0.0
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {list(self.labelnames)}, got {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        return tuple(zip(self.labelnames, key)) + tuple(extra)
+
+    def samples(self):
+        """(name, labels, value) for every series, labels as (name, value) pairs."""
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+
+class Counter(Metric):
+    """A value that only goes up (requests, created leads, ...)."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down, or is read from a function when rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """Read the (unlabelled) value from function() whenever the metrics are rendered."""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            return [(self.name, (), self._function())]
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=None):
+        if "le" in labelnames:
+            raise ValueError("Histograms cannot have an 'le' label")
+        self.buckets = sorted(float(bound) for bound in (buckets or DEFAULT_BUCKETS))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = self._new_series()
+            index = 0
+            while index < len(self.buckets) and value > self.buckets[index]:
+                index += 1
+            series["counts"][index] += 1
+            series["sum"] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + [math.inf], series["counts"]):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", self._labels(key, [("le", format_value(bound))]), cumulative))
+                samples.append((f"{self.name}_sum", self._labels(key), series["sum"]))
+                samples.append((f"{self.name}_count", self._labels(key), cumulative))
+        return samples
+
+
+class ActivityTracker:
+    """Keys (session ids) seen recently; a key is active for `window` seconds after it was seen."""
+
+    def __init__(self, window=ACTIVE_SESSION_WINDOW):
+        self.window = window
+        self._last_seen = {}
+        self._lock = threading.Lock()
+
+    def touch(self, key):
+        """Mark a key as seen now; returns True the first time the key is seen."""
+        with self._lock:
+            new = key not in self._last_seen
+            self._last_seen[key] = time.monotonic()
+            return new
+
+    def active(self):
+        """Number of keys seen within the window, dropping the ones that expired."""
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            for key in [key for key, seen in self._last_seen.items() if seen < cutoff]:
+                del self._last_seen[key]
+            return len(self._last_seen)
+
+
+class MetricsRegistry:
+    """Metrics of one process, rendered in the Prometheus text format.
+
+    Metrics are created through counter(), gauge() and histogram() and looked up with
+    registry[name]; creating a metric that already exists returns it, so metric
+    definitions can run again on every rerun. Names get the registry's namespace as a
+    prefix when rendered.
+    """
+
+    def __init__(self, namespace=""):
+        self.namespace = namespace
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._write_lock = threading.Lock()
+        self._last_write = None
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(full_name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=None):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def __getitem__(self, name):
+        return self._metrics[name]
+
+    def collector(self, function):
+        """Add a function returning (name, kind, documentation, [(labels dict, value)]) tuples at render time."""
+        with self._lock:
+            self._collectors.append(function)
+        return function
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [(metric.name, metric.kind, metric.documentation, metric.samples()) for metric in metrics]
+        for function in collectors:
+            for name, kind, documentation, values in function():
+                full_name = f"{self.namespace}_{name}" if self.namespace else name
+                families.append((full_name, kind, documentation, [
+                    (full_name, tuple(sorted(labels.items())), value) for labels, value in values
+                ]))
+
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {escape_help(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path, min_interval=0):
+        """Write the metrics to a file, atomically (for node_exporter's textfile collector).
+
+        Each write goes through its own temporary file. The write is skipped (returning
+        False) while another thread is writing or when the last write was less than
+        min_interval seconds ago.
+        """
+        if not self._write_lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.monotonic()
+            if self._last_write is not None and now - self._last_write < min_interval:
+                return False
+
+            directory = os.path.dirname(os.path.abspath(path))
+            descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                    f.write(self.render())
+                # mkstemp creates the file readable by its owner only
+                os.chmod(temporary_path, 0o644)
+                os.replace(temporary_path, path)
+            except BaseException:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+            self._last_write = now
+            return True
+        finally:
+            self._write_lock.release()
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve GET /metrics from a daemon thread; returns the server (started once per registry)."""
+        with self._lock:
+            if self._server is not None:
+                return self._server
+            registry = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = registry.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", CONTENT_TYPE)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+            self._server.daemon_threads = True
+            threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True).start()
+            return self._server
+
+
+if __name__ == "__main__":
+    import random
+    import urllib.request
+
+    # Simulated app activity, served on a local port and scraped once
+    registry = MetricsRegistry("edurishi")
+    reruns = registry.histogram("rerun_duration_seconds", "Duration of app reruns")
+    llm_latency = registry.histogram("llm_call_duration_seconds", "Latency of LLM calls", ["outcome"],
+                                     buckets=[0.5, 1, 2, 4, 8, 16, 32])
+    leads = registry.counter("leads_created_total", "Leads created", ["operation"])
+    sessions = ActivityTracker()
+    registry.gauge("active_sessions", "Sessions seen in the last 5 minutes").set_function(sessions.active)
+    registry.collector(lambda: [("cache_lookups_total", "counter", "Cache lookups", [({"cache": "response"}, 40)])])
+
+    for session in range(5):
+        sessions.touch(f"session-{session}")
+    for _ in range(200):
+        reruns.observe(random.lognormvariate(-2, 0.8))
+    for _ in range(30):
+        llm_latency.observe(random.lognormvariate(1, 0.5), outcome=random.choice(["ok", "ok", "ok", "error"]))
+    leads.inc(1000, operation="bulk")
+    leads.inc(operation="single")
+
+    server = registry.serve(0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    print(urllib.request.urlopen(url).read().decode("utf-8"))
+
+    # Cost of recording and rendering
+    start = time.perf_counter()
+    for _ in range(100000):
+        reruns.observe(0.05)
+    print(f"Observe: {(time.perf_counter() - start) * 10:.2f} µs")
+    start = time.perf_counter()
+    for _ in range(100):
+        registry.render()
+    print(f"Render: {(time.perf_counter() - start) * 10:.2f} ms")
@@ -0,0 +1,608 @@
+"""
+Benchmark Suite Module
+
+This module times the CRM hot paths (lead scoring, lead creation, CSV import,
+recommendations, pipeline summary, forecast, dashboard aggregations, search and prompt
+building) on synthetic data from dataset_builder at 1k, 100k and 1M leads. The data is
+seeded, so every run measures the same rows.
+
+Each timing is the average of as many calls as fit in MIN_RUN_SECONDS (like timeit's
+autorange), so millisecond benchmarks are not at the mercy of timer and scheduler noise,
+and the repeats run in rounds over all benchmarks, so a slow spell of the machine does
+not land on every timing of one benchmark.
+Results are compared with stored baselines (benchmark_baselines.json): a benchmark
+regresses when even its fastest run is slower than the baseline's slowest, and its
+median exceeds the baseline by more than the threshold. Only regressions at the gated
+scales (100k and up by default) fail the run; small scales are too noisy to gate on
+numbers recorded in another run. The app module runs without `streamlit run` here, so
+its session state is a plain in-process store and charts are built but not sent anywhere.
+
+--compare-legacy compares the optimized code with the code it replaced instead, on the
+same data: speed and results of the recommendations, and the size of the sales prompt.
+
+    python benchmark_suite.py --scale 1k,100k
+    python benchmark_suite.py --scale 1k,100k --save-baseline
+    python benchmark_suite.py --scale 100k --compare-legacy
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+# Benchmark scales, by name
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+# Default baseline file, next to this module
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+
+# A benchmark regresses when its median is this much slower than the baseline...
+DEFAULT_THRESHOLD = 0.25
+# ...and slower by at least this many seconds (timer noise on very fast benchmarks)
+MIN_REGRESSION_SECONDS = 0.002
+
+# Timed runs per benchmark, and the least time one run is looped for
+DEFAULT_REPEAT = 5
+MIN_RUN_SECONDS = 0.2
+
+# Scales whose regressions fail the run
+GATED_SCALES = ("100k", "1m")
+
+# Fixed inputs, so runs are comparable
+SEED = 42
+REFERENCE_DATE = datetime(2025, 1, 1)
+ENQUIRY = "We are looking for ELAP and an AI workshop for 500 students. What is the pricing?"
+SALES_HISTORY = "\n".join(
+    f"Customer: Question {i} about ELAP pricing and schedules.\nAssistant: Answer {i} with the details."
+    for i in range(12)
+)
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark.
+
+    The decorated function gets the data for a scale, does any untimed setup and returns
+    the function to time.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def load_app():
+    """Import the app and dashboard modules outside `streamlit run`."""
+    import streamlit.logger
+    import streamlit.config
+
+    # Streamlit warns about the missing script run context on every call; the option
+    # is set before the app is imported so parsing the config keeps it
+    streamlit.config.set_option("logger.level", "error")
+    streamlit.logger.set_log_level("error")
+
+    import edurishi_sales_assistant
+    import city_business_dashboard
+    return edurishi_sales_assistant, city_business_dashboard
+
+
+def reset_crm_state(st, leads=(), deals=()):
+    """Replace the CRM session state with the given leads and deals."""
+    st.session_state.leads = list(leads)
+    st.session_state.deals = list(deals)
+    st.session_state.tasks = []
+    st.session_state.meetings = []
+    st.session_state.activity_log = []
+    st.session_state.leads_by_city = defaultdict(list)
+    st.session_state.leads_by_business_type = defaultdict(list)
+    st.session_state.leads_by_state = defaultdict(list)
+    st.session_state.lead_sources = defaultdict(int)
+    st.session_state.lead_generation_stats = {
+        "total_generated": 0,
+        "total_imported": 0,
+        "total_manual": 0,
+        "by_city": defaultdict(int),
+        "by_business_type": defaultdict(int),
+        "by_state": defaultdict(int),
+        "by_date": defaultdict(int)
+    }
+
+    # Views cached for the previous data must be rebuilt
+    from view_cache import bump_data_version
+    bump_data_version()
+
+
+def build_data(rows):
+    """Synthetic leads and deals in the shapes the app uses."""
+    from dataset_builder import build_tables
+
+    tables = build_tables(rows, seed=SEED, reference_date=REFERENCE_DATE, tables=["leads", "deals"])
+    leads = tables["leads"].astype({column: object for column in tables["leads"].columns if column != "budget"})
+    leads = leads.where(leads.notna(), None)
+    lead_records = leads.to_dict("records")
+    for lead in lead_records:
+        lead["company"] = lead["name"]
+
+    deals = tables["deals"]
+    deals = deals.assign(
+        created_date=deals["created_date"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+        expected_close_date=deals["expected_close_date"].dt.strftime("%Y-%m-%d"),
+        last_activity=deals["last_activity"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    ).astype({"name": object, "lead_name": object, "stage": object, "products": object})
+    deal_records = deals.to_dict("records")
+
+    # The CSV a user would upload, with the columns of the import template
+    csv = tables["leads"][["name", "contact_person", "profession", "email", "phone", "location", "product_interested",
+                           "budget"]].to_csv(index=False)
+
+    return {"rows": rows, "leads": lead_records, "deals": deal_records, "csv": csv}
+
+
+@benchmark("calculate_lead_score")
+def bench_lead_score(data, app, dashboard):
+    leads = data["leads"]
+    return lambda: [app.calculate_lead_score(lead) for lead in leads]
+
+
+@benchmark("create_new_lead")
+def bench_create_lead(data, app, dashboard):
+    reset_crm_state(app.st)
+    leads = data["leads"]
+    return lambda: [app.create_new_lead(lead) for lead in leads]
+
+
+@benchmark("create_new_leads")
+def bench_create_leads(data, app, dashboard):
+    reset_crm_state(app.st)
+    leads = data["leads"]
+    return lambda: app.create_new_leads(leads)
+
+
+@benchmark("csv_import")
+def bench_csv_import(data, app, dashboard):
+    reset_crm_state(app.st, data["leads"][:len(data["leads"]) // 2])
+    csv = data["csv"]
+
+    def run():
+        # The path of the "Import All Leads" form
+        frame = app.pd.read_csv(io.StringIO(csv))
+        frame = app.normalize_locations(frame)
+        frame, report = app.dedupe_leads(frame, app.st.session_state.leads, "skip")
+        return app.create_new_leads(frame.assign(source="CSV Import", source_detail="Imported from leads.csv"))
+    return run
+
+
+@benchmark("generate_recommendations")
+def bench_recommendations(data, app, dashboard):
+    leads = data["leads"]
+    return lambda: [app.generate_recommendations(lead) for lead in leads]
+
+
+@benchmark("get_pipeline_summary")
+def bench_pipeline_summary(data, app, dashboard):
+    reset_crm_state(app.st, deals=data["deals"])
+    return app.get_pipeline_summary
+
+
+@benchmark("generate_forecast")
+def bench_forecast(data, app, dashboard):
+    deals = data["deals"]
+    return lambda: app.generate_forecast(deals)
+
+
+@benchmark("dashboard_city_tab")
+def bench_city_tab(data, app, dashboard):
+    reset_crm_state(app.st, data["leads"], data["deals"])
+    return dashboard.create_city_distribution_tab
+
+
+@benchmark("dashboard_business_tab")
+def bench_business_tab(data, app, dashboard):
+    reset_crm_state(app.st, data["leads"], data["deals"])
+    return dashboard.create_business_type_tab
+
+
+@benchmark("dashboard_lead_analytics_tab")
+def bench_lead_analytics_tab(data, app, dashboard):
+    reset_crm_state(app.st, data["leads"], data["deals"])
+    return dashboard.create_lead_analytics_tab
+
+
+@benchmark("dashboard_unchanged_rerun")
+def bench_unchanged_rerun(data, app, dashboard):
+    reset_crm_state(app.st, data["leads"], data["deals"])
+    tabs = [dashboard.create_lead_analytics_tab, dashboard.create_city_distribution_tab,
+            dashboard.create_business_type_tab]
+
+    def run():
+        # A rerun that changes no data, served from the cached views
+        for tab in tabs:
+            tab()
+    run()
+    return run
+
+
+@benchmark("search_leads")
+def bench_search_leads(data, app, dashboard):
+    leads = data["leads"]
+    return lambda: [app.search_leads(leads, term) for term in ["public school", "gmail", "zz-no-match"]]
+
+
+@benchmark("search_deals")
+def bench_search_deals(data, app, dashboard):
+    deals = data["deals"]
+    return lambda: [app.search_deals(deals, term) for term in ["academy", "jan 2024", "zz-no-match"]]
+
+
+@benchmark("build_sales_prompt")
+def bench_prompt(data, app, dashboard):
+    leads = data["leads"]
+    history = app.compact_sales_history(SALES_HISTORY)
+
+    def run():
+        return [app.build_sales_prompt(lead, ENQUIRY, app.get_prompt_product_info(lead), history) for lead in leads]
+    return run
+
+
+def legacy_recommendations(customer_data, product_details, role_products=None, generic_products=None):
+    """generate_recommendations() as it was before the Recommender, for --compare-legacy.
+
+    product_details was the app's global catalog. The role table and generic products
+    are the ones now in recommendations.py, which were moved there unchanged.
+    """
+    from recommendations import GENERIC_PRODUCTS, ROLE_PRODUCTS, build_product_record
+
+    products = ROLE_PRODUCTS if role_products is None else role_products
+    recommendations = []
+
+    # Check if customer has specific product interests
+    if "product_interested" in customer_data and customer_data["product_interested"]:
+        interested_products = [p.strip() for p in str(customer_data["product_interested"]).split(",")]
+        for product in interested_products:
+            if product in product_details:
+                recommendations.append(product)
+
+    # If no specific interests or not enough recommendations, check pitched products
+    if len(recommendations) < 3 and "product_pitched" in customer_data and customer_data["product_pitched"]:
+        pitched_products = [p.strip() for p in str(customer_data["product_pitched"]).split(",")]
+        for product in pitched_products:
+            if product in product_details and product not in recommendations:
+                recommendations.append(product)
+
+    # If still not enough, use profession-based recommendations
+    if len(recommendations) < 3:
+        profession = customer_data.get("profession", "").lower().replace(" ", "_")
+        if profession in products:
+            for product in products[profession]:
+                if product not in recommendations:
+                    recommendations.append(product)
+
+    # Add generic recommendations if needed
+    if len(recommendations) < 3:
+        for product in GENERIC_PRODUCTS if generic_products is None else generic_products:
+            if product not in recommendations:
+                recommendations.append(product)
+
+    return [build_product_record(code, product_details.get(code)) for code in recommendations[:3]]
+
+
+def canonical_legacy_recommendations(customer_data):
+    """The old rules applied to canonical product codes and role names.
+
+    This is what the Recommender is meant to compute: product names and aliases resolve
+    through the catalog's alias index (each product once), and roles match whatever
+    their case or spacing.
+    """
+    from product_catalog import PRODUCT_CATALOG, resolve_product_code, resolve_product_codes
+    from recommendations import GENERIC_PRODUCTS, ROLE_PRODUCTS, field_value, normalize_role
+
+    def canonical(products):
+        codes = []
+        for product in products:
+            code = resolve_product_code(product) or product
+            if code not in codes:
+                codes.append(code)
+        return codes
+
+    customer = {
+        "product_interested": ", ".join(resolve_product_codes(customer_data.get("product_interested"))),
+        "product_pitched": ", ".join(resolve_product_codes(customer_data.get("product_pitched"))),
+        "profession": normalize_role(field_value(customer_data.get("profession")))
+    }
+    role_products = {normalize_role(role): canonical(products) for role, products in ROLE_PRODUCTS.items()}
+    return legacy_recommendations(customer, PRODUCT_CATALOG, role_products, canonical(GENERIC_PRODUCTS))
+
+
+def legacy_sales_prompt(customer_data, enquiry_details, product_info, sales_history=""):
+    """The sales prompt as generate_sales_response built it before prompt_builder, for --compare-legacy."""
+    import pandas as pd
+
+    prompt = f"""
+        You are an AI sales agent for EDURISHI EDUVENTURES PVT LTD, an educational technology company.
+        Your task is to generate a personalized sales response based on the customer data and enquiry details provided.
+
+        ## Customer Data:
+        {json.dumps(customer_data, indent=2, default=str)}
+
+        ## Enquiry Details:
+        {enquiry_details}
+
+        ## Recommended Products:
+        {json.dumps(product_info, indent=2)}
+
+        """
+
+    if sales_history:
+        prompt += f"""
+            ## Previous Conversation History:
+            {sales_history}
+
+            Please continue the conversation based on this history.
+            """
+
+    if "product_interested" in customer_data and not pd.isna(customer_data["product_interested"]):
+        prompt += f"""
+            ## Products Customer Is Interested In:
+            The customer has expressed specific interest in: {customer_data["product_interested"]}
+            Focus your response on these products, highlighting their benefits for the customer's specific needs.
+            """
+
+    if "budget" in customer_data and not pd.isna(customer_data["budget"]):
+        prompt += f"""
+            ## Budget Information:
+            The customer has indicated a budget of: {customer_data["budget"]}
+            Tailor your recommendations to align with this budget constraint.
+            """
+
+    prompt += """
+        ## Response Format:
+        1. Start with a friendly greeting using the customer's name.
+        2. Provide a brief summary of their enquiry to show understanding.
+        3. Create a tailored sales pitch based on their data (profession, interests, etc.).
+        4. Specifically mention the recommended EDURISHI EDUVENTURES PVT LTD's educational solutions that would benefit them.
+        5. If they have expressed interest in specific products, emphasize those products.
+        6. If they have budget constraints, acknowledge them and explain how our solutions provide value within their budget.
+        7. End with a clear call to action (schedule a call, visit website, etc.).
+
+        Make your response conversational, professional, and persuasive. Focus on how EDURISHI's educational products/services solve their specific needs.
+        """
+    return prompt
+
+
+def time_benchmark(setup, data, app, dashboard, min_time=MIN_RUN_SECONDS):
+    """Time a benchmark once and return the seconds per call.
+
+    The benchmark is called (with its setup untimed) until min_time has passed and the
+    calls are averaged. As in timeit, the garbage collector is off while timing, so
+    collections triggered by whatever else is alive do not land in random benchmarks.
+    """
+    calls, elapsed = 0, 0.0
+    gc.collect()
+    gc.disable()
+    try:
+        while calls == 0 or elapsed < min_time:
+            run = setup(data, app, dashboard)
+            start = time.perf_counter()
+            run()
+            elapsed += time.perf_counter() - start
+            calls += 1
+    finally:
+        gc.enable()
+    return elapsed / calls
+
+
+def load_baselines(path):
+    """Stored baselines, or an empty set when there are none yet."""
+    if not os.path.exists(path):
+        return {"machine": None, "results": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def machine_info():
+    """Where the numbers were measured."""
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version()
+    }
+
+
+def compare(result, baseline, threshold=DEFAULT_THRESHOLD):
+    """Status of a result against its baseline: "new", "ok", "faster" or "regressed".
+
+    The runs must not overlap: a regression's fastest run is slower than the baseline's
+    slowest, and a speedup's slowest run is faster than the baseline's fastest.
+    """
+    if baseline is None:
+        return "new"
+    median, reference = result["median"], baseline["median"]
+    if (median > reference * (1 + threshold) and median - reference > MIN_REGRESSION_SECONDS
+            and result["min"] > baseline.get("max", reference)):
+        return "regressed"
+    if (median < reference * (1 - threshold) and reference - median > MIN_REGRESSION_SECONDS
+            and result.get("max", median) < baseline["min"]):
+        return "faster"
+    return "ok"
+
+
+def run_suite(scales, names=None, repeat=DEFAULT_REPEAT, baseline_path=BASELINE_PATH, threshold=DEFAULT_THRESHOLD,
+              save_baseline=False, gated_scales=GATED_SCALES, out=sys.stdout):
+    """Run the selected benchmarks at the given scales and return (results, regressions).
+
+    Regressions at scales outside gated_scales are reported but not returned.
+    """
+    app, dashboard = load_app()
+    baselines = load_baselines(baseline_path)
+    if baselines.get("machine") and baselines["machine"] != machine_info():
+        print("Note: baselines were measured on a different machine:", baselines["machine"], file=out)
+
+    results = {}
+    regressions = []
+    for scale in scales:
+        start = time.perf_counter()
+        data = build_data(SCALES[scale])
+        print(f"\n[{scale}] {len(data['leads']):,} leads, {len(data['deals']):,} deals "
+              f"(built in {time.perf_counter() - start:.1f}s)", file=out)
+        print(f"{'benchmark':32s} {'median':>10s} {'min':>10s} {'baseline':>10s} {'change':>8s}  status", file=out)
+
+        # The benchmarks run in rounds, so a slow spell of the machine costs one timing of
+        # several benchmarks rather than every timing of one
+        selected = [name for name in BENCHMARKS if not names or any(pattern in name for pattern in names)]
+        timings = {name: [] for name in selected}
+        for _ in range(repeat):
+            for name in selected:
+                timings[name].append(time_benchmark(BENCHMARKS[name], data, app, dashboard))
+
+        for name in selected:
+            key = f"{scale}/{name}"
+            result = results[key] = {"median": statistics.median(timings[name]), "min": min(timings[name]),
+                                     "max": max(timings[name]), "repeat": repeat}
+            baseline = baselines["results"].get(key)
+            status = compare(result, baseline, threshold)
+            if status == "regressed":
+                if scale in gated_scales:
+                    regressions.append(key)
+                else:
+                    status = "regressed (not gated)"
+
+            reference = f"{baseline['median']:.4f}" if baseline else "-"
+            change = f"{result['median'] / baseline['median'] - 1:+.0%}" if baseline and baseline["median"] else "-"
+            print(f"{name:32s} {result['median']:10.4f} {result['min']:10.4f} {reference:>10s} {change:>8s}  {status}",
+                  file=out)
+
+        # Leave nothing large in the session between scales
+        reset_crm_state(app.st)
+
+    if save_baseline:
+        baselines["machine"] = machine_info()
+        baselines["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+        baselines["results"].update(results)
+        with open(baseline_path, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nSaved {len(results)} baselines to {baseline_path}", file=out)
+
+    return results, regressions
+
+
+def compare_legacy(scales, out=sys.stdout):
+    """Compare the optimized code with the code it replaced; returns False on a mismatch."""
+    import pandas as pd
+    from product_catalog import PRODUCT_CATALOG
+    from prompt_builder import build_sales_prompt, compact_sales_history, estimate_tokens
+    from recommendations import Recommender
+
+    matched = True
+    for scale in scales:
+        data = build_data(SCALES[scale])
+        leads = data["leads"]
+        frame = pd.DataFrame(leads)
+        print(f"\n[{scale}] {len(leads):,} leads", file=out)
+
+        # Recommendations: the old code, then the Recommender on the production catalog
+        start = time.perf_counter()
+        legacy = [legacy_recommendations(lead, PRODUCT_CATALOG) for lead in leads]
+        legacy_time = time.perf_counter() - start
+
+        recommender = Recommender()
+        start = time.perf_counter()
+        single = [recommender.recommend(lead) for lead in leads]
+        single_time = time.perf_counter() - start
+
+        recommender = Recommender()
+        start = time.perf_counter()
+        batch = recommender.recommend_batch(frame)
+        batch_time = time.perf_counter() - start
+
+        # Every row must follow the old rules once aliases and role names are resolved
+        mismatches = sum(new != canonical_legacy_recommendations(lead) for new, lead in zip(single, leads))
+        mismatches += sum(new != old for new, old in zip(single, batch))
+        changed = sum(old != new for old, new in zip(legacy, single))
+        matched = matched and not mismatches
+        print(f"recommendations: legacy {legacy_time:.2f}s, per customer {single_time:.2f}s "
+              f"({legacy_time / single_time:.1f}x), batch {batch_time:.2f}s ({legacy_time / batch_time:.1f}x); "
+              f"{changed:,} leads changed by alias, role and duplicate handling, {mismatches:,} mismatches", file=out)
+
+        # Sales prompts: the old f-string prompt with the full history, then the compact
+        # prompt with the compacted history, as in the build_sales_prompt benchmark
+        product_infos = [[{"name": product["name"], "description": product["description"],
+                           "pricing": product.get("pricing", "Contact for pricing")} for product in products]
+                         for products in single]
+        start = time.perf_counter()
+        legacy_prompts = [legacy_sales_prompt(lead, ENQUIRY, product_info, SALES_HISTORY)
+                          for lead, product_info in zip(leads, product_infos)]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        history = compact_sales_history(SALES_HISTORY)
+        prompts = [build_sales_prompt(lead, ENQUIRY, product_info, history)
+                   for lead, product_info in zip(leads, product_infos)]
+        prompt_time = time.perf_counter() - start
+
+        legacy_tokens = sum(map(estimate_tokens, legacy_prompts)) / len(leads)
+        prompt_tokens = sum(map(estimate_tokens, prompts)) / len(leads)
+        print(f"build_sales_prompt: legacy {legacy_time:.2f}s, compact {prompt_time:.2f}s "
+              f"({legacy_time / prompt_time:.1f}x); ~{legacy_tokens:,.0f} -> ~{prompt_tokens:,.0f} tokens per prompt "
+              f"({1 - prompt_tokens / legacy_tokens:.0%} fewer)", file=out)
+
+    return matched
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the EduRishi CRM hot paths.")
+    parser.add_argument("--scale", default="1k,100k", help=f"comma-separated scales from {', '.join(SCALES)} "
+                                                           "(default: 1k,100k)")
+    parser.add_argument("--filter", help="comma-separated substrings of benchmark names to run")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"timed runs per benchmark (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file (default: benchmark_baselines.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed slowdown before a regression is reported (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baselines")
+    parser.add_argument("--gate", default=",".join(GATED_SCALES),
+                        help=f"comma-separated scales whose regressions fail the run (default: {','.join(GATED_SCALES)})")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="fail when a benchmark has no stored baseline (for CI)")
+    parser.add_argument("--compare-legacy", action="store_true",
+                        help="compare the optimized code with the code it replaced and exit")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        sys.exit(0)
+
+    scales = [scale.strip().lower() for scale in args.scale.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(unknown)}")
+
+    if args.compare_legacy:
+        sys.exit(0 if compare_legacy(scales) else 1)
+
+    stored = load_baselines(args.baseline)["results"]
+    results, regressions = run_suite(
+        scales,
+        names=[name.strip() for name in args.filter.split(",")] if args.filter else None,
+        repeat=args.repeat,
+        baseline_path=args.baseline,
+        threshold=args.threshold,
+        save_baseline=args.save_baseline,
+        gated_scales=[scale.strip().lower() for scale in args.gate.split(",") if scale.strip()]
+    )
+    missing = [key for key in results if key not in stored]
+    if args.require_baseline and missing and not args.save_baseline:
+        print(f"\n{len(missing)} benchmark(s) without a baseline in {args.baseline}: {', '.join(missing)}")
+        sys.exit(1)
+    if regressions and not args.save_baseline:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,154 @@
+"""
+Chart Downsampling Module
+
+This module reduces the data behind the dashboard charts before the figures are built,
+so the size of a chart sent to the browser stays bounded however many leads and deals
+there are. Time series are summed into day, week, month, quarter or year buckets (the
+finest that fits the point budget), long lines are thinned with the Largest-Triangle-
+Three-Buckets algorithm, which keeps the visual shape of the line, and category bars
+keep their top entries with the rest collapsed into one "Other" bar.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# Most points drawn for one line and bars drawn for one time-bar chart
+MAX_CHART_POINTS = 400
+MAX_CHART_BARS = 120
+
+# Categories drawn before the rest are collapsed into OTHER_LABEL
+TOP_N_CATEGORIES = 10
+OTHER_LABEL = "Other"
+
+# Time buckets from finest to coarsest: (pandas frequency, resample options, label)
+TIME_BUCKETS = [
+    ("D", {}, "day"),
+    ("W-MON", {"label": "left", "closed": "left"}, "week"),
+    ("MS", {}, "month"),
+    ("QS", {}, "quarter"),
+    ("YS", {}, "year")
+]
+
+
+def bucket_time_series(dates, values=None, max_points=MAX_CHART_POINTS):
+    """Sum values (1 per date when omitted) into the finest time bucket giving at most max_points buckets.
+
+    Returns a DataFrame with Date (start of each bucket) and Value columns, with empty
+    buckets as zero, and the bucket label ("day", "week", ...).
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(dates))
+    series = pd.Series(1.0 if values is None else np.asarray(values, dtype=float), index=index)
+    if series.empty:
+        return pd.DataFrame({"Date": pd.DatetimeIndex([]), "Value": []}), TIME_BUCKETS[0][2]
+
+    # Coarser buckets are summed from the daily totals
+    daily = series.resample("D").sum()
+    for frequency, options, label in TIME_BUCKETS:
+        bucketed = daily if frequency == "D" else daily.resample(frequency, **options).sum()
+        if len(bucketed) <= max_points:
+            break
+
+    return pd.DataFrame({"Date": bucketed.index, "Value": bucketed.to_numpy()}), label
+
+
+def lttb(x, y, threshold):
+    """Indices of the threshold points Largest-Triangle-Three-Buckets keeps from a line.
+
+    x must be sorted. The first and last points are always kept; every point in between
+    comes from its own bucket, picked to form the largest triangle with the previously
+    kept point and the average of the next bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Points 1 .. n-2 split into threshold-2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # The next bucket's average; the last bucket looks at the last point
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+
+        # Twice the triangle areas, enough for picking the largest
+        areas = np.abs(
+            (x[selected] - average_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (average_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+
+    return indices
+
+
+def downsample_line(frame, x, y, max_points=MAX_CHART_POINTS):
+    """The rows of a line chart's DataFrame (sorted by x) that LTTB keeps, at most max_points."""
+    if len(frame) <= max_points:
+        return frame
+
+    x_values = frame[x]
+    if not pd.api.types.is_numeric_dtype(x_values):
+        x_values = pd.to_datetime(x_values).astype("int64")
+    return frame.iloc[lttb(x_values, frame[y], max_points)]
+
+
+def top_n_with_other(items, n=TOP_N_CATEGORIES, other_label=OTHER_LABEL):
+    """The n largest (label, count) pairs, plus (other_label, total of the rest) when some are left out."""
+    items = list(items)
+    top = heapq.nlargest(n, items, key=lambda item: item[1])
+    if len(items) > n:
+        rest = sum(count for _, count in items) - sum(count for _, count in top)
+        top.append((other_label, rest))
+    return top
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from collections import Counter
+    from datetime import datetime, timedelta
+
+    import plotly.express as px
+
+    # Five years of leads: one point per day against buckets that fit the budget
+    random.seed(7)
+    start_date = datetime(2020, 1, 1)
+    created = [start_date + timedelta(seconds=random.randint(0, 5 * 365 * 86400)) for _ in range(200000)]
+
+    day_counts = Counter(date.date() for date in created)
+    df_daily = pd.DataFrame(sorted(day_counts.items()), columns=["Date", "Count"])
+    full_size = len(px.line(df_daily, x="Date", y="Count").to_json())
+
+    started = time.perf_counter()
+    df_bucketed, bucket = bucket_time_series(created)
+    bucket_time = time.perf_counter() - started
+    bucketed_size = len(px.line(df_bucketed, x="Date", y="Value").to_json())
+    print(f"Lead trend: {len(df_daily)} days, {full_size / 1024:.0f} KiB -> "
+          f"{len(df_bucketed)} {bucket}s, {bucketed_size / 1024:.0f} KiB ({bucket_time * 1000:.1f} ms)")
+
+    # A cumulative line of a million points thinned with LTTB
+    df_line = pd.DataFrame({"Date": pd.date_range("2000-01-01", periods=1000000, freq="min")})
+    df_line["Revenue"] = np.cumsum(np.random.default_rng(7).normal(0, 1000, len(df_line)))
+    started = time.perf_counter()
+    df_thinned = downsample_line(df_line, "Date", "Revenue")
+    print(f"LTTB: {len(df_line)} -> {len(df_thinned)} points in {(time.perf_counter() - started) * 1000:.1f} ms, "
+          f"range kept {df_thinned['Revenue'].max() - df_thinned['Revenue'].min():,.0f} of "
+          f"{df_line['Revenue'].max() - df_line['Revenue'].min():,.0f}")
+
+    # Thousands of cities collapsed into the top ten and "Other"
+    city_counts = Counter(f"City {int(random.paretovariate(1.2))}" for _ in range(200000))
+    top_cities = top_n_with_other(city_counts.items())
+    print(f"Cities: {len(city_counts)} -> {len(top_cities)} bars, {top_cities[-1]}")
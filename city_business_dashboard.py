@@ -10,10 +10,42 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from collections import Counter, defaultdict
+import heapq
 import random
 from datetime import datetime, timedelta
 import numpy as np
 
+# Chart data is downsampled when the chart downsampling module is available
+try:
+    from chart_downsampling import (
+        MAX_CHART_BARS, OTHER_LABEL, TOP_N_CATEGORIES, bucket_time_series, downsample_line, top_n_with_other
+    )
+except ImportError:
+    MAX_CHART_BARS = None
+    OTHER_LABEL = "Other"
+    TOP_N_CATEGORIES = 10
+
+    def bucket_time_series(dates, values=None, max_points=None):
+        series = pd.Series(1 if values is None else list(values), index=pd.to_datetime(list(dates)))
+        daily = series.groupby(series.index.normalize()).sum()
+        return pd.DataFrame({"Date": daily.index, "Value": daily.to_numpy()}), "day"
+
+    def downsample_line(frame, x, y, max_points=None):
+        return frame
+
+    def top_n_with_other(items, n=TOP_N_CATEGORIES, other_label=OTHER_LABEL):
+        return heapq.nlargest(n, items, key=lambda item: item[1])
+
+# Views are cached per data version when the view cache module is available
+try:
+    from view_cache import cached_view, bump_data_version
+except ImportError:
+    def cached_view(function):
+        return function
+
+    def bump_data_version():
+        pass
+
 def create_dashboard_tabs():
     """Create tabs for different dashboard visualizations."""
     dashboard_tabs = st.tabs(["Overview", "Lead Analytics", "City-wise Distribution", "Business Type Analysis"])
@@ -117,6 +149,9 @@ def create_sample_data():
             # Add to pipeline
             st.session_state.sales_pipeline["deals_by_stage"][stage].append(deal_id)
 
+    # Rebuild cached views with the sample data
+    bump_data_version()
+
 def create_overview_tab():
     """Create visualizations for the overview tab."""
     col1, col2 = st.columns(2)
@@ -151,7 +186,7 @@ def create_overview_tab():
             """, unsafe_allow_html=True)
     else:
         # Display actual activity log
-        for activity in sorted(st.session_state.activity_log, key=lambda x: x["timestamp"], reverse=True)[:5]:
+        for activity in get_recent_activities():
             st.markdown(f"""
             <div style="padding: 10px; background-color: #f0f0f0; border-radius: 5px; margin-bottom: 10px;">
                 <strong>{activity["description"]}</strong><br>
@@ -159,10 +194,22 @@ def create_overview_tab():
             </div>
             """, unsafe_allow_html=True)
 
+@cached_view
+def get_recent_activities(limit=5):
+    """Get the most recent entries of the activity log, newest first."""
+    return heapq.nlargest(limit, st.session_state.activity_log, key=lambda x: x["timestamp"])
+
 def create_pipeline_chart():
     """Create a sales pipeline visualization."""
     st.markdown("#### Sales Pipeline")
-    
+
+    fig, fig2 = build_pipeline_figures()
+    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig2, use_container_width=True)
+
+@cached_view
+def build_pipeline_figures():
+    """Build the deal count and deal value by stage figures."""
     # Prepare data
     stages = st.session_state.sales_pipeline["stages"]
     
@@ -190,8 +237,6 @@ def create_pipeline_chart():
         height=300
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    
     # Create value chart
     fig2 = go.Figure(go.Bar(
         y=stages,
@@ -209,15 +254,21 @@ def create_pipeline_chart():
     
     # Format x-axis labels with commas
     fig2.update_xaxes(tickformat=",.0f")
-    
-    st.plotly_chart(fig2, use_container_width=True)
+
+    return fig, fig2
 
 def create_revenue_forecast():
     """Create a revenue forecast visualization."""
     st.markdown("#### Revenue Forecast")
-    
+
+    fig, fig2 = build_revenue_forecast_figures(datetime.now().date())
+    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig2, use_container_width=True)
+
+@cached_view
+def build_revenue_forecast_figures(today):
+    """Build the cumulative and daily revenue forecast figures for the 90 days from today."""
     # Prepare data
-    today = datetime.now().date()
     next_90_days = [today + timedelta(days=i) for i in range(90)]
     
     # Calculate expected revenue for each day
@@ -250,9 +301,9 @@ def create_revenue_forecast():
     
     df_forecast = pd.DataFrame(forecast_data)
     
-    # Create line chart
+    # Create line chart, thinned to a bounded number of points
     fig = px.line(
-        df_forecast, 
+        downsample_line(df_forecast, "Date", "Cumulative Revenue"),
         x="Date", 
         y="Cumulative Revenue",
         title="Cumulative Revenue Forecast (90 Days)"
@@ -267,14 +318,13 @@ def create_revenue_forecast():
     # Format y-axis labels with commas
     fig.update_yaxes(tickformat=",.0f")
     
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Create bar chart for daily revenue
+    # Create bar chart for daily revenue, in longer buckets when there are too many days
+    df_bars, bucket = bucket_time_series(df_forecast["Date"], df_forecast["Daily Revenue"], MAX_CHART_BARS)
     fig2 = px.bar(
-        df_forecast, 
-        x="Date", 
-        y="Daily Revenue",
-        title="Daily Expected Revenue"
+        df_bars,
+        x="Date",
+        y="Value",
+        title="Daily Expected Revenue" if bucket == "day" else f"Expected Revenue per {bucket.title()}"
     )
     
     fig2.update_layout(
@@ -285,8 +335,8 @@ def create_revenue_forecast():
     
     # Format y-axis labels with commas
     fig2.update_yaxes(tickformat=",.0f")
-    
-    st.plotly_chart(fig2, use_container_width=True)
+
+    return fig, fig2
 
 def create_lead_analytics_tab():
     """Create visualizations for lead analytics."""
@@ -315,7 +365,11 @@ def create_lead_analytics_tab():
 def create_lead_source_chart():
     """Create a chart showing lead distribution by source."""
     st.markdown("#### Lead Source Distribution")
-    
+    st.plotly_chart(build_lead_source_figure(), use_container_width=True)
+
+@cached_view
+def build_lead_source_figure():
+    """Build the lead source pie chart."""
     # Count leads by source
     source_counts = Counter()
     
@@ -344,13 +398,17 @@ def create_lead_source_chart():
         margin=dict(l=20, r=20, t=40, b=20),
         height=300
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_lead_status_chart():
     """Create a chart showing lead distribution by status."""
     st.markdown("#### Lead Status Distribution")
-    
+    st.plotly_chart(build_lead_status_figure(), use_container_width=True)
+
+@cached_view
+def build_lead_status_figure():
+    """Build the lead status bar chart."""
     # Count leads by status
     status_counts = Counter()
     
@@ -395,49 +453,35 @@ def create_lead_status_chart():
         xaxis_title="",
         yaxis_title="Number of Leads"
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_lead_generation_trend():
     """Create a chart showing lead generation trend over time."""
     st.markdown("#### Lead Generation Trend")
-    
-    # Get lead creation dates
-    dates = []
-    
-    for lead in st.session_state.leads:
-        if lead.get("created_date"):
-            try:
-                date = datetime.strptime(lead["created_date"], "%Y-%m-%d %H:%M:%S").date()
-            except ValueError:
-                try:
-                    date = datetime.strptime(lead["created_date"], "%Y-%m-%d").date()
-                except ValueError:
-                    continue
-            dates.append(date)
+    st.plotly_chart(build_lead_generation_trend_figure(), use_container_width=True)
+
+@cached_view
+def build_lead_generation_trend_figure():
+    """Build the leads over time line chart, per day or in longer buckets for long histories."""
+    # Get lead creation dates, with or without a time
+    created = pd.Series([lead["created_date"] for lead in st.session_state.leads if lead.get("created_date")], dtype=object)
+    dates = pd.to_datetime(created, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    dates = dates.fillna(pd.to_datetime(created, format="%Y-%m-%d", errors="coerce")).dropna().dt.normalize()
     
     # If no dates, create sample data
-    if not dates:
+    if dates.empty:
         today = datetime.now().date()
         dates = [today - timedelta(days=random.randint(0, 30)) for _ in range(50)]
     
-    # Count leads by date
-    date_counts = Counter(dates)
-    
-    # Create dataframe
-    df_dates = pd.DataFrame({
-        "Date": list(date_counts.keys()),
-        "Count": list(date_counts.values())
-    })
-    
-    # Sort by date
-    df_dates = df_dates.sort_values("Date")
+    # Count leads per day, week or month so the line has a bounded number of points
+    df_dates, bucket = bucket_time_series(dates)
     
     # Create line chart
     fig = px.line(
         df_dates,
         x="Date",
-        y="Count",
+        y="Value",
         title="Lead Generation Over Time"
     )
     
@@ -445,15 +489,19 @@ def create_lead_generation_trend():
         margin=dict(l=20, r=20, t=40, b=20),
         height=300,
         xaxis_title="",
-        yaxis_title="Number of Leads"
+        yaxis_title="Number of Leads" if bucket == "day" else f"Leads per {bucket.title()}"
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_lead_conversion_chart():
     """Create a chart showing lead conversion rates."""
     st.markdown("#### Lead Conversion Metrics")
-    
+    st.plotly_chart(build_lead_conversion_figure(), use_container_width=True)
+
+@cached_view
+def build_lead_conversion_figure():
+    """Build the conversion and win rate gauges."""
     # Calculate conversion rates
     total_leads = len(st.session_state.leads)
     converted_to_deals = len([d for d in st.session_state.deals if d.get("lead_id")])
@@ -510,13 +558,31 @@ def create_lead_conversion_chart():
         margin=dict(l=20, r=20, t=40, b=20),
         height=300
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_city_distribution_tab():
     """Create visualizations for city distribution."""
     st.markdown("### City-wise Lead Distribution")
     
+    city_counts, state_counts = count_leads_by_location()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Top Cities
+        create_top_cities_chart(city_counts)
+    
+    with col2:
+        # State Distribution
+        create_state_distribution_chart(state_counts)
+    
+    # City-State Heatmap
+    create_city_state_heatmap()
+
+@cached_view
+def count_leads_by_location():
+    """Count leads by city and by state, leaving out unknown locations."""
     # Count leads by city
     city_counts = Counter()
     
@@ -532,42 +598,30 @@ def create_city_distribution_tab():
         state = lead.get("state", "Unknown")
         if state and state != "Unknown":
             state_counts[state] += 1
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Top Cities
-        create_top_cities_chart(city_counts)
-    
-    with col2:
-        # State Distribution
-        create_state_distribution_chart(state_counts)
-    
-    # City-State Heatmap
-    create_city_state_heatmap()
+
+    return city_counts, state_counts
 
 def create_top_cities_chart(city_counts):
     """Create a chart showing top cities by lead count."""
     st.markdown("#### Top Cities by Lead Count")
-    
-    # Get top 10 cities
-    top_cities = dict(city_counts.most_common(10))
-    
+    st.plotly_chart(build_top_cities_figure(tuple(top_n_with_other(city_counts.items()))), use_container_width=True)
+
+@cached_view
+def build_top_cities_figure(city_items):
+    """Build the top cities bar chart from (city, count) pairs, the remaining cities collapsed into "Other"."""
     # Create dataframe
-    df_cities = pd.DataFrame({
-        "City": list(top_cities.keys()),
-        "Count": list(top_cities.values())
-    })
+    df_cities = pd.DataFrame(list(city_items), columns=["City", "Count"])
     
-    # Sort by count
-    df_cities = df_cities.sort_values("Count", ascending=True)
+    # Sort by count, with "Other" at the bottom
+    df_cities["Collapsed"] = df_cities["City"] == OTHER_LABEL
+    df_cities = df_cities.sort_values(["Collapsed", "Count"], ascending=[False, True])
     
     # Create horizontal bar chart
     fig = px.bar(
         df_cities,
         y="City",
         x="Count",
-        title="Top 10 Cities by Lead Count",
+        title=f"Top {TOP_N_CATEGORIES} Cities by Lead Count",
         orientation="h"
     )
     
@@ -577,18 +631,19 @@ def create_top_cities_chart(city_counts):
         xaxis_title="Number of Leads",
         yaxis_title=""
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_state_distribution_chart(state_counts):
     """Create a chart showing lead distribution by state."""
     st.markdown("#### Lead Distribution by State")
-    
+    st.plotly_chart(build_state_distribution_figure(tuple(state_counts.items())), use_container_width=True)
+
+@cached_view
+def build_state_distribution_figure(state_items):
+    """Build the state pie chart from (state, count) pairs."""
     # Create dataframe
-    df_states = pd.DataFrame({
-        "State": list(state_counts.keys()),
-        "Count": list(state_counts.values())
-    })
+    df_states = pd.DataFrame(list(state_items), columns=["State", "Count"])
     
     # Sort by count
     df_states = df_states.sort_values("Count", ascending=False)
@@ -605,13 +660,17 @@ def create_state_distribution_chart(state_counts):
         margin=dict(l=20, r=20, t=40, b=20),
         height=400
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_city_state_heatmap():
     """Create a heatmap showing lead distribution by city and state."""
     st.markdown("#### City-State Lead Distribution")
-    
+    st.plotly_chart(build_city_state_heatmap_figure(), use_container_width=True)
+
+@cached_view
+def build_city_state_heatmap_figure():
+    """Build the city by state heatmap."""
     # Count leads by city and state
     city_state_counts = defaultdict(int)
     
@@ -670,13 +729,31 @@ def create_city_state_heatmap():
         margin=dict(l=20, r=20, t=40, b=20),
         height=500
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_business_type_tab():
     """Create visualizations for business type analysis."""
     st.markdown("### Business Type Analysis")
     
+    business_counts, subcategory_counts = count_leads_by_business_type()
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Business Type Distribution
+        create_business_type_chart(business_counts)
+    
+    with col2:
+        # Subcategory Distribution
+        create_subcategory_chart(subcategory_counts)
+    
+    # Business Type Performance
+    create_business_type_performance()
+
+@cached_view
+def count_leads_by_business_type():
+    """Count leads by business type and by subcategory, leaving out unknown ones."""
     # Count leads by business type
     business_counts = Counter()
     
@@ -692,29 +769,19 @@ def create_business_type_tab():
         subcategory = lead.get("business_subcategory", "Unknown")
         if subcategory and subcategory != "Unknown":
             subcategory_counts[subcategory] += 1
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Business Type Distribution
-        create_business_type_chart(business_counts)
-    
-    with col2:
-        # Subcategory Distribution
-        create_subcategory_chart(subcategory_counts)
-    
-    # Business Type Performance
-    create_business_type_performance()
+
+    return business_counts, subcategory_counts
 
 def create_business_type_chart(business_counts):
     """Create a chart showing lead distribution by business type."""
     st.markdown("#### Lead Distribution by Business Type")
-    
+    st.plotly_chart(build_business_type_figure(tuple(business_counts.items())), use_container_width=True)
+
+@cached_view
+def build_business_type_figure(business_items):
+    """Build the business type bar chart from (business type, count) pairs."""
     # Create dataframe
-    df_business = pd.DataFrame({
-        "Business Type": list(business_counts.keys()),
-        "Count": list(business_counts.values())
-    })
+    df_business = pd.DataFrame(list(business_items), columns=["Business Type", "Count"])
     
     # Sort by count
     df_business = df_business.sort_values("Count", ascending=False)
@@ -734,31 +801,30 @@ def create_business_type_chart(business_counts):
         xaxis_title="",
         yaxis_title="Number of Leads"
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_subcategory_chart(subcategory_counts):
     """Create a chart showing lead distribution by business subcategory."""
     st.markdown("#### Lead Distribution by Subcategory")
-    
-    # Get top 10 subcategories
-    top_subcategories = dict(subcategory_counts.most_common(10))
-    
+    st.plotly_chart(build_subcategory_figure(tuple(top_n_with_other(subcategory_counts.items()))), use_container_width=True)
+
+@cached_view
+def build_subcategory_figure(subcategory_items):
+    """Build the top subcategories bar chart from (subcategory, count) pairs, the rest collapsed into "Other"."""
     # Create dataframe
-    df_subcategories = pd.DataFrame({
-        "Subcategory": list(top_subcategories.keys()),
-        "Count": list(top_subcategories.values())
-    })
+    df_subcategories = pd.DataFrame(list(subcategory_items), columns=["Subcategory", "Count"])
     
-    # Sort by count
-    df_subcategories = df_subcategories.sort_values("Count", ascending=True)
+    # Sort by count, with "Other" at the bottom
+    df_subcategories["Collapsed"] = df_subcategories["Subcategory"] == OTHER_LABEL
+    df_subcategories = df_subcategories.sort_values(["Collapsed", "Count"], ascending=[False, True])
     
     # Create horizontal bar chart
     fig = px.bar(
         df_subcategories,
         y="Subcategory",
         x="Count",
-        title="Top 10 Subcategories",
+        title=f"Top {TOP_N_CATEGORIES} Subcategories",
         orientation="h",
         color="Count",
         color_continuous_scale="Viridis"
@@ -770,18 +836,30 @@ def create_subcategory_chart(subcategory_counts):
         xaxis_title="Number of Leads",
         yaxis_title=""
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+    return fig
 
 def create_business_type_performance():
     """Create a visualization showing performance metrics by business type."""
     st.markdown("#### Business Type Performance Metrics")
+
+    fig, display_df = build_business_type_performance()
+    st.plotly_chart(fig, use_container_width=True)
     
+    # Display metrics table
+    st.markdown("#### Business Type Metrics Table")
+    st.dataframe(display_df, use_container_width=True)
+
+@cached_view
+def build_business_type_performance():
+    """Build the business type radar chart and the formatted metrics table."""
     # Calculate metrics by business type
     business_metrics = defaultdict(lambda: {"leads": 0, "deals": 0, "won_deals": 0, "total_value": 0})
     
-    # Count leads by business type
+    # Count leads by business type, indexing the leads by id for the deals
+    leads_by_id = {}
     for lead in st.session_state.leads:
+        leads_by_id.setdefault(lead.get("id"), lead)
         business_type = lead.get("business_type", "Unknown")
         if business_type and business_type != "Unknown":
             business_metrics[business_type]["leads"] += 1
@@ -791,7 +869,7 @@ def create_business_type_performance():
         # Find the lead for this deal
         lead_id = deal.get("lead_id")
         if lead_id:
-            lead = next((l for l in st.session_state.leads if l.get("id") == lead_id), None)
+            lead = leads_by_id.get(lead_id)
             if lead:
                 business_type = lead.get("business_type", "Unknown")
                 if business_type and business_type != "Unknown":
@@ -879,19 +957,14 @@ def create_business_type_performance():
         height=500
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Display metrics table
-    st.markdown("#### Business Type Metrics Table")
-    
     # Format the dataframe for display
     display_df = df_metrics.copy()
     display_df["Conversion Rate"] = display_df["Conversion Rate"].round(2).astype(str) + "%"
     display_df["Win Rate"] = display_df["Win Rate"].round(2).astype(str) + "%"
     display_df["Total Value"] = display_df["Total Value"].apply(lambda x: f"₹{x:,.2f}")
     display_df["Avg Deal Value"] = display_df["Avg Deal Value"].apply(lambda x: f"₹{x:,.2f}")
-    
-    st.dataframe(display_df, use_container_width=True)
+
+    return fig, display_df
 
 # Test function
 if __name__ == "__main__":
@@ -0,0 +1,553 @@
+"""
+Client Packages Module
+
+This module builds the per-school product packages (product information sheet plus
+brochures) for the EduRishi Sales Assistant application. Packages for many schools can
+be built in parallel with a thread pool, and schools whose package inputs have not
+changed since the last build are skipped.
+
+Brochures are stored once in a content-addressed store and linked into each package
+folder (hardlink, reflink or symlink, falling back to a plain copy), so thousands of
+packages do not each carry their own copy of the same PDFs.
+
+Packages can be exported as a ZIP archive that is generated on the fly, entry by
+entry, and read as a stream or written chunk by chunk to a temporary file, so the
+whole archive is never held in memory while it is built.
+"""
+
+import errno
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl is not available on Windows, so reflinks are skipped there
+    fcntl = None
+
+# Default output directory for client packages
+PACKAGE_ROOT = "client_packages"
+
+# File inside each package folder holding the fingerprint of its last build
+FINGERPRINT_FILE = ".package_fingerprint"
+
+# Content-addressed brochure store shared by all package folders
+BROCHURE_STORE = os.path.join(PACKAGE_ROOT, ".brochure_store")
+
+# Linux ioctl request number for cloning a file's extents (reflink)
+FICLONE = 0x40049409
+
+# Digests of brochures already added to a store, keyed by (store, path, size, mtime)
+_stored_brochures = {}
+_stored_brochures_lock = threading.Lock()
+
+# Link methods in order of preference; a method the filesystem does not support is not tried again
+_link_methods = ["hardlink", "reflink", "symlink"]
+_link_methods_lock = threading.Lock()
+
+# Errors meaning a link method is not supported here (other errors only fail that one link)
+UNSUPPORTED_LINK_ERRORS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOSYS, errno.ENOTTY}
+
+# Size of the chunks read from package files while streaming a ZIP export
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# File types that are already compressed and are stored in ZIP exports as-is
+PRECOMPRESSED_EXTENSIONS = {".pdf", ".zip", ".png", ".jpg", ".jpeg", ".gif", ".mp4", ".gz"}
+
+
+def get_package_dir(customer_data, output_dir=PACKAGE_ROOT):
+    """Get the package folder for a customer."""
+    customer_name = str(customer_data.get("name", "Unknown"))
+    return os.path.join(output_dir, customer_name.replace(" ", "_"))
+
+
+def compute_package_fingerprint(customer_data, recommendations):
+    """Compute a fingerprint of everything that ends up in a customer's package."""
+    brochures = []
+    for product in recommendations:
+        brochure_path = product.get("brochure")
+        if brochure_path and os.path.exists(brochure_path):
+            stat = os.stat(brochure_path)
+            brochures.append([brochure_path, stat.st_size, stat.st_mtime_ns])
+
+    payload = {
+        "customer": customer_data,
+        "recommendations": recommendations,
+        "brochures": brochures
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def is_package_current(school_dir, fingerprint):
+    """Check whether a package folder was already built from the same inputs."""
+    fingerprint_path = os.path.join(school_dir, FINGERPRINT_FILE)
+    if not os.path.exists(os.path.join(school_dir, "product_information.txt")):
+        return False
+    try:
+        with open(fingerprint_path, "r", encoding="utf-8") as f:
+            return f.read().strip() == fingerprint
+    except OSError:
+        return False
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Get the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_brochure(brochure_path, store_dir=BROCHURE_STORE):
+    """Add a brochure to the content-addressed store and return its stored path.
+
+    The file is only hashed again when its size or modification time changes.
+    """
+    stat = os.stat(brochure_path)
+    cache_key = (store_dir, os.path.abspath(brochure_path), stat.st_size, stat.st_mtime_ns)
+
+    with _stored_brochures_lock:
+        stored_path = _stored_brochures.get(cache_key)
+    if stored_path and os.path.exists(stored_path):
+        return stored_path
+
+    extension = os.path.splitext(brochure_path)[1]
+    stored_path = os.path.join(store_dir, hash_file(brochure_path) + extension)
+
+    if not os.path.exists(stored_path):
+        os.makedirs(store_dir, exist_ok=True)
+        # Copy to a temporary name first so other threads never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copy2(brochure_path, temp_path)
+            os.replace(temp_path, stored_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    with _stored_brochures_lock:
+        _stored_brochures[cache_key] = stored_path
+    return stored_path
+
+
+def _reflink(source_path, dest_path):
+    """Clone a file with the FICLONE ioctl (copy-on-write filesystems only)."""
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    try:
+        with open(source_path, "rb") as source, open(dest_path, "wb") as dest:
+            fcntl.ioctl(dest.fileno(), FICLONE, source.fileno())
+    except OSError:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+
+def link_brochure(stored_path, dest_path):
+    """Place a stored brochure at dest_path without copying its contents if possible.
+
+    Returns the method used: "existing", "hardlink", "reflink", "symlink" or "copy".
+    """
+    if os.path.lexists(dest_path):
+        if os.path.exists(dest_path) and os.path.samefile(stored_path, dest_path):
+            return "existing"
+        os.remove(dest_path)
+
+    with _link_methods_lock:
+        methods = list(_link_methods)
+
+    for method in methods:
+        try:
+            if method == "hardlink":
+                os.link(stored_path, dest_path)
+            elif method == "reflink":
+                _reflink(stored_path, dest_path)
+            else:
+                os.symlink(os.path.abspath(stored_path), dest_path)
+            return method
+        except OSError as error:
+            # Do not retry a method this filesystem does not support; other errors
+            # (too many links, a full disk) only make this link fall back
+            if error.errno in UNSUPPORTED_LINK_ERRORS:
+                with _link_methods_lock:
+                    if method in _link_methods:
+                        _link_methods.remove(method)
+
+    shutil.copy2(stored_path, dest_path)
+    return "copy"
+
+
+def write_client_package(customer_data, recommendations, output_dir=PACKAGE_ROOT, force=False,
+                         dedupe_brochures=True):
+    """Write a customer's package folder.
+
+    Brochures are linked from the brochure store inside output_dir unless
+    dedupe_brochures is False, in which case each package gets its own copy.
+
+    Returns a tuple of (school_dir, written); written is False when the package was
+    already up to date and nothing had to be rewritten.
+    """
+    customer_name = customer_data.get('name', 'Unknown')
+    school_dir = get_package_dir(customer_data, output_dir)
+
+    fingerprint = compute_package_fingerprint(customer_data, recommendations)
+    if not force and is_package_current(school_dir, fingerprint):
+        return school_dir, False
+
+    os.makedirs(school_dir, exist_ok=True)
+
+    # Generate product information file
+    info_file = os.path.join(school_dir, "product_information.txt")
+    with open(info_file, "w", encoding="utf-8") as f:
+        f.write(f"EduRishi Product Information for {customer_name}\n")
+        f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+
+        f.write("Contact Information:\n")
+        if "contact_person" in customer_data:
+            f.write(f"Contact Person: {customer_data.get('contact_person', 'N/A')}\n")
+        if "phone" in customer_data:
+            f.write(f"Phone: {customer_data.get('phone', 'N/A')}\n")
+        if "email" in customer_data:
+            f.write(f"Email: {customer_data.get('email', 'N/A')}\n\n")
+
+        f.write("Products of Interest:\n")
+        if "product_interested" in customer_data and not pd.isna(customer_data["product_interested"]):
+            f.write(f"Specifically interested in: {customer_data['product_interested']}\n\n")
+
+        f.write("Recommended Products:\n")
+        for product in recommendations:
+            f.write(f"- {product['name']}\n")
+            f.write(f"  Description: {product['description']}\n")
+            if 'pricing' in product:
+                f.write(f"  Pricing: {product['pricing']}\n")
+            f.write(f"  Brochure: {product['brochure']}\n")
+            f.write(f"  Video: {product['video']}\n\n")
+
+        if "budget" in customer_data and not pd.isna(customer_data["budget"]):
+            f.write(f"\nBudget Information: {customer_data['budget']}\n")
+
+    # Add relevant brochures to the school directory
+    store_dir = os.path.join(output_dir, os.path.basename(BROCHURE_STORE))
+    for product in recommendations:
+        if "brochure" in product and product["brochure"]:
+            brochure_path = product["brochure"]
+            if os.path.exists(brochure_path):
+                if dedupe_brochures:
+                    stored_path = store_brochure(brochure_path, store_dir)
+                    link_brochure(stored_path, os.path.join(school_dir, os.path.basename(brochure_path)))
+                else:
+                    shutil.copy2(brochure_path, school_dir)
+
+    # Record the fingerprint last so an interrupted build is redone next time
+    with open(os.path.join(school_dir, FINGERPRINT_FILE), "w", encoding="utf-8") as f:
+        f.write(fingerprint)
+
+    return school_dir, True
+
+
+def build_client_packages(customers, recommend, output_dir=PACKAGE_ROOT, max_workers=None,
+                          force=False, progress_callback=None, dedupe_brochures=True):
+    """Build packages for many customers in parallel.
+
+    customers is an iterable of customer dicts (or a DataFrame), and recommend is the
+    function returning the product recommendations for a customer. progress_callback,
+    if given, is called as progress_callback(done, total) from the calling thread after
+    each package finishes.
+    """
+    if isinstance(customers, pd.DataFrame):
+        customers = customers.to_dict("records")
+
+    # Customers sharing a package folder would race on the same files, so only the
+    # last one is built, which matches what a serial build leaves on disk
+    jobs = {}
+    for customer_data in customers:
+        if customer_data:
+            jobs[get_package_dir(customer_data, output_dir)] = customer_data
+
+    summary = {
+        "total": len(jobs),
+        "generated": 0,
+        "skipped": 0,
+        "failed": [],
+        "elapsed": 0.0
+    }
+
+    start_time = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+
+    def build_one(customer_data):
+        return write_client_package(customer_data, recommend(customer_data), output_dir, force,
+                                    dedupe_brochures)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(build_one, customer_data): school_dir
+                   for school_dir, customer_data in jobs.items()}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                _, written = future.result()
+                if written:
+                    summary["generated"] += 1
+                else:
+                    summary["skipped"] += 1
+            except Exception as e:
+                summary["failed"].append({"package": futures[future], "error": str(e)})
+
+            if progress_callback:
+                progress_callback(done, summary["total"])
+
+    summary["elapsed"] = time.perf_counter() - start_time
+    return summary
+
+
+def list_client_packages(output_dir=PACKAGE_ROOT):
+    """Get the names of the package folders that have been built."""
+    if not os.path.isdir(output_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(output_dir)
+        if not name.startswith(".") and os.path.isdir(os.path.join(output_dir, name))
+    )
+
+
+class _ChunkBuffer:
+    """Write-only, non-seekable file object that collects what zipfile writes."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_packages_zip(school_dirs, chunk_size=STREAM_CHUNK_SIZE):
+    """Generate a ZIP archive of package folders as a stream of byte chunks.
+
+    Entries are written one chunk at a time, so memory use stays around chunk_size no
+    matter how large the export is. Already-compressed files such as PDFs are stored
+    without compression; everything else is deflated.
+    """
+    buffer = _ChunkBuffer()
+
+    # zipfile sees the buffer is not seekable and writes data descriptors after each
+    # entry instead of going back to patch the local headers
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for school_dir in school_dirs:
+            folder_name = os.path.basename(os.path.normpath(school_dir))
+            for file_name in sorted(os.listdir(school_dir)):
+                file_path = os.path.join(school_dir, file_name)
+                if file_name == FINGERPRINT_FILE or not os.path.isfile(file_path):
+                    continue
+
+                info = zipfile.ZipInfo.from_file(file_path, f"{folder_name}/{file_name}")
+                if os.path.splitext(file_name)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+
+                force_zip64 = info.file_size >= zipfile.ZIP64_LIMIT
+                with open(file_path, "rb") as source, archive.open(info, "w", force_zip64=force_zip64) as entry:
+                    for chunk in iter(lambda: source.read(chunk_size), b""):
+                        entry.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+
+                data = buffer.drain()
+                if data:
+                    yield data
+
+    # Central directory
+    data = buffer.drain()
+    if data:
+        yield data
+
+
+class ZipExportStream(io.RawIOBase):
+    """Readable file object over iter_packages_zip, for APIs that expect a file."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def open_packages_zip(package_names, output_dir=PACKAGE_ROOT):
+    """Open a streaming ZIP export of the named package folders as a binary file."""
+    school_dirs = [os.path.join(output_dir, name) for name in package_names]
+    return io.BufferedReader(ZipExportStream(iter_packages_zip(school_dirs)), STREAM_CHUNK_SIZE)
+
+
+def packages_fingerprint(package_names, output_dir=PACKAGE_ROOT):
+    """Fingerprint of the named packages and their last builds, for reusing an export of them."""
+    digest = hashlib.sha256()
+    for name in package_names:
+        digest.update(name.encode("utf-8") + b"\0")
+        try:
+            with open(os.path.join(output_dir, name, FINGERPRINT_FILE), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def write_packages_zip(package_names, output_dir=PACKAGE_ROOT, dest_dir=None):
+    """Stream a ZIP export of the named packages into a temporary file and return its path.
+
+    The archive is written chunk by chunk; the caller removes the file when done with it.
+    """
+    descriptor, zip_path = tempfile.mkstemp(prefix="client_packages_", suffix=".zip", dir=dest_dir)
+    try:
+        with os.fdopen(descriptor, "wb") as dest, open_packages_zip(package_names, output_dir) as source:
+            shutil.copyfileobj(source, dest, STREAM_CHUNK_SIZE)
+    except BaseException:
+        os.remove(zip_path)
+        raise
+    return zip_path
+
+
+def benchmark_package_build(num_schools=10000, max_workers=None):
+    """Time package builds for synthetic schools.
+
+    Compares the original serial build with per-package brochure copies against
+    parallel builds using the brochure store, and reports the disk space used by each.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Brochures of roughly realistic size so copying is part of the measurement
+        brochure_dir = os.path.join(work_dir, "brochures")
+        os.makedirs(brochure_dir)
+        recommendations = []
+        for code in ["ELAP", "MDL", "PBL"]:
+            brochure_path = os.path.join(brochure_dir, f"{code}_Brochure.pdf")
+            with open(brochure_path, "wb") as f:
+                f.write(os.urandom(256 * 1024))
+            recommendations.append({
+                "code": code,
+                "name": code,
+                "description": f"{code} programme",
+                "brochure": brochure_path,
+                "video": "",
+                "pricing": "Contact for pricing"
+            })
+
+        customers = [
+            {
+                "name": f"School {i}",
+                "contact_person": f"Contact {i}",
+                "phone": f"98{i:08d}",
+                "email": f"school{i}@example.com",
+                "product_interested": "ELAP, MDL, PBL",
+                "budget": 100000 + i
+            }
+            for i in range(num_schools)
+        ]
+
+        def recommend(customer_data):
+            return recommendations
+
+        results = {}
+
+        serial_dir = os.path.join(work_dir, "serial")
+        start_time = time.perf_counter()
+        for customer_data in customers:
+            write_client_package(customer_data, recommend(customer_data), serial_dir,
+                                 dedupe_brochures=False)
+        results["serial_copy"] = time.perf_counter() - start_time
+
+        copy_dir = os.path.join(work_dir, "parallel_copy")
+        results["parallel_copy"] = build_client_packages(
+            customers, recommend, copy_dir, max_workers=max_workers,
+            dedupe_brochures=False)["elapsed"]
+
+        store_dir = os.path.join(work_dir, "parallel_store")
+        results["parallel_store"] = build_client_packages(
+            customers, recommend, store_dir, max_workers=max_workers)["elapsed"]
+        results["unchanged_rebuild"] = build_client_packages(
+            customers, recommend, store_dir, max_workers=max_workers)["elapsed"]
+
+        disk_usage = {label: get_disk_usage(os.path.join(work_dir, label))
+                      for label in ["serial", "parallel_copy", "parallel_store"]}
+
+    return results, disk_usage
+
+
+def get_disk_usage(path):
+    """Get the bytes allocated on disk under a directory, counting hardlinks once."""
+    seen_inodes = set()
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.lstat(os.path.join(root, name))
+            if (stat.st_dev, stat.st_ino) in seen_inodes:
+                continue
+            seen_inodes.add((stat.st_dev, stat.st_ino))
+            total += getattr(stat, "st_blocks", 0) * 512 or stat.st_size
+    return total
+
+
+# Benchmark and export entry point
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmark or export client packages.")
+    parser.add_argument("--schools", type=int, default=10000, help="Number of synthetic schools")
+    parser.add_argument("--workers", type=int, default=None, help="Thread pool size")
+    parser.add_argument("--export", nargs="*", metavar="PACKAGE",
+                        help="Stream a ZIP of the named packages (all if none given) to stdout")
+    args = parser.parse_args()
+
+    if args.export is not None:
+        for chunk in iter_packages_zip(
+                [os.path.join(PACKAGE_ROOT, name) for name in args.export or list_client_packages()]):
+            sys.stdout.buffer.write(chunk)
+        sys.exit(0)
+
+    timings, disk_usage = benchmark_package_build(args.schools, args.workers)
+    for label, seconds in timings.items():
+        print(f"{label:>18}: {seconds:8.2f}s ({args.schools / seconds:,.0f} schools/s)")
+    for label, size in disk_usage.items():
+        print(f"{label:>18}: {size / (1024 * 1024):10.1f} MiB on disk")
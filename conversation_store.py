@@ -0,0 +1,492 @@
+"""
+Conversation Store Module
+
+This module keeps the sales conversation log for the EduRishi Sales Assistant
+application. Every generated response is appended as one JSON line to a per-customer
+journal file, so saving a message costs the same no matter how long the history is.
+Writes are fsynced in batches, and a small index file records which journal belongs
+to which customer along with its record count and time range.
+
+ConversationStore keeps an in-memory index over the journals (by customer, by
+timestamp and a full-text index over enquiry and response text) that holds only byte
+offsets, so a search reads just the page of records it returns.
+"""
+
+import atexit
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+
+# Default directory for conversation journals
+CONVERSATION_DIR = "conversations"
+
+# Index file describing every journal in the directory
+INDEX_FILE = "index.json"
+
+# Timestamp format used in conversation records
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Words shorter than this are not put in the full-text index
+MIN_TOKEN_LENGTH = 2
+
+logger = logging.getLogger(__name__)
+
+
+def get_journal_name(customer_name):
+    """Get the journal file name for a customer."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", str(customer_name)).strip("_")[:60] or "customer"
+    # The hash keeps names that slugify the same way in separate files
+    digest = hashlib.sha1(str(customer_name).encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}.jsonl"
+
+
+def parse_record(line, journal_path, offset):
+    """The record on a journal line, or None (logged) when the line is not valid JSON."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        logger.warning("Skipping corrupt record in %s at byte %d", journal_path, offset)
+        return None
+
+
+class ConversationJournal:
+    """Append-only, per-customer JSONL conversation log.
+
+    Records are written and flushed immediately, but fsync is batched: journals are
+    synced once fsync_every records are pending or fsync_interval seconds have passed
+    since the last sync, whichever comes first. The index is rewritten on each sync,
+    merged with what other processes wrote to it.
+    """
+
+    def __init__(self, base_dir=CONVERSATION_DIR, fsync_every=16, fsync_interval=2.0, max_open_files=64):
+        self.base_dir = base_dir
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.max_open_files = max_open_files
+
+        self._lock = threading.RLock()
+        self._handles = OrderedDict()
+        self._dirty = set()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+        os.makedirs(base_dir, exist_ok=True)
+        self.index = self._load_index()
+
+        atexit.register(self.close)
+
+    # Index handling
+
+    def _index_path(self):
+        return os.path.join(self.base_dir, INDEX_FILE)
+
+    def _read_index(self):
+        """The index saved on disk, or None when it is missing or unreadable."""
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_index(self):
+        """Load the index, catching up with records and journals written after it was saved."""
+        index = self._read_index()
+        if index is None:
+            return self.rebuild_index()
+
+        for customer, entry in index.get("customers", {}).items():
+            journal_path = os.path.join(self.base_dir, entry["file"])
+            if os.path.exists(journal_path) and os.path.getsize(journal_path) != entry["bytes"]:
+                self._scan_journal(entry, journal_path)
+
+        # Journals created before their customer reached the index (a crash before the
+        # first sync, or another process's index write winning)
+        known = {entry["file"] for entry in index.get("customers", {}).values()}
+        unlisted = [file_name for file_name in sorted(os.listdir(self.base_dir))
+                    if file_name.endswith(".jsonl") and file_name not in known]
+        for file_name in unlisted:
+            located = self._index_journal(file_name)
+            if located is not None:
+                index.setdefault("customers", {})[located[0]] = located[1]
+        self.index = index
+        if unlisted:
+            self._write_index()
+        return index
+
+    def _scan_journal(self, entry, journal_path, end=None):
+        """Update an index entry with the records after its last known byte offset.
+
+        Scanning stops at byte end, if given, and before a partial last line (a torn
+        write, or a record another process is still writing). Corrupt lines are skipped.
+        """
+        with open(journal_path, "rb") as f:
+            f.seek(entry["bytes"])
+            for line in f:
+                if not line.endswith(b"\n") or (end is not None and entry["bytes"] + len(line) > end):
+                    break
+                record = parse_record(line, journal_path, entry["bytes"])
+                entry["bytes"] += len(line)
+                if record is None:
+                    continue
+                entry["count"] += 1
+                entry["first"] = entry["first"] or record.get("timestamp")
+                entry["last"] = record.get("timestamp")
+
+    def _index_journal(self, file_name):
+        """Scan a whole journal into a new index entry, returning (customer, entry) or None."""
+        journal_path = os.path.join(self.base_dir, file_name)
+        with open(journal_path, "rb") as f:
+            first_line = f.readline()
+        if not first_line.endswith(b"\n"):
+            return None
+        first_record = parse_record(first_line, journal_path, 0)
+        if first_record is None:
+            return None
+        entry = {"file": file_name, "count": 0, "first": None, "last": None, "bytes": 0}
+        self._scan_journal(entry, journal_path)
+        return first_record.get("customer"), entry
+
+    def rebuild_index(self):
+        """Rebuild the index by scanning every journal file."""
+        index = {"version": 1, "customers": {}}
+        for file_name in sorted(os.listdir(self.base_dir)):
+            if not file_name.endswith(".jsonl"):
+                continue
+            located = self._index_journal(file_name)
+            if located is not None:
+                index["customers"][located[0]] = located[1]
+        self.index = index
+        self._write_index()
+        return index
+
+    def _merge_saved_index(self):
+        """Take in entries other processes saved that are further along than ours."""
+        saved = self._read_index()
+        if saved is None:
+            return
+        customers = self.index["customers"]
+        for customer, saved_entry in saved.get("customers", {}).items():
+            journal_path = os.path.join(self.base_dir, saved_entry["file"])
+            # Entries for journals that were removed or cut short are dropped
+            if not os.path.exists(journal_path) or os.path.getsize(journal_path) < saved_entry["bytes"]:
+                continue
+            entry = customers.get(customer)
+            if entry is None:
+                customers[customer] = saved_entry
+            elif saved_entry["file"] == entry["file"] and saved_entry["bytes"] > entry["bytes"]:
+                entry.update(saved_entry)
+
+    def _write_index(self):
+        """Save the index, merged with the saved one, through a temporary file."""
+        self._merge_saved_index()
+        index_path = self._index_path()
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.base_dir, prefix=".index-", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(temporary_path, index_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    # Writing
+
+    def _get_handle(self, entry):
+        handle = self._handles.get(entry["file"])
+        if handle is not None:
+            self._handles.move_to_end(entry["file"])
+            return handle
+
+        journal_path = os.path.join(self.base_dir, entry["file"])
+        handle = open(journal_path, "ab")
+        if handle.tell() > entry["bytes"]:
+            # Records appended since the index was saved (by another process) are kept
+            self._scan_journal(entry, journal_path)
+            if handle.tell() > entry["bytes"]:
+                # A torn final write left by a crash; end its line so the next record
+                # starts on its own (the torn line is skipped as corrupt when read)
+                handle.write(b"\n")
+                handle.flush()
+                entry["bytes"] = handle.tell()
+        self._handles[entry["file"]] = handle
+
+        # Keep the number of open journals bounded
+        while len(self._handles) > self.max_open_files:
+            file_name, old_handle = self._handles.popitem(last=False)
+            if file_name in self._dirty:
+                old_handle.flush()
+                os.fsync(old_handle.fileno())
+                self._dirty.discard(file_name)
+            old_handle.close()
+        return handle
+
+    def append(self, record):
+        """Append a conversation record to its customer's journal and return the journal path."""
+        file_name, _, _ = self.append_located(record)
+        return os.path.join(self.base_dir, file_name)
+
+    def append_located(self, record):
+        """Append a conversation record and return its (file_name, offset, length)."""
+        customer = record.get("customer", "Unknown")
+        line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+        with self._lock:
+            entry = self.index["customers"].get(customer)
+            if entry is None:
+                entry = {"file": get_journal_name(customer), "count": 0, "first": None, "last": None, "bytes": 0}
+                self.index["customers"][customer] = entry
+
+            handle = self._get_handle(entry)
+            handle.write(line)
+            handle.flush()
+            # Appends land at the end of the file, after any records other processes added
+            offset = handle.tell() - len(line)
+            if offset > entry["bytes"]:
+                self._scan_journal(entry, os.path.join(self.base_dir, entry["file"]), end=offset)
+                entry["bytes"] = offset
+
+            entry["count"] += 1
+            entry["first"] = entry["first"] or record.get("timestamp")
+            entry["last"] = record.get("timestamp")
+            entry["bytes"] += len(line)
+
+            self._dirty.add(entry["file"])
+            self._pending += 1
+            if (self._pending >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self.sync()
+
+            return entry["file"], offset, len(line)
+
+    def sync(self):
+        """Fsync every journal with unsynced records and save the index."""
+        with self._lock:
+            for file_name in self._dirty:
+                handle = self._handles.get(file_name)
+                if handle is not None:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+            self._dirty.clear()
+            self._pending = 0
+            self._last_sync = time.monotonic()
+            self._write_index()
+
+    def close(self):
+        """Sync and close all open journals."""
+        with self._lock:
+            if self._handles:
+                self.sync()
+            for handle in self._handles.values():
+                handle.close()
+            self._handles.clear()
+
+    # Reading
+
+    def customers(self):
+        """Get the customers that have a journal."""
+        with self._lock:
+            return list(self.index["customers"].keys())
+
+    def iter_records(self, customer=None):
+        """Stream records one at a time, for one customer or for everyone."""
+        with self._lock:
+            entries = list(self.index["customers"].items())
+        for name, entry in entries:
+            if customer is not None and name != customer:
+                continue
+            journal_path = os.path.join(self.base_dir, entry["file"])
+            if not os.path.exists(journal_path):
+                continue
+            with open(journal_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if line.endswith(b"\n"):
+                        record = parse_record(line, journal_path, offset)
+                        if record is not None:
+                            yield record
+                    offset += len(line)
+
+    def iter_located(self):
+        """Stream every record with its (file_name, offset, length)."""
+        with self._lock:
+            entries = list(self.index["customers"].values())
+        for entry in entries:
+            journal_path = os.path.join(self.base_dir, entry["file"])
+            if not os.path.exists(journal_path):
+                continue
+            with open(journal_path, "rb") as f:
+                offset = 0
+                for line in f:
+                    if offset + len(line) > entry["bytes"] or not line.endswith(b"\n"):
+                        break
+                    record = parse_record(line, journal_path, offset)
+                    if record is not None:
+                        yield record, entry["file"], offset, len(line)
+                    offset += len(line)
+
+    def read_at(self, file_name, offset, length):
+        """Read the record stored at a known location in a journal."""
+        with open(os.path.join(self.base_dir, file_name), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def iter_jsonl(self, customer=None):
+        """Stream the raw JSONL bytes of the journals, for exports."""
+        with self._lock:
+            entries = list(self.index["customers"].items())
+        for name, entry in entries:
+            if customer is not None and name != customer:
+                continue
+            journal_path = os.path.join(self.base_dir, entry["file"])
+            if not os.path.exists(journal_path):
+                continue
+            with open(journal_path, "rb") as f:
+                # Only the part covered by the index, never a half-written record
+                remaining = entry["bytes"]
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 64 * 1024))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+
+def tokenize(text):
+    """Split text into lowercase words for the full-text index."""
+    return [token for token in re.findall(r"[a-z0-9]+", str(text).lower()) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def _format_timestamp(value):
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    return value
+
+
+class ConversationStore:
+    """Conversation journal plus an in-memory index for fast history queries.
+
+    The index keeps, per record, only its customer, timestamp and location in the
+    journal. Records are ordered by timestamp overall and per customer, and a
+    full-text index maps words in the enquiry and response to record ids.
+    """
+
+    def __init__(self, journal=None):
+        self.journal = journal or ConversationJournal()
+
+        self._lock = threading.RLock()
+        self._locations = []
+        self._customers = []
+        self._timeline = []
+        self._by_customer = defaultdict(list)
+        self._postings = defaultdict(set)
+        self._vocabulary = []
+
+        for record, file_name, offset, length in self.journal.iter_located():
+            self._index_record(record, (file_name, offset, length))
+
+    def _index_record(self, record, location):
+        record_id = len(self._locations)
+        customer = record.get("customer", "Unknown")
+        timestamp = record.get("timestamp") or ""
+
+        self._locations.append(location)
+        self._customers.append(customer)
+        bisect.insort(self._timeline, (timestamp, record_id))
+        bisect.insort(self._by_customer[customer], (timestamp, record_id))
+
+        text = f"{record.get('enquiry', '')} {record.get('response', '')}"
+        for token in set(tokenize(text)):
+            if token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+            self._postings[token].add(record_id)
+
+    def add(self, record):
+        """Save a record to the journal and index it; returns the journal path."""
+        with self._lock:
+            location = self.journal.append_located(record)
+            self._index_record(record, location)
+        return os.path.join(self.journal.base_dir, location[0])
+
+    def count(self):
+        """Get the number of indexed conversation records."""
+        return len(self._locations)
+
+    def customers(self):
+        """Get the customers with saved conversations, sorted by name."""
+        with self._lock:
+            return sorted(customer for customer, entries in self._by_customer.items() if entries)
+
+    def _match_text(self, text):
+        """Get the ids of records containing every word of text (last word as a prefix)."""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+
+        matches = []
+        for position, token in enumerate(tokens):
+            if position == len(tokens) - 1:
+                # Prefix match on the last word so results show up while typing
+                ids = set()
+                start = bisect.bisect_left(self._vocabulary, token)
+                for word in self._vocabulary[start:]:
+                    if not word.startswith(token):
+                        break
+                    ids |= self._postings[word]
+            else:
+                ids = self._postings.get(token, set())
+            matches.append(ids)
+
+        matches.sort(key=len)
+        result = set(matches[0])
+        for ids in matches[1:]:
+            result &= ids
+        return result
+
+    def query(self, customer=None, start=None, end=None, text=None, page=1, page_size=20, newest_first=True):
+        """Find conversation records, one page at a time.
+
+        start and end bound the timestamp (inclusive) and can be datetimes or
+        "%Y-%m-%d %H:%M:%S" strings; text must match every word. Returns a dict with
+        the page of records and the total number of matches.
+        """
+        start = _format_timestamp(start)
+        end = _format_timestamp(end)
+
+        with self._lock:
+            entries = self._by_customer.get(customer, []) if customer else self._timeline
+
+            # Narrow to the time range with binary search
+            low = bisect.bisect_left(entries, (start, -1)) if start else 0
+            high = bisect.bisect_right(entries, (end + "\uffff",)) if end else len(entries)
+            entries = entries[low:high]
+
+            text_ids = self._match_text(text) if text else None
+            if text_ids is not None:
+                entries = [entry for entry in entries if entry[1] in text_ids]
+
+            if newest_first:
+                entries = entries[::-1]
+
+            total = len(entries)
+            pages = max(1, -(-total // page_size))
+            page = min(max(1, page), pages)
+            page_entries = entries[(page - 1) * page_size:page * page_size]
+            locations = [self._locations[record_id] for _, record_id in page_entries]
+
+        records = [self.journal.read_at(*location) for location in locations]
+        return {
+            "records": records,
+            "total": total,
+            "page": page,
+            "pages": pages,
+            "page_size": page_size
+        }
@@ -0,0 +1,325 @@
+"""
+Dataset Builder Module
+
+This module builds synthetic CRM datasets (leads, deals, tasks, meetings and the activity
+log) for benchmarks and load tests. Leads come from generate_mock_leads_frame(), and the
+other tables are derived from them with realistic ratios and dates: a share of leads
+becomes deals spread over the pipeline stages, and tasks and meetings follow a lead's
+creation by a few days.
+
+Large datasets are split into shards built in parallel by a process pool. Every shard
+draws from its own stream spawned from one seed, so a dataset is reproducible for a
+given seed, shard count and reference date, and is written as one Parquet or CSV file
+per table and shard:
+
+    python dataset_builder.py --leads 10000000 --shards 64 --output fixtures/10m
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from indian_cities_data import format_categories, generate_mock_leads_frame, random_uuids
+
+# Tables the builder can write, in dependency order
+TABLES = ["leads", "deals", "tasks", "meetings", "activity"]
+
+# Share of leads that become deals, and the pipeline stages they are in
+DEAL_RATE = 0.3
+DEAL_STAGES = {
+    "Lead Qualification": 0.30,
+    "Needs Assessment": 0.22,
+    "Proposal/Price Quote": 0.16,
+    "Negotiation/Review": 0.10,
+    "Closed Won": 0.12,
+    "Closed Lost": 0.10
+}
+STAGE_PROBABILITIES = {
+    "Lead Qualification": 10,
+    "Needs Assessment": 30,
+    "Proposal/Price Quote": 50,
+    "Negotiation/Review": 70,
+    "Closed Won": 100,
+    "Closed Lost": 0
+}
+
+# Mean days from lead creation to deal creation
+DEAL_DELAY_DAYS = 7
+
+# Average tasks and meetings per lead
+TASKS_PER_LEAD = 0.8
+MEETINGS_PER_LEAD = 0.3
+
+TASK_TITLES = ["Follow up with ", "Send proposal to ", "Schedule demo for ", "Share brochure with ", "Call "]
+TASK_PRIORITIES = {"High": 0.2, "Medium": 0.5, "Low": 0.3}
+
+MEETING_TITLES = ["Meeting with ", "Product demo for ", "Proposal review with "]
+MEETING_DURATIONS = {"30 minutes": 0.4, "1 hour": 0.4, "1.5 hours": 0.1, "2 hours": 0.1}
+MEETING_LOCATIONS = ["Virtual (Zoom)", "Virtual (Teams)", "Virtual (Google Meet)", "Phone Call", "In-Person"]
+MEETING_TIMES = [f"{hour:02d}:{minute:02d}" for hour in range(9, 18) for minute in (0, 30)]
+
+FILE_FORMATS = ["parquet", "csv"]
+
+SECONDS_PER_DAY = 86400
+
+
+def _prefixed(prefixes, prefix_codes, names):
+    """Categorical of prefixes[prefix_code] + name per row (names is a Categorical)."""
+    labels = names.categories.tolist()
+    return format_categories(prefix_codes.astype(np.int64) * len(labels) + names.codes,
+                             lambda key: prefixes[key // len(labels)] + labels[key % len(labels)])
+
+
+def _choice(rng, weights, n):
+    """Categorical of n draws from a {label: weight} table."""
+    labels = list(weights)
+    probabilities = np.array(list(weights.values()))
+    return pd.Categorical.from_codes(rng.choice(len(labels), n, p=probabilities / probabilities.sum()), labels)
+
+
+def _offset(start, rng, low_days, high_days, limit=None):
+    """Timestamps a uniform number of days (with time of day) after start, capped at limit."""
+    seconds = rng.integers(int(low_days * SECONDS_PER_DAY), int(high_days * SECONDS_PER_DAY) + 1, len(start))
+    timestamps = start + seconds.astype("timedelta64[s]")
+    return np.minimum(timestamps, limit) if limit is not None else timestamps
+
+
+def build_tables(leads, seed=None, reference_date=None, history_days=365, tables=None):
+    """Build the CRM tables for one stream of leads as a dict of DataFrames.
+
+    seed can be anything numpy.random.default_rng() accepts, including a SeedSequence.
+    Every derived row references a lead of the same call, so separate calls (shards)
+    are independent.
+    """
+    tables = tables or TABLES
+    reference_date = reference_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    lead_seed, table_seed = seed.spawn(2)
+    rng = np.random.default_rng(table_seed)
+    now = np.datetime64(reference_date, "s")
+
+    # Every table is built even when only some are written, so the rows do not depend on the selection
+    lead_frame = generate_mock_leads_frame(leads, seed=lead_seed, reference_date=reference_date,
+                                           history_days=history_days)
+    created_dates = lead_frame["created_date"].array
+    lead_created = pd.to_datetime(created_dates.categories).to_numpy().astype("datetime64[s]")[created_dates.codes]
+    names = lead_frame["name"].array
+    lead_ids = lead_frame["id"].array
+    result = {"leads": lead_frame}
+
+    # Deals: a share of the leads, created some days after the lead
+    deal_leads = np.flatnonzero(rng.random(leads) < DEAL_RATE)
+    deal_count = len(deal_leads)
+    deal_created = np.minimum(lead_created[deal_leads] + (rng.exponential(DEAL_DELAY_DAYS, deal_count)
+                                                          * SECONDS_PER_DAY).astype("timedelta64[s]"), now)
+    stages = _choice(rng, DEAL_STAGES, deal_count)
+    deal_months = deal_created.astype("datetime64[M]")
+    month_codes, months = pd.factorize(deal_months)
+    month_labels = [pd.Timestamp(month).strftime("%b %Y") for month in months]
+    deal_names = names.take(deal_leads)
+    deal_name_labels = deal_names.categories.tolist()
+    deal_frame = pd.DataFrame({
+        "id": random_uuids(rng, deal_count),
+        "name": format_categories(
+            deal_names.codes.astype(np.int64) * len(month_labels) + month_codes,
+            lambda key: f"{deal_name_labels[key // len(month_labels)]} - {month_labels[key % len(month_labels)]}"
+        ),
+        "lead_id": lead_ids.take(deal_leads),
+        "lead_name": deal_names,
+        "amount": np.round(lead_frame["budget"].to_numpy()[deal_leads] * rng.uniform(0.6, 1.2, deal_count), -2),
+        "stage": stages,
+        "probability": np.array([STAGE_PROBABILITIES[stage] for stage in DEAL_STAGES])[stages.codes],
+        "created_date": deal_created,
+        "expected_close_date": _offset(deal_created, rng, 14, 90).astype("datetime64[D]"),
+        "products": lead_frame["product_interested"].array.take(deal_leads),
+        "owner": "Current User",
+        "last_activity": deal_created + ((now - deal_created).astype(np.int64) * rng.random(deal_count)).astype(
+            np.int64).astype("timedelta64[s]")
+    })
+    result["deals"] = deal_frame
+
+    # Tasks: a Poisson number per lead, due within two weeks of the lead's creation
+    task_leads = np.repeat(np.arange(leads), rng.poisson(TASKS_PER_LEAD, leads))
+    task_count = len(task_leads)
+    task_created = _offset(lead_created[task_leads], rng, 0, 2, now)
+    task_due = _offset(task_created, rng, 1, 14).astype("datetime64[D]")
+    # Most overdue tasks are done, a few upcoming ones already are
+    completed = rng.random(task_count) < np.where(task_due < now.astype("datetime64[D]"), 0.8, 0.1)
+    completed_date = np.where(completed, np.minimum(_offset(task_created, rng, 0, 14), now),
+                              np.datetime64("NaT", "s"))
+    task_frame = pd.DataFrame({
+        "id": random_uuids(rng, task_count),
+        "title": _prefixed(TASK_TITLES, rng.integers(0, len(TASK_TITLES), task_count), names.take(task_leads)),
+        "due_date": task_due,
+        "assigned_to": "Current User",
+        "related_to": lead_ids.take(task_leads),
+        "related_type": "lead",
+        "priority": _choice(rng, TASK_PRIORITIES, task_count),
+        "notes": "",
+        "status": pd.Categorical.from_codes(completed.astype(np.int8), ["Open", "Completed"]),
+        "created_date": task_created,
+        "completed_date": completed_date
+    })
+    result["tasks"] = task_frame
+
+    # Meetings: a Poisson number per lead, within a month of the lead's creation
+    meeting_leads = np.repeat(np.arange(leads), rng.poisson(MEETINGS_PER_LEAD, leads))
+    meeting_count = len(meeting_leads)
+    meeting_created = _offset(lead_created[meeting_leads], rng, 0, 3, now)
+    meeting_dates = _offset(meeting_created, rng, 1, 30).astype("datetime64[D]")
+    contacts = lead_frame["contact_person"].array.take(meeting_leads)
+    meeting_frame = pd.DataFrame({
+        "id": random_uuids(rng, meeting_count),
+        "title": _prefixed(MEETING_TITLES, rng.integers(0, len(MEETING_TITLES), meeting_count), names.take(meeting_leads)),
+        "date": meeting_dates,
+        "time": pd.Categorical.from_codes(rng.integers(0, len(MEETING_TIMES), meeting_count), MEETING_TIMES),
+        "duration": _choice(rng, MEETING_DURATIONS, meeting_count),
+        "attendees": pd.Categorical.from_codes(contacts.codes, [f"{name}, You" for name in contacts.categories]),
+        "location": pd.Categorical.from_codes(rng.integers(0, len(MEETING_LOCATIONS), meeting_count), MEETING_LOCATIONS),
+        "notes": "",
+        "related_to": lead_ids.take(meeting_leads),
+        "related_type": "lead",
+        "status": pd.Categorical.from_codes((meeting_dates < now.astype("datetime64[D]")).astype(np.int8),
+                                            ["Scheduled", "Completed"]),
+        "created_date": meeting_created
+    })
+    result["meetings"] = meeting_frame
+
+    # Activity log: one entry per created record and completed task, oldest first
+    if "activity" in tables:
+        events = [
+            ("New lead created: ", "lead_creation", lead_ids, names, lead_created),
+            ("New deal created: ", "deal_creation", deal_frame["id"].array, deal_frame["name"].array, deal_created),
+            ("New task created: ", "task_creation", task_frame["id"].array, task_frame["title"].array, task_created),
+            ("New meeting scheduled: ", "meeting_creation", meeting_frame["id"].array, meeting_frame["title"].array,
+             meeting_created),
+            ("Task completed: ", "task_completed", task_frame["id"].array[completed],
+             task_frame["title"].array[completed], completed_date[completed])
+        ]
+        activity = pd.concat([
+            pd.DataFrame({
+                "description": _prefixed([prefix], np.zeros(len(related), dtype=np.int64), related),
+                "type": activity_type,
+                "related_id": related_ids,
+                "related_name": related,
+                "timestamp": timestamps
+            })
+            for prefix, activity_type, related_ids, related, timestamps in events
+        ], ignore_index=True).sort_values("timestamp", kind="stable", ignore_index=True)
+        activity.insert(0, "id", random_uuids(rng, len(activity)))
+        activity["user"] = "Current User"
+        result["activity"] = activity
+
+    return {table: result[table] for table in tables}
+
+
+def _write_shard(task):
+    """Build one shard and write its tables; runs in a worker process."""
+    shard, leads, seed, reference_date, history_days, output, file_format, tables = task
+    frames = build_tables(leads, seed, reference_date, history_days, tables)
+    counts = {}
+    for table, frame in frames.items():
+        path = os.path.join(output, table, f"part-{shard:05d}.{file_format}")
+        if file_format == "parquet":
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+        counts[table] = len(frame)
+    return counts
+
+
+def build_dataset(output, leads, shards=None, workers=None, file_format="parquet", seed=42, reference_date=None,
+                  history_days=365, tables=None):
+    """Build a sharded dataset under output (one directory per table) and return its manifest.
+
+    The manifest, also written to output/manifest.json, records the parameters needed to
+    rebuild the same dataset and the row count of every table.
+    """
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unknown file format: {file_format}")
+    tables = tables or TABLES
+    unknown = [table for table in tables if table not in TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}")
+
+    workers = workers or os.cpu_count() or 1
+    shards = shards or workers
+    reference_date = reference_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for table in tables:
+        os.makedirs(os.path.join(output, table), exist_ok=True)
+
+    # Independent streams per shard, all spawned from one seed
+    streams = np.random.SeedSequence(seed).spawn(shards)
+    sizes = [len(part) for part in np.array_split(np.arange(leads), shards)]
+    tasks = [
+        (shard, size, streams[shard], reference_date, history_days, output, file_format, tables)
+        for shard, size in enumerate(sizes)
+    ]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_write_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_write_shard, tasks))
+    elapsed = time.perf_counter() - start
+
+    manifest = {
+        "seed": seed,
+        "leads": leads,
+        "shards": shards,
+        "format": file_format,
+        "reference_date": reference_date.isoformat(),
+        "history_days": history_days,
+        "rows": {table: sum(result[table] for result in results) for table in tables},
+        "build_seconds": round(elapsed, 3)
+    }
+    with open(os.path.join(output, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_table(output, table):
+    """Read all shards of a table written by build_dataset() into one DataFrame."""
+    with open(os.path.join(output, "manifest.json")) as f:
+        file_format = json.load(f)["format"]
+    directory = os.path.join(output, table)
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(f".{file_format}"))
+    read = pd.read_parquet if file_format == "parquet" else pd.read_csv
+    return pd.concat([read(path) for path in paths], ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a synthetic EduRishi CRM dataset for benchmarks.")
+    parser.add_argument("--leads", type=int, default=100000, help="number of leads (default: 100000)")
+    parser.add_argument("--output", default="fixtures", help="output directory (default: fixtures)")
+    parser.add_argument("--shards", type=int, help="number of shards (default: one per worker)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=FILE_FORMATS, default="parquet", help="file format (default: parquet)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--reference-date", type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+                        help="date the data is generated relative to, YYYY-MM-DD (default: today)")
+    parser.add_argument("--history-days", type=int, default=365, help="days of lead history (default: 365)")
+    parser.add_argument("--tables", default=",".join(TABLES), help=f"comma-separated tables (default: {','.join(TABLES)})")
+    args = parser.parse_args()
+
+    try:
+        manifest = build_dataset(
+            args.output, args.leads, shards=args.shards, workers=args.workers, file_format=args.format,
+            seed=args.seed, reference_date=args.reference_date, history_days=args.history_days,
+            tables=[table.strip() for table in args.tables.split(",") if table.strip()]
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    total = sum(manifest["rows"].values())
+    print(f"Wrote {total:,} rows in {manifest['shards']} shards to {args.output} in {manifest['build_seconds']:.2f}s "
+          f"({total / manifest['build_seconds']:,.0f} rows/s)")
+    for table, rows in manifest["rows"].items():
+        print(f"  {table:10s} {rows:>12,}")
@@ -27,7 +27,8 @@ import io
 import calendar
 import pytz
 import re
-from collections import defaultdict, Counter
+import logging
+from collections import defaultdict, Counter, deque
 import plotly.graph_objects as go
 import plotly.express as px
 import plotly.graph_objects as go
@@ -41,7 +42,8 @@ try:
         create_dashboard_tabs,
         create_city_distribution_tab,
         create_business_type_tab,
-        create_lead_analytics_tab
+        create_lead_analytics_tab,
+        get_recent_activities
     )
 except ImportError:
     st.error("Could not import city_business_dashboard module. Please ensure it's in the same directory.")
@@ -59,6 +61,9 @@ except ImportError:
     def create_lead_analytics_tab():
         st.warning("Lead analytics not available.")
 
+    def get_recent_activities(limit=5):
+        return sorted(st.session_state.activity_log, key=lambda x: x["timestamp"], reverse=True)[:limit]
+
 # Import the Indian cities data module
 try:
     from indian_cities_data import (
@@ -69,7 +74,16 @@ try:
         generate_leads_by_city,
         generate_leads_by_business_type,
         generate_mock_lead,
-        fetch_leads_from_external_source
+        fetch_leads_from_external_source,
+        STATE_OPTIONS,
+        STATE_CITIES,
+        CITY_OPTIONS,
+        BUSINESS_TYPE_OPTIONS,
+        BUSINESS_SUBCATEGORIES,
+        SUBCATEGORY_OPTIONS,
+        resolve_city,
+        resolve_state,
+        get_state_for_city
     )
 except ImportError:
     st.error("Could not import indian_cities_data module. Please ensure it's in the same directory.")
@@ -99,6 +113,341 @@ except ImportError:
     def fetch_leads_from_external_source(city=None, state=None, business_type=None, count=10):
         return []
 
+    STATE_OPTIONS = ("Maharashtra", "Delhi")
+    STATE_CITIES = {"Maharashtra": ("Mumbai",), "Delhi": ("Delhi",)}
+    CITY_OPTIONS = ("Delhi", "Mumbai")
+    BUSINESS_TYPE_OPTIONS = ("Educational", "Industrial")
+    BUSINESS_SUBCATEGORIES = {"Educational": ("Schools", "Colleges"), "Industrial": ("Manufacturing",)}
+    SUBCATEGORY_OPTIONS = ("Colleges", "Manufacturing", "Schools")
+
+    def resolve_city(name):
+        return None
+
+    def resolve_state(name):
+        return None
+
+    def get_state_for_city(city):
+        return None
+
+# Import the client packages module
+try:
+    from client_packages import (
+        write_client_package,
+        build_client_packages,
+        list_client_packages,
+        open_packages_zip,
+        packages_fingerprint,
+        write_packages_zip
+    )
+except ImportError:
+    st.error("Could not import client_packages module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails
+    def write_client_package(customer_data, recommendations, output_dir="client_packages", force=False,
+                             dedupe_brochures=True):
+        return None, False
+
+    def build_client_packages(customers, recommend, output_dir="client_packages", max_workers=None,
+                              force=False, progress_callback=None, dedupe_brochures=True):
+        return {"total": 0, "generated": 0, "skipped": 0, "failed": [], "elapsed": 0.0}
+
+    def list_client_packages(output_dir="client_packages"):
+        return []
+
+    def open_packages_zip(package_names, output_dir="client_packages"):
+        return io.BytesIO()
+
+    def packages_fingerprint(package_names, output_dir="client_packages"):
+        return ""
+
+    def write_packages_zip(package_names, output_dir="client_packages", dest_dir=None):
+        return None
+
+# Import the conversation store module
+try:
+    from conversation_store import ConversationStore
+except ImportError:
+    st.error("Could not import conversation_store module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails
+    class _FallbackJournal:
+        def sync(self):
+            pass
+
+        def iter_jsonl(self, customer=None):
+            return iter(())
+
+    class ConversationStore:
+        def __init__(self):
+            self.journal = _FallbackJournal()
+
+        def add(self, record):
+            return None
+
+        def count(self):
+            return 0
+
+        def customers(self):
+            return []
+
+        def query(self, customer=None, start=None, end=None, text=None, page=1, page_size=20, newest_first=True):
+            return {"records": [], "total": 0, "page": 1, "pages": 1, "page_size": page_size}
+
+# Import the prompt builder module
+try:
+    from prompt_builder import (build_sales_prompt, build_personalization_prompt, prompt_size_report,
+                                compact_sales_history, estimate_tokens, HISTORY_TOKEN_BUDGET)
+except ImportError:
+    st.error("Could not import prompt_builder module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails
+    def build_sales_prompt(customer_data, enquiry_details, product_info, sales_history=""):
+        return f"Customer Data: {customer_data}\nEnquiry Details: {enquiry_details}\nRecommended Products: {product_info}\n{sales_history}"
+
+    def build_personalization_prompt(customer_data, enquiry_details, draft):
+        return f"Customer Data: {customer_data}\nEnquiry Details: {enquiry_details}\nPersonalize this draft: {draft}"
+
+    def prompt_size_report(customer_data, enquiry_details, product_info, sales_history="", count_tokens=None,
+                           history_token_budget=None):
+        return None
+
+    def compact_sales_history(sales_history, token_budget=None):
+        return sales_history
+
+    def estimate_tokens(text):
+        return len(str(text)) // 4
+
+    HISTORY_TOKEN_BUDGET = 600
+
+# Import the LLM call metrics module
+try:
+    from llm_metrics import LLMMetrics
+except ImportError:
+    st.error("Could not import llm_metrics module. Please ensure it's in the same directory.")
+
+    # Fallback definition if module import fails
+    class LLMMetrics:
+        def __init__(self, capacity=1000, on_record=None):
+            self.capacity = capacity
+
+        def track(self, model="", prompt_tokens=0):
+            import contextlib
+            return contextlib.nullcontext(type("Call", (), {"first_token": lambda self: None, "retry": lambda self: None,
+                                                            "prompt_tokens": prompt_tokens})())
+
+        def summary(self, percentiles=None):
+            return {"calls": 0}
+
+        def histogram(self, field, buckets=None):
+            return []
+
+        def export_json(self, include_calls=True):
+            return "{}"
+
+# Import the lead processing module
+try:
+    from lead_processing import (normalize_locations, classify_business_type, dedupe_leads, merge_lead_fields,
+                                 DUPLICATE_POLICIES)
+except ImportError:
+    st.error("Could not import lead_processing module. Please ensure it's in the same directory.")
+
+    DUPLICATE_POLICIES = ["keep"]
+
+    # Fallback definition if module import fails
+    def normalize_locations(frame, location_column="location"):
+        return frame
+
+    def dedupe_leads(frame, existing_leads=(), policy="keep", threshold=0.7):
+        return frame, {"rows": len(frame), "new": len(frame), "duplicates": 0, "within_import": 0,
+                       "matched_existing": 0, "updates": {}}
+
+    def merge_lead_fields(target, source, policy):
+        return []
+
+    def classify_business_type(profession, company_name=""):
+        return ""
+
+# Import the product catalog module
+try:
+    from product_catalog import (PRODUCT_CATALOG, PRODUCT_CATEGORIES, PRODUCT_BUNDLES, get_product,
+                                 get_products_in_category, resolve_product_codes)
+except ImportError:
+    st.error("Could not import product_catalog module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails
+    PRODUCT_CATALOG = {}
+    PRODUCT_CATEGORIES = {}
+    PRODUCT_BUNDLES = {}
+
+    def get_product(text):
+        return PRODUCT_CATALOG.get(str(text).strip())
+
+    def get_products_in_category(category):
+        return [(code, PRODUCT_CATALOG[code]) for code in PRODUCT_CATEGORIES.get(category, []) if code in PRODUCT_CATALOG]
+
+    def resolve_product_codes(text):
+        return [p.strip() for p in str(text or "").split(",") if p.strip() in PRODUCT_CATALOG]
+
+# Import the product recommendations module
+try:
+    from recommendations import Recommender
+except ImportError:
+    st.error("Could not import recommendations module. Please ensure it's in the same directory.")
+
+    # Fallback definition if module import fails
+    class Recommender:
+        def __init__(self, product_details=None):
+            self.product_details = product_details or PRODUCT_CATALOG
+
+        def recommend(self, customer_data):
+            codes = [p.strip() for p in str(customer_data.get("product_interested", "")).split(",")]
+            codes = [code for code in codes if code in self.product_details] or list(self.product_details)
+            return [dict(self.product_details[code], code=code) for code in codes[:3]]
+
+# Import the response cache module
+try:
+    from response_cache import SemanticResponseCache
+except ImportError:
+    st.error("Could not import response_cache module. Please ensure it's in the same directory.")
+
+    # Fallback definition if module import fails
+    class SemanticResponseCache:
+        def lookup(self, enquiry, product_interested, profession, threshold=None):
+            return None
+
+        def store(self, enquiry, product_interested, profession, response, latency=0.0):
+            pass
+
+        def record_saving(self, hit, latency):
+            return 0.0
+
+        def stats(self):
+            return {"lookups": 0, "hits": 0, "hit_rate": 0.0, "saved_latency": 0.0}
+
+# Import the resilient LLM client module
+try:
+    from llm_client import ResilientCaller, CircuitOpenError
+except ImportError:
+    st.error("Could not import llm_client module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails
+    class CircuitOpenError(Exception):
+        pass
+
+    class ResilientCaller:
+        def call(self, fn, *args, timeout=None, on_retry=None, **kwargs):
+            return fn(*args, **kwargs)
+
+# Import the rerun profiler module
+try:
+    from rerun_profiler import RerunProfiler, available_modes, mode_from_env, PROFILE_ENV_VAR
+except ImportError:
+    st.error("Could not import rerun_profiler module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails
+    import contextlib
+
+    PROFILE_ENV_VAR = "EDURISHI_PROFILE"
+
+    class RerunProfiler:
+        def __init__(self, history=50):
+            self.reruns = []
+            self.last_capture = None
+
+        def rerun(self, mode="timers"):
+            return contextlib.nullcontext(self)
+
+        def section(self, name):
+            return contextlib.nullcontext()
+
+        def timing_table(self):
+            return []
+
+        def clear(self):
+            pass
+
+    def available_modes():
+        return ["timers"]
+
+    def mode_from_env(environ=None):
+        return None
+
+# Import the view cache module
+try:
+    from view_cache import cached_view, bump_data_version
+except ImportError:
+    st.error("Could not import view_cache module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails: views are rebuilt on every rerun
+    def cached_view(function):
+        return function
+
+    def bump_data_version():
+        pass
+
+# Import the process metrics module
+try:
+    from app_metrics import MetricsRegistry, ActivityTracker
+except ImportError:
+    st.error("Could not import app_metrics module. Please ensure it's in the same directory.")
+
+    # Fallback definitions if module import fails
+    import contextlib
+
+    class _NullMetric:
+        def inc(self, amount=1, **labels):
+            pass
+
+        def set(self, value, **labels):
+            pass
+
+        def observe(self, value, **labels):
+            pass
+
+        def time(self, **labels):
+            return contextlib.nullcontext()
+
+        def set_function(self, function):
+            pass
+
+    class MetricsRegistry:
+        def __init__(self, namespace=""):
+            self.namespace = namespace
+
+        def counter(self, name, documentation, labelnames=()):
+            return _NullMetric()
+
+        def gauge(self, name, documentation, labelnames=()):
+            return _NullMetric()
+
+        def histogram(self, name, documentation, labelnames=(), buckets=None):
+            return _NullMetric()
+
+        def __getitem__(self, name):
+            return _NullMetric()
+
+        def collector(self, function):
+            return function
+
+        def render(self):
+            return ""
+
+        def write_textfile(self, path, min_interval=0):
+            return False
+
+        def serve(self, port, host="127.0.0.1"):
+            return None
+
+    class ActivityTracker:
+        def __init__(self, window=300):
+            self.window = window
+
+        def touch(self, key):
+            return False
+
+        def active(self):
+            return 0
+
 # Set page configuration
 st.set_page_config(
     page_title="EDURISHI Sales Assistant",
@@ -107,100 +456,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Global product details dictionary
-product_details = {
-    "ELAP": {
-        "name": "ELAP (Experiential Learning and Assessment Program)",
-        "description": "Comprehensive experiential learning program designed for schools",
-        "brochure": "EduRishi Final Brochures/ELAP_Brochure.pdf",
-        "pricing": "₹800 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=elapoverview"
-    },
-    "MDL": {
-        "name": "MDL (Multi-Dimensional Learning)",
-        "description": "Multi-dimensional approach to learning that enhances student engagement",
-        "brochure": "EduRishi Final Brochures/MDL_Brochure.pdf",
-        "pricing": "₹1,200 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=mdloverview"
-    },
-    "PBL": {
-        "name": "PBL (Project-Based Learning)",
-        "description": "Project-based learning methodology for practical skill development",
-        "brochure": "EduRishi Final Brochures/PBL_Brochure.pdf",
-        "pricing": "₹950 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=pbloverview"
-    },
-    "ICT": {
-        "name": "ICT (Information and Communication Technology)",
-        "description": "Technology integration in education for digital literacy",
-        "brochure": "EduRishi Final Brochures/ICT_Brochure.pdf",
-        "pricing": "₹1,500 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=ictoverview"
-    },
-    "AI Workshop": {
-        "name": "AI Workshop",
-        "description": "Hands-on workshops introducing artificial intelligence concepts",
-        "brochure": "AI_Workshop_Brochure.pdf",
-        "pricing": "₹15,000 per workshop (up to 30 participants)",
-        "video": "https://www.youtube.com/watch?v=aiworkshopoverview"
-    },
-    "LMS": {
-        "name": "Learning Management System",
-        "description": "Comprehensive platform for managing digital learning content",
-        "brochure": "LMS_Brochure.pdf",
-        "pricing": "₹25,000 per school (annual license)",
-        "video": "https://www.youtube.com/watch?v=lmsoverview"
-    },
-    "AI software": {
-        "name": "AI-Powered Educational Software",
-        "description": "Advanced software using AI to personalize learning experiences",
-        "brochure": "AI_Software_Brochure.pdf",
-        "pricing": "₹1,800 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=aisoftwareoverview"
-    },
-    "AI tutor": {
-        "name": "AI Tutor",
-        "description": "Virtual tutoring system powered by artificial intelligence",
-        "brochure": "AI_Tutor_Brochure.pdf",
-        "pricing": "₹1,200 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=aitutoroverview"
-    },
-    "Simulation": {
-        "name": "Educational Simulations",
-        "description": "Interactive simulations for science, math, and other subjects",
-        "brochure": "Simulations_Brochure.pdf",
-        "pricing": "₹900 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=simulationsoverview"
-    },
-    "E2MP": {
-        "name": "E2MP (Education to Market Place)",
-        "description": "Program connecting education with real-world market skills",
-        "brochure": "E2MP_Brochure.pdf",
-        "pricing": "₹1,500 per student (annual subscription)",
-        "video": "https://www.youtube.com/watch?v=e2mpoverview"
-    },
-    "Franchise Proposal": {
-        "name": "EduRishi Franchise Opportunity",
-        "description": "Become an EduRishi franchise partner and expand educational reach",
-        "brochure": "Franchise_Proposal.pdf",
-        "pricing": "Starting from ₹5,00,000 (investment)",
-        "video": "https://www.youtube.com/watch?v=franchiseoverview"
-    },
-    "Tech Franchise": {
-        "name": "Technology Franchise",
-        "description": "Franchise focused on technology education and AI integration",
-        "brochure": "Tech_Franchise_Brochure.pdf",
-        "pricing": "Starting from ₹7,50,000 (investment)",
-        "video": "https://www.youtube.com/watch?v=techfranchiseoverview"
-    },
-    "Entrepreneurship_Workshop": {
-        "name": "Entrepreneurship Workshop",
-        "description": "Workshops focused on developing entrepreneurial skills",
-        "brochure": "Entrepreneurship_Workshop_Brochure.pdf",
-        "pricing": "₹20,000 per workshop (up to 30 participants)",
-        "video": "https://www.youtube.com/watch?v=entrepreneurshipoverview"
-    }
-}
+# Product catalog shared by all sessions in the process
+product_details = PRODUCT_CATALOG
 
 # Custom CSS for enhanced UI
 st.markdown("""
@@ -482,7 +739,7 @@ if "sales_metrics" not in st.session_state:
         "responses_generated": 0,
         "conversations_saved": 0,
         "customers_engaged": set(),
-        "avg_response_time": []
+        "avg_response_time": deque(maxlen=100)
     }
 
 if "auth_token" not in st.session_state:
@@ -624,6 +881,10 @@ if "sales_pipeline" not in st.session_state:
 if "activity_log" not in st.session_state:
     st.session_state.activity_log = []
 
+# Section timings of this session's profiled reruns
+if "rerun_profiler" not in st.session_state:
+    st.session_state.rerun_profiler = RerunProfiler()
+
 # Function to securely configure API key
 def configure_api_key(api_key):
     """Configure the Gemini API with the provided key."""
@@ -649,93 +910,51 @@ def use_configured_api_key():
             return True
     return False
 
-# Function to generate product recommendations
-def generate_recommendations(customer_data):
-    """Generate product recommendations based on customer data."""
-    # product_details is already declared as global in the main function
-
-    recommendations = []
-
-    # EduRishi product catalog with detailed information based on Schools_Enquiry.csv
-    products = {
-        # School role-based recommendations from the CSV file
-        "School Relationship Manager": ["ELAP", "MDL", "PBL", "ICT", "AI tutor", "Simulation", "E2MP"],
-        "Admin Dept": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "LMS", "AI software", "AI tutor"],
-        "Admin Head": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "AI tutor", "Simulation", "Franchise Proposal"],
-        "CEO": ["AI software", "E2MP", "Franchise Proposal", "Tech Franchise", "Entrepreneurship_Workshop"],
-        "VC": ["AI tutor", "E2MP workshop", "E2MP software", "Simulations", "AI software"],
-
-        # Additional roles that might be in other CSV files
-        "Principal": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "Franchise Proposal", "Tech Franchise"],
-        "Teacher": ["ELAP", "PBL", "AI Workshop", "E2MP", "AI tutor", "Simulation"],
-        "IT Director": ["AI software", "LMS", "ICT", "Simulations", "E2MP software"],
-        "Academic Coordinator": ["ELAP", "MDL", "PBL", "AI tutor", "E2MP workshop"],
-
-        # Generic profession-based recommendations
-        "software_engineer": ["AI software", "E2MP software", "Entrepreneurship_Workshop"],
-        "marketing_manager": ["Digital Marketing Masterclass", "LMS", "Entrepreneurship_Workshop"],
-        "business_owner": ["AI software", "Entrepreneurship_Workshop", "Franchise Proposal"],
-        "education_consultant": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "LMS", "E2MP"]
+# Shared reference option lists, built once per process
+@st.cache_resource
+def get_reference_data():
+    """Get the selectbox option lists shared by all sessions in this process."""
+    return {
+        "states": ("All States",) + tuple(STATE_OPTIONS),
+        "cities": ("All Cities",) + tuple(CITY_OPTIONS),
+        "business_types": ("All Business Types",) + tuple(BUSINESS_TYPE_OPTIONS),
+        "subcategories": ("All Subcategories",) + tuple(SUBCATEGORY_OPTIONS),
+        "lead_states": ("",) + tuple(STATE_OPTIONS),
+        "lead_cities": {state: ("",) + tuple(cities) for state, cities in STATE_CITIES.items()},
+        "lead_business_types": ("",) + tuple(BUSINESS_TYPE_OPTIONS),
+        "lead_subcategories": {
+            business_type: ("",) + tuple(subcategories)
+            for business_type, subcategories in BUSINESS_SUBCATEGORIES.items()
+        },
+        "products": tuple(product_details)
     }
 
-    # Using the global product_details variable instead of redefining it here
+# Shared recommender, built once per process from the product catalog
+@st.cache_resource
+def get_recommender():
+    """Get the product recommender shared by all sessions in this process."""
+    return Recommender()
 
-    # Check if customer has specific product interests
-    if "product_interested" in customer_data and customer_data["product_interested"]:
-        interested_products = [p.strip() for p in str(customer_data["product_interested"]).split(",")]
-        for product in interested_products:
-            if product in product_details:
-                recommendations.append(product)
-    
-    # If no specific interests or not enough recommendations, check pitched products
-    if len(recommendations) < 3 and "product_pitched" in customer_data and customer_data["product_pitched"]:
-        pitched_products = [p.strip() for p in str(customer_data["product_pitched"]).split(",")]
-        for product in pitched_products:
-            if product in product_details and product not in recommendations:
-                recommendations.append(product)
-    
-    # If still not enough, use profession-based recommendations
-    if len(recommendations) < 3:
-        profession = customer_data.get("profession", "").lower().replace(" ", "_")
-        if profession in products:
-            for product in products[profession]:
-                if product not in recommendations:
-                    recommendations.append(product)
-    
-    # Add generic recommendations if needed
-    if len(recommendations) < 3:
-        generic_products = ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "AI_Tutor", "AI_Simulation", "AI_Integration_Workshop", "Entrepreneurship_Workshop"]
-        for product in generic_products:
-            if product not in recommendations:
-                recommendations.append(product)
-    
-    # Convert product codes to full names with descriptions
-    detailed_recommendations = []
-    for product_code in recommendations[:3]:  # Limit to top 3
-        if product_code in product_details:
-            detailed_recommendations.append({
-                "code": product_code,
-                "name": product_details[product_code]["name"],
-                "description": product_details[product_code]["description"],
-                "brochure": product_details[product_code]["brochure"],
-                "video": product_details[product_code]["video"],
-                "pricing": product_details[product_code].get("pricing", "Contact for pricing")
-            })
-        else:
-            detailed_recommendations.append({
-                "code": product_code,
-                "name": product_code,
-                "description": "Custom educational solution",
-                "brochure": "",
-                "video": "",
-                "pricing": "Contact for pricing"
-            })
-    
-    return detailed_recommendations
+# Function to generate product recommendations
+def generate_recommendations(customer_data):
+    """Generate product recommendations based on customer data."""
+    return get_recommender().recommend(customer_data)
+
+# Function to get the product summaries included in the prompt
+def get_prompt_product_info(customer_data):
+    """Get the recommended products for a customer in the form used by the prompt."""
+    product_info = []
+    for product in generate_recommendations(customer_data):
+        product_info.append({
+            "name": product["name"],
+            "description": product["description"],
+            "pricing": product.get("pricing", "Contact for pricing")
+        })
+    return product_info
 
 # Function to generate sales response
-def generate_sales_response(customer_data, enquiry_details, sales_history=""):
-    """Generate a personalized sales response using Gemini."""
+def generate_sales_response(customer_data, enquiry_details, sales_history="", history_token_budget=None, draft=None):
+    """Generate a personalized sales response using Gemini, or personalize a cached draft."""
     if not st.session_state.api_key_configured:
         return "Error: API key is not configured. Please configure it in the settings."
     
@@ -746,76 +965,43 @@ def generate_sales_response(customer_data, enquiry_details, sales_history=""):
     
     try:
         # Initialize the Gemini model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # Get product recommendations for this customer
-        recommended_products = generate_recommendations(customer_data)
-
-        # Extract product details for the prompt
-        product_info = []
-        for product in recommended_products:
-            product_info.append({
-                "name": product["name"],
-                "description": product["description"],
-                "pricing": product.get("pricing", "Contact for pricing")
-            })
-
-        # Construct the prompt
-        prompt = f"""
-        You are an AI sales agent for EDURISHI EDUVENTURES PVT LTD, an educational technology company.
-        Your task is to generate a personalized sales response based on the customer data and enquiry details provided.
-
-        ## Customer Data:
-        {json.dumps(customer_data, indent=2)}
-
-        ## Enquiry Details:
-        {enquiry_details}
-
-        ## Recommended Products:
-        {json.dumps(product_info, indent=2)}
-
-        """
-
-        if sales_history:
-            prompt += f"""
-            ## Previous Conversation History:
-            {sales_history}
-
-            Please continue the conversation based on this history.
-            """
-
-        # Add specific product information based on customer interests
-        if "product_interested" in customer_data and not pd.isna(customer_data["product_interested"]):
-            prompt += f"""
-            ## Products Customer Is Interested In:
-            The customer has expressed specific interest in: {customer_data["product_interested"]}
-            Focus your response on these products, highlighting their benefits for the customer's specific needs.
-            """
-
-        # Add budget information if available
-        if "budget" in customer_data and not pd.isna(customer_data["budget"]):
-            prompt += f"""
-            ## Budget Information:
-            The customer has indicated a budget of: {customer_data["budget"]}
-            Tailor your recommendations to align with this budget constraint.
-            """
-
-        prompt += """
-        ## Response Format:
-        1. Start with a friendly greeting using the customer's name.
-        2. Provide a brief summary of their enquiry to show understanding.
-        3. Create a tailored sales pitch based on their data (profession, interests, etc.).
-        4. Specifically mention the recommended EDURISHI EDUVENTURES PVT LTD's educational solutions that would benefit them.
-        5. If they have expressed interest in specific products, emphasize those products.
-        6. If they have budget constraints, acknowledge them and explain how our solutions provide value within their budget.
-        7. End with a clear call to action (schedule a call, visit website, etc.).
-
-        Make your response conversational, professional, and persuasive. Focus on how EDURISHI's educational products/services solve their specific needs.
-        """
-        
-        # Generate response
-        response = model.generate_content(prompt)
+        model_name = 'gemini-1.5-flash'
+        model = genai.GenerativeModel(model_name)
         
+        # Get product details for the prompt
+        product_info = get_prompt_product_info(customer_data)
+
+        # Construct the prompt, keeping long histories within the token budget
+        if draft:
+            prompt = build_personalization_prompt(customer_data, enquiry_details, draft)
+        else:
+            sales_history = compact_sales_history(sales_history, history_token_budget)
+            prompt = build_sales_prompt(customer_data, enquiry_details, product_info, sales_history)
+
+        # Generate response, streaming so the time to first token can be measured
+        with get_llm_metrics().track(model=model_name, prompt_tokens=estimate_tokens(prompt)) as call:
+            call.cache_hit = bool(draft)
+
+            def request_response():
+                response = model.generate_content(prompt, stream=True)
+                chunks = []
+                for chunk in response:
+                    call.first_token()
+                    chunks.append(chunk.text)
+                return response, "".join(chunks)
+
+            def count_retry(attempt, error, delay):
+                # The time to first token is taken from the attempt that succeeds
+                call.retry()
+
+            # Retry transient errors with backoff; fail fast while the backend is down
+            response, response_text = get_llm_caller().call(request_response, on_retry=count_retry)
+
+            # Use the token counts reported by the API when available
+            usage = getattr(response, "usage_metadata", None)
+            call.prompt_tokens = getattr(usage, "prompt_token_count", 0) or call.prompt_tokens
+            call.output_tokens = getattr(usage, "candidates_token_count", 0) or estimate_tokens(response_text)
+
         # Update metrics
         end_time = time.time()
         response_time = end_time - start_time
@@ -824,19 +1010,122 @@ def generate_sales_response(customer_data, enquiry_details, sales_history=""):
         if customer_data.get("name") not in st.session_state.sales_metrics["customers_engaged"]:
             st.session_state.sales_metrics["customers_engaged"].add(customer_data.get("name"))
         
-        return response.text
+        return response_text
     
+    except CircuitOpenError as e:
+        return f"Error: The AI service is temporarily unavailable. {str(e)}"
     except Exception as e:
         return f"Error generating response: {str(e)}"
 
-# Function to save conversation
-def save_conversation(customer_name, conversation):
-    """Save conversation history to a JSON file."""
-    os.makedirs("conversations", exist_ok=True)
-    filename = f"conversations/{customer_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+# Shared LLM call metrics, also fed into the process metrics
+@st.cache_resource
+def get_llm_metrics():
+    """Get the LLM call metrics shared by all sessions in this process."""
+    app_metrics = get_app_metrics()
+    return LLMMetrics(on_record=lambda call: record_llm_call(app_metrics, call))
+
+def record_llm_call(app_metrics, call):
+    """Add a recorded LLM call to the process metrics."""
+    outcome = "error" if call["error"] else "ok"
+    app_metrics["llm_call_duration_seconds"].observe(call["latency"], model=call["model"], outcome=outcome)
+    if not call["error"]:
+        app_metrics["llm_time_to_first_token_seconds"].observe(call["time_to_first_token"], model=call["model"])
+    app_metrics["llm_tokens_total"].inc(call["prompt_tokens"], direction="prompt")
+    app_metrics["llm_tokens_total"].inc(call["output_tokens"], direction="output")
+    app_metrics["llm_retries_total"].inc(call["retries"])
+
+# Shared cache of generated responses, used as drafts for near-identical enquiries
+@st.cache_resource
+def get_response_cache():
+    """Get the semantic response cache shared by all sessions in this process."""
+    return SemanticResponseCache()
+
+# Shared LLM caller, so the circuit breaker sees failures from every session
+@st.cache_resource
+def get_llm_caller():
+    """Get the resilient LLM caller shared by all sessions in this process."""
+    return ResilientCaller()
+
+# Shared conversation store
+@st.cache_resource
+def get_conversation_store():
+    """Get the conversation store shared by all sessions in this process."""
+    return ConversationStore()
+
+# Process metrics in the Prometheus text format, served on a local port and/or written to a file
+METRICS_PORT_ENV_VAR = "EDURISHI_METRICS_PORT"
+METRICS_HOST_ENV_VAR = "EDURISHI_METRICS_HOST"
+METRICS_FILE_ENV_VAR = "EDURISHI_METRICS_FILE"
+
+# Seconds between writes of the metrics file (sessions share one registry)
+METRICS_FILE_INTERVAL = 10
+
+logger = logging.getLogger(__name__)
+
+# Sessions with a rerun in the last five minutes
+@st.cache_resource
+def get_session_tracker():
+    """Get the tracker of active sessions shared by all sessions in this process."""
+    return ActivityTracker()
+
+@st.cache_resource
+def get_app_metrics():
+    """Get the process metrics registry shared by all sessions in this process."""
+    app_metrics = MetricsRegistry("edurishi")
+    app_metrics.histogram("rerun_duration_seconds", "Duration of app reruns",
+                          buckets=[0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30])
+    app_metrics.histogram("llm_call_duration_seconds", "Latency of LLM calls", ["model", "outcome"],
+                          buckets=[0.5, 1, 2, 4, 8, 16, 32, 64])
+    app_metrics.histogram("llm_time_to_first_token_seconds", "Time to the first streamed token of LLM calls", ["model"],
+                          buckets=[0.25, 0.5, 1, 2, 4, 8, 16])
+    app_metrics.counter("llm_tokens_total", "Tokens sent to and generated by the LLM", ["direction"])
+    app_metrics.counter("llm_retries_total", "Retried LLM calls")
+    app_metrics.counter("leads_created_total", "Leads created", ["operation"])
+    app_metrics.histogram("lead_import_duration_seconds", "Duration of bulk lead creation",
+                          buckets=[0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60])
+    app_metrics.histogram("store_operation_duration_seconds", "Latency of conversation store operations", ["operation"])
+    app_metrics.counter("sessions_started_total", "Browser sessions started")
+    app_metrics.gauge("active_sessions", "Sessions with a rerun in the last 5 minutes").set_function(
+        get_session_tracker().active)
+    app_metrics.gauge("process_start_time_seconds", "Start time of the process since the Unix epoch").set(time.time())
+
+    # Cache statistics are kept by the caches themselves and read at scrape time
+    response_cache = get_response_cache()
+    recommender = get_recommender()
+
+    def collect_cache_metrics():
+        cache_stats = response_cache.stats()
+        lookups = [({"cache": "response"}, cache_stats["lookups"])]
+        hits = [({"cache": "response"}, cache_stats["hits"])]
+        if hasattr(recommender, "cache_info"):
+            recommender_info = recommender.cache_info()
+            lookups.append(({"cache": "recommendations"}, recommender_info.hits + recommender_info.misses))
+            hits.append(({"cache": "recommendations"}, recommender_info.hits))
+        return [
+            ("cache_lookups_total", "counter", "Cache lookups", lookups),
+            ("cache_hits_total", "counter", "Cache hits", hits),
+            ("response_cache_saved_seconds_total", "counter", "Generation time saved by cached drafts",
+             [({}, cache_stats["saved_latency"])])
+        ]
+
+    app_metrics.collector(collect_cache_metrics)
+
+    port = os.environ.get(METRICS_PORT_ENV_VAR)
+    if port:
+        host = os.environ.get(METRICS_HOST_ENV_VAR, "127.0.0.1")
+        try:
+            app_metrics.serve(int(port), host)
+        except OSError as error:
+            # Another replica (or an earlier server of this one) holds the port; keep the metrics without an endpoint
+            logger.warning("Could not serve metrics on %s:%s: %s", host, port, error)
+    return app_metrics
 
-    with open(filename, 'w', encoding="utf-8") as f:
-        json.dump(conversation, f, indent=2, ensure_ascii=False)
+# Function to save conversation
+def save_conversation(customer_name, record):
+    """Append a conversation record to the customer's conversation journal."""
+    record = dict(record, customer=customer_name)
+    with get_app_metrics()["store_operation_duration_seconds"].time(operation="add"):
+        filename = get_conversation_store().add(record)
 
     # Update metrics
     st.session_state.sales_metrics["conversations_saved"] += 1
@@ -849,57 +1138,10 @@ def generate_client_package(customer_data):
     if not customer_data:
         return None
 
-    customer_name = customer_data.get('name', 'Unknown')
-
-    # Create output directory
-    output_dir = "client_packages"
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Create school-specific directory
-    school_dir = os.path.join(output_dir, customer_name.replace(" ", "_"))
-    os.makedirs(school_dir, exist_ok=True)
-
     # Get product recommendations
     recommendations = generate_recommendations(customer_data)
 
-    # Generate product information file
-    info_file = os.path.join(school_dir, "product_information.txt")
-    with open(info_file, "w", encoding="utf-8") as f:
-        f.write(f"EduRishi Product Information for {customer_name}\n")
-        f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-        f.write("Contact Information:\n")
-        if "contact_person" in customer_data:
-            f.write(f"Contact Person: {customer_data.get('contact_person', 'N/A')}\n")
-        if "phone" in customer_data:
-            f.write(f"Phone: {customer_data.get('phone', 'N/A')}\n")
-        if "email" in customer_data:
-            f.write(f"Email: {customer_data.get('email', 'N/A')}\n\n")
-
-        f.write("Products of Interest:\n")
-        if "product_interested" in customer_data and not pd.isna(customer_data["product_interested"]):
-            f.write(f"Specifically interested in: {customer_data['product_interested']}\n\n")
-
-        f.write("Recommended Products:\n")
-        for product in recommendations:
-            f.write(f"- {product['name']}\n")
-            f.write(f"  Description: {product['description']}\n")
-            if 'pricing' in product:
-                f.write(f"  Pricing: {product['pricing']}\n")
-            f.write(f"  Brochure: {product['brochure']}\n")
-            f.write(f"  Video: {product['video']}\n\n")
-
-        if "budget" in customer_data and not pd.isna(customer_data["budget"]):
-            f.write(f"\nBudget Information: {customer_data['budget']}\n")
-
-    # Copy relevant brochures to the school directory
-    for product in recommendations:
-        if "brochure" in product and product["brochure"]:
-            brochure_path = product["brochure"]
-            if os.path.exists(brochure_path):
-                import shutil
-                shutil.copy2(brochure_path, school_dir)
-
+    school_dir, _ = write_client_package(customer_data, recommendations)
     return school_dir
 
 # Function to generate customer insights
@@ -1118,8 +1360,16 @@ def format_currency(amount, currency_symbol="₹"):
     except (ValueError, TypeError):
         return f"{currency_symbol} 0.00"
 
-def create_new_lead(customer_data):
-    """Create a new lead from customer data."""
+# Lead fields an import can merge into an existing lead (the ones build_lead takes from customer data)
+IMPORTED_LEAD_FIELDS = {
+    "name", "email", "phone", "profession", "company", "location", "city", "state", "business_type",
+    "business_subcategory", "product_interested", "product_pitched", "budget", "notes", "tags", "email_opened",
+    "email_replied", "meetings_attended", "decision_timeline", "website", "social_media", "address", "pincode",
+    "contact_person"
+}
+
+def build_lead(customer_data, created_date=None):
+    """Build a lead record from customer data without adding it to the CRM."""
     # Generate a unique ID for the lead
     lead_id = str(uuid.uuid4())
 
@@ -1135,7 +1385,7 @@ def create_new_lead(customer_data):
     state = customer_data.get("state", "")
 
     # If location contains city and state but city/state fields are empty, try to extract them
-    if location and not (city and state):
+    if isinstance(location, str) and location and not (city and state):
         location_parts = location.split(",")
         if len(location_parts) >= 2:
             if not city:
@@ -1143,54 +1393,21 @@ def create_new_lead(customer_data):
             if not state:
                 state = location_parts[1].strip()
 
+    # Use the canonical city and state names (aliases are resolved; a misspelled city is kept as given)
+    city = resolve_city(city) or city
+    state = resolve_state(state) or state
+
     # If we have city but no state, try to find the state
     if city and not state:
-        for s, cities in get_all_cities().items():
-            if city in cities:
-                state = s
-                break
+        state = get_state_for_city(city) or ""
 
     # Extract business type information
     business_type = customer_data.get("business_type", "")
     business_subcategory = customer_data.get("business_subcategory", "")
 
-    # If no business type is provided, try to infer from profession or other fields
+    # If no business type is provided, try to infer from profession or company name
     if not business_type:
-        profession = customer_data.get("profession", "").lower()
-        company_name = customer_data.get("name", "").lower()
-
-        # Simple inference rules
-        if any(term in profession for term in ["principal", "teacher", "academic", "school", "college", "university", "education"]):
-            business_type = "Educational"
-        elif any(term in profession for term in ["engineer", "manufacturing", "production", "industrial"]):
-            business_type = "Industrial"
-        elif any(term in profession for term in ["editor", "publisher", "publication", "content", "media"]):
-            business_type = "Publishers"
-        elif any(term in profession for term in ["software", "tech", "it", "digital", "computer"]):
-            business_type = "Technology"
-        elif any(term in profession for term in ["doctor", "medical", "health", "hospital", "clinic"]):
-            business_type = "Healthcare"
-        elif any(term in profession for term in ["retail", "store", "shop", "sales", "merchant"]):
-            business_type = "Retail"
-        elif any(term in profession for term in ["government", "official", "public", "municipal", "department"]):
-            business_type = "Government"
-
-        # If still not determined, check company name
-        if not business_type:
-            if any(term in company_name for term in ["school", "college", "university", "academy", "institute", "education"]):
-                business_type = "Educational"
-            elif any(term in company_name for term in ["industry", "manufacturing", "factory", "production", "mill"]):
-                business_type = "Industrial"
-            elif any(term in company_name for term in ["publication", "press", "media", "publisher", "news"]):
-                business_type = "Publishers"
-            elif any(term in company_name for term in ["tech", "software", "digital", "computer", "it solutions"]):
-                business_type = "Technology"
-            elif any(term in company_name for term in ["hospital", "clinic", "medical", "healthcare", "pharmacy"]):
-                business_type = "Healthcare"
-            elif any(term in company_name for term in ["store", "retail", "shop", "mart", "supermarket"]):
-                business_type = "Retail"
-            elif any(term in company_name for term in ["government", "department", "ministry", "municipal", "corporation"]):
-                business_type = "Government"
+        business_type = classify_business_type(customer_data.get("profession", ""), customer_data.get("name", ""))
 
     # Determine source with more detail
     source = customer_data.get("source", "CSV Import")
@@ -1217,7 +1434,7 @@ def create_new_lead(customer_data):
         "score": lead_score,
         "status": lead_status,
         "status_color": lead_color,
-        "created_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "created_date": created_date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "last_contacted": None,
         "notes": customer_data.get("notes", ""),
         "tags": customer_data.get("tags", []),
@@ -1233,42 +1450,147 @@ def create_new_lead(customer_data):
         "contact_person": customer_data.get("contact_person", "")
     }
 
-    # Add to session state
-    st.session_state.leads.append(lead)
+    return lead
 
-    # Update city, state, and business type indexes
-    if city:
-        st.session_state.leads_by_city[city].append(lead_id)
-        st.session_state.lead_generation_stats["by_city"][city] += 1
+def register_leads(leads):
+    """Add built leads to session state, updating indexes and stats once per batch."""
+    by_city = defaultdict(list)
+    by_state = defaultdict(list)
+    by_business_type = defaultdict(list)
+    sources = Counter()
+
+    for lead in leads:
+        if lead["city"]:
+            by_city[lead["city"]].append(lead["id"])
+        if lead["state"]:
+            by_state[lead["state"]].append(lead["id"])
+        if lead["business_type"]:
+            by_business_type[lead["business_type"]].append(lead["id"])
+        sources[lead["source"]] += 1
 
-    if state:
-        st.session_state.leads_by_state[state].append(lead_id)
-        st.session_state.lead_generation_stats["by_state"][state] += 1
+    # Add to session state
+    st.session_state.leads.extend(leads)
+    bump_data_version()
 
-    if business_type:
-        st.session_state.leads_by_business_type[business_type].append(lead_id)
-        st.session_state.lead_generation_stats["by_business_type"][business_type] += 1
+    # Update city, state, and business type indexes
+    stats = st.session_state.lead_generation_stats
+    for index, counts, batch in [
+        (st.session_state.leads_by_city, stats["by_city"], by_city),
+        (st.session_state.leads_by_state, stats["by_state"], by_state),
+        (st.session_state.leads_by_business_type, stats["by_business_type"], by_business_type)
+    ]:
+        for key, lead_ids in batch.items():
+            index[key].extend(lead_ids)
+            counts[key] += len(lead_ids)
 
     # Update lead source stats
-    st.session_state.lead_sources[source] += 1
+    for source, count in sources.items():
+        st.session_state.lead_sources[source] += count
 
     # Update date stats
     today = datetime.now().strftime("%Y-%m-%d")
-    st.session_state.lead_generation_stats["by_date"][today] += 1
+    stats["by_date"][today] += len(leads)
 
     # Update total counts
-    if source == "Generated":
-        st.session_state.lead_generation_stats["total_generated"] += 1
-    elif source == "CSV Import":
-        st.session_state.lead_generation_stats["total_imported"] += 1
-    else:
-        st.session_state.lead_generation_stats["total_manual"] += 1
+    for source, count in sources.items():
+        if source == "Generated":
+            stats["total_generated"] += count
+        elif source == "CSV Import":
+            stats["total_imported"] += count
+        else:
+            stats["total_manual"] += count
+
+def create_new_lead(customer_data):
+    """Create a new lead from customer data."""
+    lead = build_lead(customer_data)
+    register_leads([lead])
+    get_app_metrics()["leads_created_total"].inc(operation="single")
 
     # Log activity
-    log_activity(f"New lead created: {lead['name']}", "lead_creation", lead_id)
+    log_activity(f"New lead created: {lead['name']}", "lead_creation", lead["id"])
 
     return lead
 
+def create_new_leads(customers, description=None):
+    """Create leads in bulk from a DataFrame or a list of customer dicts.
+
+    Indexes and stats are updated once for the whole batch and a single activity
+    entry summarizes it. Returns the created leads.
+    """
+    started = time.perf_counter()
+    if isinstance(customers, pd.DataFrame):
+        customers = customers.to_dict("records")
+
+    # One timestamp for the whole batch
+    created_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    leads = [build_lead(customer_data, created_date) for customer_data in customers]
+    if not leads:
+        return leads
+    register_leads(leads)
+
+    app_metrics = get_app_metrics()
+    app_metrics["leads_created_total"].inc(len(leads), operation="bulk")
+    app_metrics["lead_import_duration_seconds"].observe(time.perf_counter() - started)
+
+    # Log a single activity for the batch
+    if description is None:
+        sources = Counter(lead["source"] for lead in leads)
+        description = f"{len(leads)} new leads created ({', '.join(f'{source}: {count}' for source, count in sources.most_common())})"
+    log_activity(description, "lead_creation", related_name=f"{len(leads)} leads")
+
+    return leads
+
+def update_leads(updates, policy):
+    """Merge or update existing leads with imported fields, given as {lead id: fields}.
+
+    Only lead fields are taken from the imported values. Changed leads are re-scored and
+    moved in the city, state and business type indexes. Returns the changed leads.
+    """
+    leads_by_id = {lead["id"]: lead for lead in st.session_state.leads}
+    stats = st.session_state.lead_generation_stats
+    indexes = [
+        ("city", st.session_state.leads_by_city, stats["by_city"]),
+        ("state", st.session_state.leads_by_state, stats["by_state"]),
+        ("business_type", st.session_state.leads_by_business_type, stats["by_business_type"])
+    ]
+
+    updated = []
+    for lead_id, fields in updates.items():
+        lead = leads_by_id.get(lead_id)
+        if lead is None:
+            continue
+        previous = {field: lead.get(field) for field, _, _ in indexes}
+        fields = {field: value for field, value in fields.items() if field in IMPORTED_LEAD_FIELDS}
+        if not merge_lead_fields(lead, fields, policy):
+            continue
+
+        # The score depends on the budget, engagement, products and timeline
+        lead["score"] = calculate_lead_score(lead)
+        lead["status"], lead["status_color"] = get_lead_status(lead["score"])
+
+        # Move the lead in the indexes whose key changed
+        for field, index, counts in indexes:
+            old_key, new_key = previous[field], lead.get(field)
+            if old_key == new_key:
+                continue
+            if old_key:
+                if lead_id in index.get(old_key, []):
+                    index[old_key].remove(lead_id)
+                    if not index[old_key]:
+                        del index[old_key]
+                if counts.get(old_key, 0) > 1:
+                    counts[old_key] -= 1
+                else:
+                    counts.pop(old_key, None)
+            if new_key:
+                index[new_key].append(lead_id)
+                counts[new_key] += 1
+
+        updated.append(lead)
+        log_activity(f"Lead updated from import: {lead['name']}", "lead_update", lead_id)
+
+    return updated
+
 def create_deal(lead_data, deal_name=None, amount=None, stage="Lead Qualification"):
     """Create a new deal from lead data."""
     # Generate a unique ID for the deal
@@ -1396,8 +1718,9 @@ def log_activity(description, activity_type, related_id=None, related_name=None)
         "user": "Current User"
     }
 
-    # Add to session state
+    # Add to session state; every change to the CRM data is logged, so cached views are invalidated here
     st.session_state.activity_log.append(activity)
+    bump_data_version()
 
     return activity
 
@@ -1440,6 +1763,171 @@ def get_pipeline_summary():
 
     return summary
 
+@cached_view
+def get_dashboard_totals():
+    """Get the lead and deal counts, pipeline value and weighted forecast for the CRM Dashboard."""
+    deals = st.session_state.deals
+    return {
+        "leads": len(st.session_state.leads),
+        "deals": len(deals),
+        "pipeline_value": sum(deal.get("amount", 0) for deal in deals),
+        "forecast_value": sum(deal.get("amount", 0) * deal.get("probability", 0) / 100 for deal in deals)
+    }
+
+@cached_view
+def build_pipeline_view():
+    """Build the pipeline DataFrame and funnel figure for the CRM Dashboard."""
+    # Create sample data if no deals exist
+    if not st.session_state.deals:
+        # Add sample deals for demonstration
+        sample_stages = st.session_state.sales_pipeline["stages"]
+        sample_values = [random.randint(50000, 200000) for _ in range(len(sample_stages))]
+        sample_counts = [random.randint(1, 5) for _ in range(len(sample_stages))]
+
+        # Create a DataFrame for the sample data
+        pipeline_df = pd.DataFrame({
+            "Stage": sample_stages,
+            "Value": sample_values,
+            "Count": sample_counts
+        })
+
+        # Add formatted values
+        pipeline_df["Formatted Value"] = pipeline_df["Value"].apply(lambda x: format_currency(x))
+    else:
+        # Create a DataFrame from actual deals
+        pipeline_summary = get_pipeline_summary()
+        pipeline_df = pd.DataFrame([
+            {
+                "Stage": stage,
+                "Value": stage_summary["value"],
+                "Count": stage_summary["count"],
+                "Formatted Value": stage_summary["formatted_value"]
+            }
+            for stage, stage_summary in pipeline_summary["stages"].items()
+        ])
+
+    # Create a funnel chart for the pipeline
+    fig = go.Figure(go.Funnel(
+        y=pipeline_df["Stage"],
+        x=pipeline_df["Value"],
+        textinfo="value+percent initial",
+        textfont={"size": 14},
+        marker={"color": ["#1E88E5", "#42A5F5", "#64B5F6", "#90CAF9", "#BBDEFB", "#E3F2FD"]},
+        connector={"line": {"color": "royalblue", "dash": "dot", "width": 3}}
+    ))
+
+    fig.update_layout(
+        title="Deal Value by Stage",
+        height=400,
+        margin=dict(t=50, b=0, l=0, r=0)
+    )
+
+    return pipeline_df, fig
+
+@cached_view
+def build_lead_status_pie():
+    """Build the lead status pie chart for the CRM Dashboard."""
+    # Create sample data if no leads exist
+    if not st.session_state.leads:
+        # Sample lead statuses
+        statuses = ["Hot", "Warm", "Lukewarm", "Cool", "Cold"]
+        counts = [random.randint(1, 10) for _ in range(len(statuses))]
+        colors = ["#FF4500", "#FFA500", "#FFD700", "#87CEEB", "#ADD8E6"]
+    else:
+        # Count leads by status
+        status_counts = Counter(lead.get("status") for lead in st.session_state.leads)
+        statuses = list(status_counts.keys())
+        counts = list(status_counts.values())
+
+        # Get colors for each status
+        colors = []
+        for status in statuses:
+            if status == "Hot":
+                colors.append("#FF4500")
+            elif status == "Warm":
+                colors.append("#FFA500")
+            elif status == "Lukewarm":
+                colors.append("#FFD700")
+            elif status == "Cool":
+                colors.append("#87CEEB")
+            else:
+                colors.append("#ADD8E6")
+
+    # Create pie chart
+    fig = go.Figure(data=[go.Pie(
+        labels=statuses,
+        values=counts,
+        hole=.4,
+        marker_colors=colors
+    )])
+
+    fig.update_layout(
+        title="Lead Distribution by Status",
+        height=350,
+        margin=dict(t=50, b=0, l=0, r=0)
+    )
+
+    return fig
+
+@cached_view
+def build_monthly_forecast_figure():
+    """Build the potential and weighted deal value by close month chart for the CRM Dashboard."""
+    # Create sample forecast data if no deals exist
+    if not st.session_state.deals:
+        # Sample months for forecast
+        months = [(datetime.now() + timedelta(days=30*i)).strftime("%b %Y") for i in range(3)]
+        potential_values = [random.randint(100000, 300000) for _ in range(len(months))]
+        weighted_values = [v * random.uniform(0.3, 0.7) for v in potential_values]
+    else:
+        # Group deals by expected close month
+        forecast_data = {}
+        for deal in st.session_state.deals:
+            try:
+                close_date = datetime.strptime(deal.get("expected_close_date", ""), "%Y-%m-%d")
+                month_key = close_date.strftime("%b %Y")
+
+                if month_key not in forecast_data:
+                    forecast_data[month_key] = {"potential": 0, "weighted": 0}
+
+                amount = deal.get("amount", 0)
+                probability = deal.get("probability", 0) / 100
+
+                forecast_data[month_key]["potential"] += amount
+                forecast_data[month_key]["weighted"] += amount * probability
+            except (ValueError, TypeError):
+                continue
+
+        # Sort months chronologically
+        months = sorted(forecast_data.keys(), key=lambda x: datetime.strptime(x, "%b %Y"))
+        potential_values = [forecast_data[month]["potential"] for month in months]
+        weighted_values = [forecast_data[month]["weighted"] for month in months]
+
+    # Create the forecast chart
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=months,
+        y=potential_values,
+        name="Potential Value",
+        marker_color="#90CAF9"
+    ))
+
+    fig.add_trace(go.Bar(
+        x=months,
+        y=weighted_values,
+        name="Weighted Value",
+        marker_color="#1E88E5"
+    ))
+
+    fig.update_layout(
+        title="Forecast by Month",
+        height=350,
+        margin=dict(t=50, b=0, l=0, r=0),
+        barmode="group"
+    )
+
+    return fig
+
 def get_lead_summary():
     """Get a summary of leads by status."""
     summary = {
@@ -1455,6 +1943,29 @@ def get_lead_summary():
 
     return summary
 
+def search_leads(leads, search_term):
+    """Leads whose name, email or company contains the search term (case-insensitive)."""
+    if not search_term:
+        return leads
+    search_term = search_term.lower()
+    return [
+        lead for lead in leads
+        if search_term in lead.get("name", "").lower() or
+           search_term in lead.get("email", "").lower() or
+           search_term in lead.get("company", "").lower()
+    ]
+
+def search_deals(deals, search_term):
+    """Deals whose name or lead name contains the search term (case-insensitive)."""
+    if not search_term:
+        return deals
+    search_term = search_term.lower()
+    return [
+        deal for deal in deals
+        if search_term in deal.get("name", "").lower() or
+           search_term in deal.get("lead_name", "").lower()
+    ]
+
 def generate_forecast(deals, forecast_period=90):
     """Generate a sales forecast based on current deals."""
     today = datetime.now()
@@ -1563,10 +2074,57 @@ def hide_streamlit_style():
     """
     st.markdown(hide_st_style, unsafe_allow_html=True)
 
+# Profiling mode of this rerun: EDURISHI_PROFILE, or the sidebar toggle
+def get_profiling_mode():
+    """Get the profiling mode for this rerun, or None when profiling is off."""
+    env_mode = mode_from_env()
+    if env_mode:
+        return env_mode
+    if st.session_state.get("profile_reruns"):
+        return st.session_state.get("profile_mode", "timers")
+    return None
+
+# Labels of the profiling modes in the sidebar
+PROFILE_MODE_LABELS = {
+    "timers": "Section timers only",
+    "cprofile": "Timers + cProfile",
+    "pyinstrument": "Timers + pyinstrument"
+}
+
+def show_rerun_timings(rerun_profiler):
+    """Show the section timings of recent reruns and the last profile in the sidebar."""
+    timing_rows = rerun_profiler.timing_table()
+    if not timing_rows:
+        return
+
+    with st.sidebar.expander("⏱️ Rerun Timings", expanded=True):
+        last_rerun = rerun_profiler.reruns[-1]
+        st.caption(f"Last rerun {last_rerun['total']:.2f}s, {len(rerun_profiler.reruns)} reruns recorded")
+
+        timing_df = pd.DataFrame(timing_rows)
+        for column in ["last", "mean", "max"]:
+            timing_df[column] = (timing_df[column] * 1000).round(1)
+        timing_df["share"] = (timing_df["share"] * 100).round(1)
+        timing_df.columns = ["Section", "Last (ms)", "Mean (ms)", "Max (ms)", "Share (%)", "Reruns"]
+        st.dataframe(timing_df, hide_index=True, use_container_width=True)
+
+        capture = rerun_profiler.last_capture
+        if capture:
+            st.download_button(
+                label=f"Download Profile ({capture['mode']})",
+                data=capture["data"],
+                file_name=capture["file_name"],
+                mime=capture["mime"]
+            )
+            st.code(capture["text"], language=None)
+
+        if st.button("Clear Timings"):
+            rerun_profiler.clear()
+            st.rerun()
+
 # Main application
 def main():
-    # Declare product_details as global at the beginning of the main function
-    global product_details
+    rerun_profiler = st.session_state.rerun_profiler
 
     # Hide Streamlit branding
     hide_streamlit_style()
@@ -1579,7 +2137,7 @@ def main():
     st.markdown('<div class="info-box">Leverage AI to generate personalized sales responses and boost your conversion rates.</div>', unsafe_allow_html=True)
     
     # Sidebar for configuration and metrics
-    with st.sidebar:
+    with st.sidebar, rerun_profiler.section("Sidebar"):
         st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
 
         # Company name in sidebar
@@ -1640,6 +2198,60 @@ def main():
             if st.session_state.sales_metrics["avg_response_time"]:
                 avg_time = sum(st.session_state.sales_metrics["avg_response_time"]) / len(st.session_state.sales_metrics["avg_response_time"])
                 st.metric("Avg. Response Time", f"{avg_time:.2f}s")
+
+        # Per-call LLM metrics for all sessions
+        with st.expander("⏱️ LLM Call Metrics"):
+            llm_metrics = get_llm_metrics()
+            llm_summary = llm_metrics.summary()
+            if not llm_summary["calls"]:
+                st.info("No LLM calls recorded yet")
+            else:
+                st.caption(f"Last {llm_summary['calls']} of {llm_summary['total_calls']} calls")
+                col_a, col_b = st.columns(2)
+                col_a.metric("Error Rate", f"{llm_summary['error_rate']:.0%}")
+                col_b.metric("Retries", llm_summary["retries"])
+                col_a.metric("Cache Hits", f"{llm_summary['cache_hit_rate']:.0%}")
+                col_b.metric("Output Tokens", llm_summary["output_tokens"])
+
+                percentile_rows = pd.DataFrame(llm_summary["percentiles"]).T
+                st.dataframe(percentile_rows.round(2), use_container_width=True)
+
+                latency_histogram = pd.DataFrame(llm_metrics.histogram("latency"), columns=["Latency (s)", "Calls"])
+                st.bar_chart(latency_histogram.set_index("Latency (s)"))
+
+            # Drafts served from the response cache
+            cache_stats = get_response_cache().stats()
+            if cache_stats["lookups"]:
+                col_a, col_b = st.columns(2)
+                col_a.metric("Draft Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+                col_b.metric("Time Saved", f"{cache_stats['saved_latency']:.1f}s")
+
+            # Exports are serialized only in the rerun after "Prepare" is clicked, not on every rerun
+            if st.button("Prepare Metrics Export", key="prepare_metrics_export"):
+                st.download_button(
+                    label="Export Metrics (JSON)",
+                    data=llm_metrics.export_json(),
+                    file_name=f"llm_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                    mime="application/json"
+                )
+
+                # Process-wide metrics of all sessions, as Prometheus scrapes them
+                st.download_button(
+                    label="Export Process Metrics (Prometheus)",
+                    data=get_app_metrics().render(),
+                    file_name=f"edurishi_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prom",
+                    mime="text/plain"
+                )
+
+        # Opt-in profiling of reruns; the timings are shown at the end of the sidebar
+        with st.expander("🩺 Profiling"):
+            env_mode = mode_from_env()
+            if env_mode:
+                st.caption(f"Enabled for all sessions by {PROFILE_ENV_VAR} ({PROFILE_MODE_LABELS[env_mode]})")
+            else:
+                st.toggle("Profile reruns", key="profile_reruns")
+                st.selectbox("Capture", available_modes(), key="profile_mode",
+                             format_func=lambda mode: PROFILE_MODE_LABELS[mode])
         
         # CRM Notifications
         st.markdown('<div class="sub-header">CRM Notifications</div>', unsafe_allow_html=True)
@@ -1732,17 +2344,57 @@ def main():
             with st.spinner("Generating packages for all schools..."):
                 # Check if we have loaded data in session state
                 if 'df' in st.session_state and st.session_state.df is not None:
-                    packages_generated = 0
-                    for idx, row in st.session_state.df.iterrows():
-                        customer_data = row.to_dict()
-                        package_dir = generate_client_package(customer_data)
-                        if package_dir:
-                            packages_generated += 1
-
-                    st.markdown(f'<div class="success-box">Generated {packages_generated} client packages!</div>', unsafe_allow_html=True)
+                    progress_bar = st.progress(0.0, text="Building client packages...")
+
+                    def update_package_progress(done, total):
+                        progress_bar.progress(done / total, text=f"Built {done} of {total} packages")
+
+                    summary = build_client_packages(
+                        st.session_state.df,
+                        generate_recommendations,
+                        progress_callback=update_package_progress
+                    )
+                    progress_bar.empty()
+
+                    st.markdown(f'<div class="success-box">Generated {summary["generated"]} client packages '
+                                f'({summary["skipped"]} unchanged) in {summary["elapsed"]:.1f}s!</div>', unsafe_allow_html=True)
+                    if summary["failed"]:
+                        st.markdown(f'<div class="error-box">Failed to generate {len(summary["failed"])} packages.</div>', unsafe_allow_html=True)
                 else:
                     st.markdown('<div class="warning-box">No school data loaded. Please load data first.</div>', unsafe_allow_html=True)
 
+        # Download generated packages as a ZIP archive
+        with st.expander("📥 Download Packages"):
+            available_packages = list_client_packages()
+            if not available_packages:
+                st.info("No client packages generated yet.")
+            else:
+                selected_packages = st.multiselect("Packages", options=available_packages, key="zip_packages")
+                export_packages = selected_packages or available_packages
+
+                # The archive is streamed to a temporary file when asked for, once per
+                # selection and package build, and that file is offered on later reruns
+                fingerprint = packages_fingerprint(export_packages)
+                zip_export = st.session_state.get("zip_export")
+                zip_ready = (zip_export is not None and zip_export["fingerprint"] == fingerprint
+                             and zip_export["path"] and os.path.exists(zip_export["path"]))
+
+                if st.button("Prepare ZIP") and not zip_ready:
+                    if zip_export is not None and zip_export["path"] and os.path.exists(zip_export["path"]):
+                        os.remove(zip_export["path"])
+                    zip_path = write_packages_zip(export_packages)
+                    st.session_state.zip_export = {"fingerprint": fingerprint, "path": zip_path}
+                    zip_ready = zip_path is not None
+
+                if zip_ready:
+                    with open(st.session_state.zip_export["path"], "rb") as zip_file:
+                        st.download_button(
+                            label=f"Download {len(export_packages)} Package(s)",
+                            data=zip_file,
+                            file_name=f"client_packages_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                            mime="application/zip"
+                        )
+
         if st.button("🔄 Reset Session"):
             # Keep API key configuration but reset everything else
             encrypted_key = st.session_state.encrypted_api_key
@@ -1750,7 +2402,7 @@ def main():
             
             # Reset session state
             for key in list(st.session_state.keys()):
-                if key not in ["encrypted_api_key", "api_key_configured", "auth_token"]:
+                if key not in ["encrypted_api_key", "api_key_configured", "auth_token", "session_id"]:
                     del st.session_state[key]
             
             # Restore API configuration
@@ -1767,7 +2419,7 @@ def main():
                 "responses_generated": 0,
                 "conversations_saved": 0,
                 "customers_engaged": set(),
-                "avg_response_time": []
+                "avg_response_time": deque(maxlen=100)
             }
             
             st.rerun()
@@ -1785,7 +2437,7 @@ def main():
         "🎓 EduRishi Products"
     ])
     
-    with tab1:
+    with tab1, rerun_profiler.section("Sales Assistant"):
         # Check if API is configured
         if not st.session_state.api_key_configured:
             st.markdown('<div class="warning-box">Please configure your API key in the sidebar before using the application.</div>', unsafe_allow_html=True)
@@ -1836,6 +2488,7 @@ def main():
 
                 # Reset last generated leads
                 st.session_state.last_generated_leads = []
+                bump_data_version()
 
                 # Mark as cleared
                 st.session_state.data_cleared = True
@@ -2007,25 +2660,71 @@ def main():
                         # Previous conversation
                         with st.expander("Previous Conversation (Optional)"):
                             sales_history = st.text_area("Enter any previous conversation history", height=100)
+                            history_token_budget = st.number_input(
+                                "History token budget", min_value=100, max_value=8000,
+                                value=HISTORY_TOKEN_BUDGET, step=100,
+                                help="Older turns beyond this budget are replaced with a summary"
+                            )
+
+                        # Prompt size, measured on demand so reruns do not build the prompt
+                        with st.expander("📏 Prompt Size"):
+                            if st.button("Measure Prompt", key="measure_prompt"):
+                                size_report = prompt_size_report(customer_data, enquiry_details,
+                                                                 get_prompt_product_info(customer_data), sales_history,
+                                                                 history_token_budget=history_token_budget)
+                                if size_report:
+                                    col_a, col_b, col_c = st.columns(3)
+                                    col_a.metric("Prompt Tokens (est.)", size_report["prompt_tokens"])
+                                    col_b.metric("History Tokens", size_report["history_tokens"])
+                                    col_c.metric("History Reduction", f"{size_report['history_reduction']:.0%}")
                         
+                        use_cached_drafts = st.checkbox(
+                            "Start from a similar past response when available", value=True,
+                            help="Near-identical enquiries for the same products and role reuse a previous response as a draft"
+                        )
+
                         # Generate response button
                         if st.button("Generate Personalized Response"):
                             if enquiry_details:
+                                # Offer a previous response to a near-identical enquiry as an instant draft
+                                response_cache = get_response_cache()
+                                cache_hit = None
+                                if use_cached_drafts and not sales_history:
+                                    cache_hit = response_cache.lookup(enquiry_details,
+                                                                      customer_data.get("product_interested"),
+                                                                      customer_data.get("profession"))
+                                if cache_hit:
+                                    with st.expander(f"⚡ Draft from a similar enquiry ({cache_hit['similarity']:.0%} match)"):
+                                        st.markdown(f"**Original enquiry:** {cache_hit['enquiry']}")
+                                        st.markdown(cache_hit["response"])
+
                                 with st.spinner("Generating your personalized sales response..."):
-                                    response = generate_sales_response(customer_data, enquiry_details, sales_history)
+                                    generation_start = time.time()
+                                    response = generate_sales_response(customer_data, enquiry_details, sales_history,
+                                                                       history_token_budget,
+                                                                       draft=cache_hit["response"] if cache_hit else None)
+                                    generation_time = time.time() - generation_start
                                     
                                     # Check if response contains an error message
                                     if response.startswith("Error"):
                                         st.markdown(f'<div class="error-box">{response}</div>', unsafe_allow_html=True)
                                     else:
-                                        # Add to conversation history
+                                        if cache_hit:
+                                            response_cache.record_saving(cache_hit, generation_time)
+                                        else:
+                                            response_cache.store(enquiry_details, customer_data.get("product_interested"),
+                                                                 customer_data.get("profession"), response, generation_time)
+
+                                        # Add to conversation history and the conversation journal
                                         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                        st.session_state.conversation_history.append({
+                                        conversation_record = {
                                             "timestamp": timestamp,
                                             "customer": selected_customer,
                                             "enquiry": enquiry_details,
                                             "response": response
-                                        })
+                                        }
+                                        st.session_state.conversation_history.append(conversation_record)
+                                        saved_file = save_conversation(selected_customer, conversation_record)
                                         
                                         st.session_state.response_generated = True
                                         
@@ -2038,7 +2737,7 @@ def main():
 
                                         with col1:
                                             if st.button("Save Conversation"):
-                                                saved_file = save_conversation(selected_customer, st.session_state.conversation_history)
+                                                get_conversation_store().journal.sync()
                                                 st.markdown(f'<div class="success-box">Conversation saved to {saved_file}</div>', unsafe_allow_html=True)
 
                                         with col2:
@@ -2074,86 +2773,34 @@ def main():
                     st.markdown(f'<div class="error-box">Error processing the CSV file: {str(e)}</div>', unsafe_allow_html=True)
     
     # CRM Dashboard Tab
-    with tab2:
+    with tab2, rerun_profiler.section("CRM Dashboard"):
         st.markdown('<div class="main-header">CRM Dashboard</div>', unsafe_allow_html=True)
         st.markdown('<div class="info-box">Track your sales performance, leads, and deals in real-time.</div>', unsafe_allow_html=True)
 
         # Top metrics row
         col1, col2, col3, col4 = st.columns(4)
+        dashboard_totals = get_dashboard_totals()
 
         with col1:
-            lead_count = len(st.session_state.leads)
-            st.metric("Total Leads", lead_count, delta=None)
+            st.metric("Total Leads", dashboard_totals["leads"], delta=None)
 
         with col2:
-            deal_count = len(st.session_state.deals)
-            st.metric("Active Deals", deal_count, delta=None)
+            st.metric("Active Deals", dashboard_totals["deals"], delta=None)
 
         with col3:
-            # Calculate total deal value
-            total_deal_value = sum(deal.get("amount", 0) for deal in st.session_state.deals)
-            st.metric("Pipeline Value", format_currency(total_deal_value), delta=None)
+            st.metric("Pipeline Value", format_currency(dashboard_totals["pipeline_value"]), delta=None)
 
         with col4:
-            # Calculate weighted forecast
-            forecast_value = sum(deal.get("amount", 0) * deal.get("probability", 0) / 100 for deal in st.session_state.deals)
-            st.metric("Forecast (90 Days)", format_currency(forecast_value), delta=None)
+            st.metric("Forecast (90 Days)", format_currency(dashboard_totals["forecast_value"]), delta=None)
 
         # Use the enhanced dashboard with city-wise and business-type analytics
-        create_dashboard_tabs()
+        with rerun_profiler.section("City & Business Analytics"):
+            create_dashboard_tabs()
 
         # Sales Pipeline visualization
         st.markdown('<div class="sub-header">Sales Pipeline</div>', unsafe_allow_html=True)
 
-        # Create sample data if no deals exist
-        if not st.session_state.deals:
-            # Add sample deals for demonstration
-            sample_stages = st.session_state.sales_pipeline["stages"]
-            sample_values = [random.randint(50000, 200000) for _ in range(len(sample_stages))]
-            sample_counts = [random.randint(1, 5) for _ in range(len(sample_stages))]
-
-            # Create a DataFrame for the sample data
-            pipeline_df = pd.DataFrame({
-                "Stage": sample_stages,
-                "Value": sample_values,
-                "Count": sample_counts
-            })
-
-            # Add formatted values
-            pipeline_df["Formatted Value"] = pipeline_df["Value"].apply(lambda x: format_currency(x))
-        else:
-            # Create a DataFrame from actual deals
-            pipeline_data = []
-            for stage in st.session_state.sales_pipeline["stages"]:
-                stage_deals = [deal for deal in st.session_state.deals if deal.get("stage") == stage]
-                stage_value = sum(deal.get("amount", 0) for deal in stage_deals)
-                stage_count = len(stage_deals)
-
-                pipeline_data.append({
-                    "Stage": stage,
-                    "Value": stage_value,
-                    "Count": stage_count,
-                    "Formatted Value": format_currency(stage_value)
-                })
-
-            pipeline_df = pd.DataFrame(pipeline_data)
-
-        # Create a funnel chart for the pipeline
-        fig = go.Figure(go.Funnel(
-            y=pipeline_df["Stage"],
-            x=pipeline_df["Value"],
-            textinfo="value+percent initial",
-            textfont={"size": 14},
-            marker={"color": ["#1E88E5", "#42A5F5", "#64B5F6", "#90CAF9", "#BBDEFB", "#E3F2FD"]},
-            connector={"line": {"color": "royalblue", "dash": "dot", "width": 3}}
-        ))
-
-        fig.update_layout(
-            title="Deal Value by Stage",
-            height=400,
-            margin=dict(t=50, b=0, l=0, r=0)
-        )
-
+        pipeline_df, fig = build_pipeline_view()
         st.plotly_chart(fig, use_container_width=True)
 
         # Display the pipeline data in a table
@@ -2173,132 +2820,11 @@ def main():
 
         with col1:
             st.markdown('<div class="sub-header">Lead Status Distribution</div>', unsafe_allow_html=True)
-
-            # Create sample data if no leads exist
-            if not st.session_state.leads:
-                # Sample lead statuses
-                statuses = ["Hot", "Warm", "Lukewarm", "Cool", "Cold"]
-                counts = [random.randint(1, 10) for _ in range(len(statuses))]
-                colors = ["#FF4500", "#FFA500", "#FFD700", "#87CEEB", "#ADD8E6"]
-
-                # Create pie chart
-                fig = go.Figure(data=[go.Pie(
-                    labels=statuses,
-                    values=counts,
-                    hole=.4,
-                    marker_colors=colors
-                )])
-            else:
-                # Count leads by status
-                status_counts = Counter(lead.get("status") for lead in st.session_state.leads)
-                statuses = list(status_counts.keys())
-                counts = list(status_counts.values())
-
-                # Get colors for each status
-                colors = []
-                for status in statuses:
-                    if status == "Hot":
-                        colors.append("#FF4500")
-                    elif status == "Warm":
-                        colors.append("#FFA500")
-                    elif status == "Lukewarm":
-                        colors.append("#FFD700")
-                    elif status == "Cool":
-                        colors.append("#87CEEB")
-                    else:
-                        colors.append("#ADD8E6")
-
-                # Create pie chart
-                fig = go.Figure(data=[go.Pie(
-                    labels=statuses,
-                    values=counts,
-                    hole=.4,
-                    marker_colors=colors
-                )])
-
-            fig.update_layout(
-                title="Lead Distribution by Status",
-                height=350,
-                margin=dict(t=50, b=0, l=0, r=0)
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_lead_status_pie(), use_container_width=True)
 
         with col2:
             st.markdown('<div class="sub-header">Sales Forecast (90 Days)</div>', unsafe_allow_html=True)
-
-            # Create sample forecast data if no deals exist
-            if not st.session_state.deals:
-                # Sample months for forecast
-                months = [(datetime.now() + timedelta(days=30*i)).strftime("%b %Y") for i in range(3)]
-                potential_values = [random.randint(100000, 300000) for _ in range(len(months))]
-                weighted_values = [v * random.uniform(0.3, 0.7) for v in potential_values]
-
-                # Create the forecast chart
-                fig = go.Figure()
-
-                fig.add_trace(go.Bar(
-                    x=months,
-                    y=potential_values,
-                    name="Potential Value",
-                    marker_color="#90CAF9"
-                ))
-
-                fig.add_trace(go.Bar(
-                    x=months,
-                    y=weighted_values,
-                    name="Weighted Value",
-                    marker_color="#1E88E5"
-                ))
-            else:
-                # Group deals by expected close month
-                forecast_data = {}
-                for deal in st.session_state.deals:
-                    try:
-                        close_date = datetime.strptime(deal.get("expected_close_date", ""), "%Y-%m-%d")
-                        month_key = close_date.strftime("%b %Y")
-
-                        if month_key not in forecast_data:
-                            forecast_data[month_key] = {"potential": 0, "weighted": 0}
-
-                        amount = deal.get("amount", 0)
-                        probability = deal.get("probability", 0) / 100
-
-                        forecast_data[month_key]["potential"] += amount
-                        forecast_data[month_key]["weighted"] += amount * probability
-                    except (ValueError, TypeError):
-                        continue
-
-                # Sort months chronologically
-                months = sorted(forecast_data.keys(), key=lambda x: datetime.strptime(x, "%b %Y"))
-                potential_values = [forecast_data[month]["potential"] for month in months]
-                weighted_values = [forecast_data[month]["weighted"] for month in months]
-
-                # Create the forecast chart
-                fig = go.Figure()
-
-                fig.add_trace(go.Bar(
-                    x=months,
-                    y=potential_values,
-                    name="Potential Value",
-                    marker_color="#90CAF9"
-                ))
-
-                fig.add_trace(go.Bar(
-                    x=months,
-                    y=weighted_values,
-                    name="Weighted Value",
-                    marker_color="#1E88E5"
-                ))
-
-            fig.update_layout(
-                title="Forecast by Month",
-                height=350,
-                margin=dict(t=50, b=0, l=0, r=0),
-                barmode="group"
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_monthly_forecast_figure(), use_container_width=True)
 
         # Recent Activity
         st.markdown('<div class="sub-header">Recent Activity</div>', unsafe_allow_html=True)
@@ -2322,7 +2848,7 @@ def main():
                 """, unsafe_allow_html=True)
         else:
             # Display actual activity log (most recent first)
-            for activity in sorted(st.session_state.activity_log, key=lambda x: x["timestamp"], reverse=True)[:5]:
+            for activity in get_recent_activities():
                 st.markdown(f"""
                 <div class="history-item">
                     <strong>{activity["description"]}</strong><br>
@@ -2331,14 +2857,14 @@ def main():
                 """, unsafe_allow_html=True)
 
     # Leads & Deals Tab
-    with tab3:
+    with tab3, rerun_profiler.section("Leads & Deals"):
         st.markdown('<div class="main-header">Leads & Deals Management</div>', unsafe_allow_html=True)
         st.markdown('<div class="info-box">Manage your leads and deals in one place. Track progress and take action.</div>', unsafe_allow_html=True)
 
         # Create tabs for Leads and Deals
         leads_tab, deals_tab = st.tabs(["Leads", "Deals"])
 
-        with leads_tab:
+        with leads_tab, rerun_profiler.section("Leads"):
             st.markdown('<div class="sub-header">Lead Management</div>', unsafe_allow_html=True)
 
             # Lead actions
@@ -2348,11 +2874,7 @@ def main():
                 if st.button("Import Leads from CSV"):
                     if st.session_state.df is not None:
                         # Convert existing customer data to leads
-                        imported_count = 0
-                        for _, row in st.session_state.df.iterrows():
-                            customer_data = row.to_dict()
-                            create_new_lead(customer_data)
-                            imported_count += 1
+                        imported_count = len(create_new_leads(st.session_state.df))
 
                         st.success(f"Successfully imported {imported_count} leads!")
                     else:
@@ -2406,19 +2928,43 @@ def main():
                         with st.form("import_leads_form"):
                             st.write(f"Ready to import {len(st.session_state.uploaded_lead_df)} leads")
 
+                            duplicate_policy = st.radio(
+                                "Duplicate leads",
+                                DUPLICATE_POLICIES,
+                                format_func=lambda policy: {
+                                    "skip": "Skip duplicates",
+                                    "merge": "Merge into existing (fill empty fields)",
+                                    "update": "Update existing with imported values",
+                                    "keep": "Import everything"
+                                }.get(policy, policy),
+                                horizontal=True
+                            )
+
                             # Submit button
                             submitted = st.form_submit_button("Import All Leads")
 
                             if submitted:
-                                imported_count = 0
-                                for _, row in st.session_state.uploaded_lead_df.iterrows():
-                                    customer_data = row.to_dict()
-                                    customer_data["source"] = "CSV Import"
-                                    customer_data["source_detail"] = f"Imported from {st.session_state.uploaded_lead_file.name}"
-                                    create_new_lead(customer_data)
-                                    imported_count += 1
-
-                                st.success(f"Successfully imported {imported_count} leads!")
+                                # Parse and resolve city, state and pincode for the whole file at once
+                                import_df = normalize_locations(st.session_state.uploaded_lead_df)
+
+                                # Match the file against itself and the existing leads
+                                import_df, dedupe_report = dedupe_leads(import_df, st.session_state.leads, duplicate_policy)
+                                if dedupe_report["updates"]:
+                                    update_leads(dedupe_report["updates"], duplicate_policy)
+
+                                import_df = import_df.assign(
+                                    source="CSV Import",
+                                    source_detail=f"Imported from {st.session_state.uploaded_lead_file.name}"
+                                )
+                                imported_count = len(create_new_leads(
+                                    import_df,
+                                    f"Imported {len(import_df)} leads from {st.session_state.uploaded_lead_file.name}"
+                                ))
+
+                                st.success(f"Successfully imported {imported_count} leads! "
+                                           f"{dedupe_report['duplicates']} duplicates found "
+                                           f"({dedupe_report['matched_existing']} of existing leads, "
+                                           f"{dedupe_report['within_import']} within the file).")
                                 st.session_state.show_lead_import = False
                                 st.session_state.uploaded_lead_file = None
                                 st.session_state.uploaded_lead_df = None
@@ -2442,23 +2988,19 @@ def main():
 
                         with col1:
                             # State and city selection
-                            selected_state = st.selectbox("Select State", options=["All States"] + get_states())
+                            reference_data = get_reference_data()
+                            selected_state = st.selectbox("Select State", options=reference_data["states"])
 
                             # We need to handle city selection differently in a form since it can't be dynamic
                             # So we'll show all cities and filter them in the backend
-                            all_cities = [city["city"] for city in get_all_cities()]
-                            selected_city = st.selectbox("Select City", options=["All Cities"] + sorted(all_cities))
+                            selected_city = st.selectbox("Select City", options=reference_data["cities"])
 
                         with col2:
                             # Business type selection
-                            business_types = get_all_business_types()
-                            selected_business_type = st.selectbox("Select Business Type", options=["All Business Types"] + list(business_types.keys()))
+                            selected_business_type = st.selectbox("Select Business Type", options=reference_data["business_types"])
 
                             # Similar to cities, we'll show all subcategories and filter in the backend
-                            all_subcategories = []
-                            for subcats in business_types.values():
-                                all_subcategories.extend(subcats)
-                            selected_subcategory = st.selectbox("Select Subcategory", options=["All Subcategories"] + sorted(set(all_subcategories)))
+                            selected_subcategory = st.selectbox("Select Subcategory", options=reference_data["subcategories"])
 
                         # Number of leads to generate
                         num_leads = st.slider("Number of Leads to Generate", min_value=1, max_value=50, value=10)
@@ -2498,7 +3040,7 @@ def main():
                                 for lead_data in generated_leads:
                                     lead_data["source"] = "Generated"
                                     lead_data["source_detail"] = f"Generated from Internet Database"
-                                    create_new_lead(lead_data)
+                                create_new_leads(generated_leads)
 
                                 # Store the generated leads for display
                                 st.session_state.last_generated_leads = generated_leads
@@ -2557,12 +3099,12 @@ def main():
                     col1, col2, col3 = st.columns(3)
 
                     with col1:
-                        lead_state = st.selectbox("State", options=[""] + get_states(), key="new_lead_state")
+                        lead_state = st.selectbox("State", options=get_reference_data()["lead_states"], key="new_lead_state")
 
                     with col2:
                         if lead_state:
-                            cities = get_cities_by_state(lead_state)
-                            lead_city = st.selectbox("City", options=[""] + cities, key="new_lead_city")
+                            lead_city = st.selectbox("City", options=get_reference_data()["lead_cities"].get(lead_state, ("",)),
+                                                     key="new_lead_city")
                         else:
                             lead_city = st.text_input("City", key="new_lead_city")
 
@@ -2576,24 +3118,22 @@ def main():
                     col1, col2 = st.columns(2)
 
                     with col1:
-                        business_types = get_all_business_types()
                         lead_business_type = st.selectbox("Business Type",
-                                                       options=[""] + list(business_types.keys()),
+                                                       options=get_reference_data()["lead_business_types"],
                                                        key="new_lead_business_type")
 
                     with col2:
                         if lead_business_type:
-                            subcategories = business_types.get(lead_business_type, [])
                             lead_subcategory = st.selectbox("Business Subcategory",
-                                                         options=[""] + subcategories,
+                                                         options=get_reference_data()["lead_subcategories"].get(lead_business_type, ("",)),
                                                          key="new_lead_subcategory")
                         else:
                             lead_subcategory = ""
 
                     # Product Interest
                     st.markdown("#### Product Interest")
-                    # Use product_details from global
-                    product_options = list(product_details.keys())
+                    # Use the product catalog
+                    product_options = get_reference_data()["products"]
                     lead_products = st.multiselect("Products Interested In",
                                                 options=product_options,
                                                 key="new_lead_products")
@@ -2664,15 +3204,7 @@ def main():
                     st.info("No leads yet. Create a new lead or import from CSV.")
             else:
                 # Filter leads if search term is provided
-                filtered_leads = st.session_state.leads
-                if search_term:
-                    search_term = search_term.lower()
-                    filtered_leads = [
-                        lead for lead in st.session_state.leads
-                        if search_term in lead.get("name", "").lower() or
-                           search_term in lead.get("email", "").lower() or
-                           search_term in lead.get("company", "").lower()
-                    ]
+                filtered_leads = search_leads(st.session_state.leads, search_term)
 
                 # Display leads in a table
                 lead_data = []
@@ -2905,7 +3437,7 @@ def main():
                                 else:
                                     st.error("Please fill in all required fields.")
 
-        with deals_tab:
+        with deals_tab, rerun_profiler.section("Deals"):
             st.markdown('<div class="sub-header">Deal Management</div>', unsafe_allow_html=True)
 
             # Deal actions
@@ -2963,15 +3495,13 @@ def main():
                                 deal_stage = st.selectbox("Deal Stage*", options=st.session_state.sales_pipeline["stages"])
                                 deal_close_date = st.date_input("Expected Close Date*", value=datetime.now() + timedelta(days=30))
 
-                            # Use product_details
-                            product_options = list(product_details.keys())
+                            # Use the product catalog
+                            product_options = get_reference_data()["products"]
 
-                            # Get default products from lead
+                            # Get default products from lead, resolving product aliases to catalog codes
                             default_products = []
                             if selected_lead.get("product_interested"):
-                                # Split the string and filter out any products not in our product_details
-                                interested_products = selected_lead.get("product_interested", "").split(",")
-                                default_products = [p.strip() for p in interested_products if p.strip() in product_options]
+                                default_products = resolve_product_codes(selected_lead.get("product_interested", ""))
 
                             deal_products = st.multiselect(
                                 "Products",
@@ -3049,14 +3579,7 @@ def main():
                 st.info("No deals yet. Create a new deal or convert a lead to a deal.")
             else:
                 # Filter deals if search term is provided
-                filtered_deals = st.session_state.deals
-                if search_term:
-                    search_term = search_term.lower()
-                    filtered_deals = [
-                        deal for deal in st.session_state.deals
-                        if search_term in deal.get("name", "").lower() or
-                           search_term in deal.get("lead_name", "").lower()
-                    ]
+                filtered_deals = search_deals(st.session_state.deals, search_term)
 
                 # Display deals in a table
                 deal_data = []
@@ -3221,14 +3744,14 @@ def main():
                                 st.rerun()
 
     # Tasks & Calendar Tab
-    with tab4:
+    with tab4, rerun_profiler.section("Tasks & Calendar"):
         st.markdown('<div class="main-header">Tasks & Calendar</div>', unsafe_allow_html=True)
         st.markdown('<div class="info-box">Manage your tasks and schedule meetings with customers.</div>', unsafe_allow_html=True)
 
         # Create tabs for Tasks and Calendar
         tasks_tab, calendar_tab, email_tab = st.tabs(["Tasks", "Calendar", "Email Templates"])
 
-        with tasks_tab:
+        with tasks_tab, rerun_profiler.section("Tasks"):
             st.markdown('<div class="sub-header">Task Management</div>', unsafe_allow_html=True)
 
             # Task actions
@@ -3434,7 +3957,7 @@ def main():
                             if selected_task.get("notes"):
                                 st.markdown(f"**Details:**\n{selected_task.get('notes')}")
 
-        with calendar_tab:
+        with calendar_tab, rerun_profiler.section("Calendar"):
             st.markdown('<div class="sub-header">Calendar & Meetings</div>', unsafe_allow_html=True)
 
             # Calendar actions
@@ -3707,7 +4230,7 @@ def main():
                             </div>
                             """, unsafe_allow_html=True)
 
-        with email_tab:
+        with email_tab, rerun_profiler.section("Email Templates"):
             st.markdown('<div class="sub-header">Email Templates</div>', unsafe_allow_html=True)
             st.markdown('<div class="info-box">Create and manage email templates for different sales scenarios.</div>', unsafe_allow_html=True)
 
@@ -3892,40 +4415,84 @@ EDURISHI EDUVENTURES PVT LTD
             """)
 
     # Conversation History Tab
-    with tab5:
+    with tab5, rerun_profiler.section("Conversation History"):
         st.markdown('<div class="sub-header">Conversation History</div>', unsafe_allow_html=True)
 
-        if not st.session_state.conversation_history:
+        conversation_store = get_conversation_store()
+
+        if not conversation_store.count():
             st.markdown('<div class="info-box">No conversations yet. Generate responses to see them here.</div>', unsafe_allow_html=True)
         else:
-            # Filter by customer
-            all_customers = list(set([conv["customer"] for conv in st.session_state.conversation_history]))
-            filter_customer = st.selectbox("Filter by customer", ["All"] + all_customers)
-            
-            filtered_history = st.session_state.conversation_history
-            if filter_customer != "All":
-                filtered_history = [conv for conv in st.session_state.conversation_history if conv["customer"] == filter_customer]
-            
-            # Display conversations
-            for i, conv in enumerate(filtered_history):
+            # Filters
+            col1, col2, col3 = st.columns([2, 2, 2])
+
+            with col1:
+                filter_customer = st.selectbox("Filter by customer", ["All"] + conversation_store.customers())
+
+            with col2:
+                search_text = st.text_input("Search enquiries and responses", key="conversation_search")
+
+            with col3:
+                date_range = st.date_input("Date range", value=(), key="conversation_dates")
+
+            start_date = end_date = None
+            if len(date_range) >= 1:
+                start_date = datetime.combine(date_range[0], datetime.min.time())
+            if len(date_range) == 2:
+                end_date = datetime.combine(date_range[1], datetime.max.time())
+
+            page_size = 20
+            page = st.session_state.get("conversation_page", 1)
+
+            with get_app_metrics()["store_operation_duration_seconds"].time(operation="query"):
+                results = conversation_store.query(
+                    customer=None if filter_customer == "All" else filter_customer,
+                    start=start_date,
+                    end=end_date,
+                    text=search_text,
+                    page=page,
+                    page_size=page_size
+                )
+
+            st.caption(f"{results['total']} conversation(s) found")
+
+            # Display conversations for the current page only
+            for conv in results["records"]:
                 st.markdown(f'<div class="history-item">', unsafe_allow_html=True)
                 st.markdown(f"**Customer:** {conv['customer']}")
                 st.markdown(f"**Time:** {conv['timestamp']}")
-                
+
                 with st.expander("View Conversation"):
                     st.markdown("**Enquiry:**")
                     st.markdown(f"{conv['enquiry']}")
                     st.markdown("**Response:**")
                     st.markdown(f"{conv['response']}")
-                
+
                 st.markdown('</div>', unsafe_allow_html=True)
-            
+
+            # Pagination
+            if results["pages"] > 1:
+                if st.session_state.get("conversation_page", 1) > results["pages"]:
+                    st.session_state.conversation_page = results["page"]
+                st.number_input(
+                    f"Page (of {results['pages']})",
+                    min_value=1,
+                    max_value=results["pages"],
+                    key="conversation_page"
+                )
+
             # Export options
             if st.button("Export All Conversations"):
-                save_conversation("all_conversations", st.session_state.conversation_history)
+                # Every conversation is already in the journal, so exporting only reads it back
+                st.download_button(
+                    label="Download Conversations (JSONL)",
+                    data=b"".join(conversation_store.journal.iter_jsonl()),
+                    file_name=f"conversations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+                    mime="application/jsonl"
+                )
                 st.markdown('<div class="success-box">All conversations exported successfully!</div>', unsafe_allow_html=True)
-    
-    with tab6:
+
+    with tab6, rerun_profiler.section("Sales Scripts"):
         st.markdown('<div class="sub-header">EDURISHI Sales Scripts</div>', unsafe_allow_html=True)
 
         if st.session_state.customer_data:
@@ -3963,157 +4530,47 @@ EDURISHI EDUVENTURES PVT LTD
                 "I'd love to show you how our program works in practice. Would you be available for a 15-minute demo session next week?"
                 """)
     
-    with tab7:
+    with tab7, rerun_profiler.section("EduRishi Products"):
         st.markdown('<div class="sub-header">EDURISHI Product Catalog</div>', unsafe_allow_html=True)
         st.markdown('<div class="info-box">Browse our comprehensive catalog of educational products and solutions.</div>', unsafe_allow_html=True)
 
-        # Define product categories based on Schools_Enquiry.csv
-        categories = {
-            "Core Educational Programs": ["ELAP", "MDL", "PBL", "ICT", "LMS"],
-            "AI & Technology Solutions": ["AI Workshop", "AI software", "AI tutor", "Simulation", "Simulations"],
-            "Educational Materials & Programs": ["Book Publisher", "E2MP", "E2MP workshop", "E2MP software"],
-            "Business & Entrepreneurship": ["Franchise Proposal", "Tech Franchise", "Entrepreneurship_Workshop"]
-        }
-
-        # Get product details
-        product_details = {
-            "ELAP": {
-                "name": "ELAP (Experiential Learning and Assessment Program)",
-                "description": "Comprehensive experiential learning program designed for schools",
-                "brochure": "EduRishi Final Brochures/ELAP_Brochure.pdf",
-                "pricing": "₹800 per student (annual subscription)",
-                "video": "https://www.youtube.com/watch?v=elapoverview"
-            },
-            "MDL": {
-                "name": "MDL (Multi-Dimensional Learning)",
-                "description": "Multi-dimensional approach to learning that enhances student engagement",
-                "brochure": "EduRishi Final Brochures/MDL_Brochure.pdf",
-                "video": "https://www.youtube.com/watch?v=mdloverview"
-            },
-            "PBL": {
-                "name": "PBL (Project-Based Learning)",
-                "description": "Project-based learning methodology for practical skill development",
-                "brochure": "EduRishi Final Brochures/PBL_Brochure.pdf",
-                "video": "https://www.youtube.com/watch?v=pbloverview"
-            },
-            "ICT": {
-                "name": "ICT (Information and Communication Technology)",
-                "description": "Technology integration in education for digital literacy",
-                "brochure": "EduRishi Final Brochures/ICT_Brochure.pdf",
-                "video": "https://www.youtube.com/watch?v=ictoverview"
-            },
-            "AI Workshop": {
-                "name": "AI Workshop",
-                "description": "Hands-on workshops introducing artificial intelligence concepts",
-                "brochure": "AI_Workshop_Brochure.pdf",
-                "video": "https://www.youtube.com/watch?v=aiworkshop"
-            },
-            "Book Publisher": {
-                "name": "Book Publisher",
-                "description": "Educational book publishing services for schools",
-                "brochure": "Book_Publisher_Brochure.pdf",
-                "video": "https://www.youtube.com/watch?v=bookpublisher"
-            },
-            "E2MP": {
-                "name": "E2MP (EduRishi Educational Materials Program)",
-                "description": "Comprehensive educational materials program",
-                "brochure": "E2MP_Brochure.pdf",
-                "video": "https://www.youtube.com/watch?v=e2mpoverview"
-            },
-            "Franchise Proposal": {
-                "name": "Franchise Proposal",
-                "description": "Educational franchise opportunities with EduRishi",
-                "brochure": "Franchise_Proposal.pdf",
-                "video": "https://www.youtube.com/watch?v=franchiseoverview"
-            },
-            "Tech Franchise": {
-                "name": "Tech Franchise",
-                "description": "Technology-focused educational franchise opportunities",
-                "brochure": "Tech_Franchise.pdf",
-                "video": "https://www.youtube.com/watch?v=techfranchise"
-            },
-            "AI_Tutor": {
-                "name": "AI Tutor",
-                "description": "Personalized AI-powered tutoring system for students",
-                "brochure": "AI_Tutor_Brochure.pdf",
-                "pricing": "₹1200 per student (annual subscription)",
-                "video": "https://www.youtube.com/watch?v=aitutor"
-            },
-            "AI_Simulation": {
-                "name": "AI Simulation",
-                "description": "Advanced AI simulations for interactive learning experiences",
-                "brochure": "AI_Simulation_Brochure.pdf",
-                "pricing": "₹1500 per classroom (annual subscription)",
-                "video": "https://www.youtube.com/watch?v=aisimulation"
-            },
-            "AI_Integration_Workshop": {
-                "name": "AI Integration in Teaching Workshop",
-                "description": "Comprehensive workshop for educators on integrating AI in teaching methodologies",
-                "brochure": "AI_Integration_Workshop_Brochure.pdf",
-                "pricing": "₹25,000 per workshop (up to 30 participants)",
-                "video": "https://www.youtube.com/watch?v=aiintegration"
-            },
-            "Entrepreneurship_Workshop": {
-                "name": "EduRishi Entrepreneurship and Mentorship Workshop",
-                "description": "Hands-on workshop to develop entrepreneurial skills and mindset",
-                "brochure": "Entrepreneurship_Workshop_Brochure.pdf",
-                "pricing": "₹20,000 per workshop (up to 25 participants)",
-                "video": "https://www.youtube.com/watch?v=entrepreneurship"
-            }
-        }
-
         # Display products by category
-        for category, products in categories.items():
+        for category in PRODUCT_CATEGORIES:
+            products = get_products_in_category(category)
             st.markdown(f'<div class="sub-header">{category}</div>', unsafe_allow_html=True)
 
             # Create columns for products
             cols = st.columns(min(len(products), 2))
 
-            for i, product_code in enumerate(products):
-                try:
-                    product = product_details[product_code]
-                    with cols[i % 2]:
-                        with st.expander(f"{product['name']}"):
-                            st.markdown(f"**Description:** {product['description']}")
-                            if 'pricing' in product:
-                                st.markdown(f"**Pricing:** {product['pricing']}")
-                            st.markdown(f"**Brochure:** {product['brochure']}")
-                            st.markdown(f"**Video:** [Watch Demo]({product['video']})")
-
-                            # Add buttons for actions
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                if st.button(f"Download Brochure", key=f"dl_cat_{product_code}"):
-                                    st.markdown(f"<div class='success-box'>Downloading {product['name']} brochure...</div>", unsafe_allow_html=True)
-                            with col2:
-                                if st.button(f"Watch Video", key=f"vid_{product_code}"):
-                                    st.markdown(f"<div class='success-box'>Opening video: {product['video']}</div>", unsafe_allow_html=True)
-                except KeyError:
-                    # Skip products that don't have details
-                    st.warning(f"Product details for '{product_code}' not found. Please update the product_details dictionary.")
+            for i, (product_code, product) in enumerate(products):
+                with cols[i % 2]:
+                    with st.expander(f"{product['name']}"):
+                        st.markdown(f"**Description:** {product['description']}")
+                        if 'pricing' in product:
+                            st.markdown(f"**Pricing:** {product['pricing']}")
+                        st.markdown(f"**Brochure:** {product['brochure']}")
+                        st.markdown(f"**Video:** [Watch Demo]({product['video']})")
+
+                        # Add buttons for actions
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            if st.button(f"Download Brochure", key=f"dl_cat_{product_code}"):
+                                st.markdown(f"<div class='success-box'>Downloading {product['name']} brochure...</div>", unsafe_allow_html=True)
+                        with col2:
+                            if st.button(f"Watch Video", key=f"vid_{product_code}"):
+                                st.markdown(f"<div class='success-box'>Opening video: {product['video']}</div>", unsafe_allow_html=True)
 
         # Product bundles section
         st.markdown('<div class="sub-header">EduRishi Product Bundles</div>', unsafe_allow_html=True)
 
-        bundles = {
-            "School Starter Package": ["ELAP", "MDL", "ICT"],
-            "Advanced Learning Suite": ["ELAP", "PBL", "AI Workshop"],
-            "Complete School Transformation": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop"],
-            "LMS Integration Package": ["LMS", "ELAP", "MDL"],
-            "AI Education Bundle": ["AI tutor", "AI software", "AI Workshop"],
-            "Simulation Learning Package": ["Simulation", "Simulations", "PBL"],
-            "E2MP Complete Solution": ["E2MP", "E2MP workshop", "E2MP software"],
-            "University Package": ["E2MP software", "Simulations", "AI tutor"]
-        }
-
-        for bundle_name, bundle_products in bundles.items():
+        for bundle_name, bundle_products in PRODUCT_BUNDLES.items():
             with st.expander(bundle_name):
                 st.markdown(f"**Included Products:**")
                 for product_code in bundle_products:
-                    try:
-                        product = product_details[product_code]
+                    product = get_product(product_code)
+                    if product:
                         st.markdown(f"- **{product['name']}**: {product['description']}")
-                    except KeyError:
+                    else:
                         st.markdown(f"- **{product_code}**: Product details not available")
 
                 st.markdown("**Bundle Benefits:**")
@@ -4148,4 +4605,26 @@ EDURISHI EDUVENTURES PVT LTD
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    app_metrics = get_app_metrics()
+
+    # Session id for the count of active sessions
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = str(uuid.uuid4())
+        app_metrics["sessions_started_total"].inc()
+    get_session_tracker().touch(st.session_state.session_id)
+
+    profiling_mode = get_profiling_mode()
+    with app_metrics["rerun_duration_seconds"].time():
+        if profiling_mode:
+            rerun_profiler = st.session_state.rerun_profiler
+            with rerun_profiler.rerun(profiling_mode):
+                main()
+            show_rerun_timings(rerun_profiler)
+        else:
+            main()
+
+    if os.environ.get(METRICS_FILE_ENV_VAR):
+        try:
+            app_metrics.write_textfile(os.environ[METRICS_FILE_ENV_VAR], METRICS_FILE_INTERVAL)
+        except OSError as error:
+            logger.warning("Could not write metrics to %s: %s", os.environ[METRICS_FILE_ENV_VAR], error)
\ No newline at end of file
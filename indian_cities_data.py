@@ -8,25 +8,48 @@ states, and business types for the EduRishi Sales Assistant application.
 import random
 import uuid
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import permutations
+from types import MappingProxyType
 import json
+import re
+
+import numpy as np
+import pandas as pd
+
+# pyarrow (installed with streamlit) lets generated text columns skip Python strings
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
 
 # Sample data for Indian states and cities
 INDIAN_STATES_CITIES = {
-    "Maharashtra": ["Mumbai", "Pune", "Nagpur", "Thane", "Nashik", "Aurangabad", "Solapur", "Amravati", "Kolhapur", "Sangli"],
-    "Delhi": ["New Delhi", "North Delhi", "South Delhi", "East Delhi", "West Delhi", "Central Delhi", "Shahdara", "Dwarka"],
+    "Maharashtra": ["Mumbai", "Pune", "Nagpur", "Thane", "Nashik", "Aurangabad", "Solapur", "Amravati", "Kolhapur", "Sangli", "Navi Mumbai"],
+    "Delhi": ["Delhi", "New Delhi", "North Delhi", "South Delhi", "East Delhi", "West Delhi", "Central Delhi", "Shahdara", "Dwarka"],
     "Karnataka": ["Bengaluru", "Mysuru", "Hubli", "Mangaluru", "Belgaum", "Gulbarga", "Davanagere", "Shimoga", "Tumkur", "Udupi"],
     "Tamil Nadu": ["Chennai", "Coimbatore", "Madurai", "Tiruchirappalli", "Salem", "Tirunelveli", "Erode", "Vellore", "Thoothukudi", "Dindigul"],
     "Uttar Pradesh": ["Lucknow", "Kanpur", "Agra", "Varanasi", "Meerut", "Prayagraj", "Ghaziabad", "Aligarh", "Bareilly", "Moradabad"],
-    "Gujarat": ["Ahmedabad", "Surat", "Vadodara", "Rajkot", "Bhavnagar", "Jamnagar", "Junagadh", "Gandhinagar", "Anand", "Navsari"],
+    "Gujarat": ["Ahmedabad", "Surat", "Vadodara", "Rajkot", "Bhavnagar", "Jamnagar", "Junagadh", "Gandhinagar", "Anand", "Navsari", "Patan"],
     "West Bengal": ["Kolkata", "Howrah", "Durgapur", "Asansol", "Siliguri", "Bardhaman", "Malda", "Kharagpur", "Darjeeling", "Haldia"],
-    "Telangana": ["Hyderabad", "Warangal", "Nizamabad", "Karimnagar", "Khammam", "Ramagundam", "Mahbubnagar", "Nalgonda", "Adilabad", "Suryapet"],
-    "Rajasthan": ["Jaipur", "Jodhpur", "Udaipur", "Kota", "Bikaner", "Ajmer", "Bhilwara", "Alwar", "Sikar", "Bharatpur"],
-    "Kerala": ["Thiruvananthapuram", "Kochi", "Kozhikode", "Thrissur", "Kollam", "Palakkad", "Alappuzha", "Kannur", "Kottayam", "Malappuram"],
+    "Telangana": ["Hyderabad", "Secunderabad", "Warangal", "Nizamabad", "Karimnagar", "Khammam", "Ramagundam", "Mahbubnagar", "Nalgonda", "Adilabad", "Suryapet"],
+    "Rajasthan": ["Jaipur", "Jodhpur", "Udaipur", "Kota", "Bikaner", "Ajmer", "Bhilwara", "Alwar", "Sikar", "Bharatpur", "Nagaur"],
+    "Kerala": ["Thiruvananthapuram", "Kochi", "Ernakulam", "Kozhikode", "Thrissur", "Kollam", "Palakkad", "Alappuzha", "Kannur", "Kottayam", "Malappuram"],
     "Andhra Pradesh": ["Visakhapatnam", "Vijayawada", "Guntur", "Nellore", "Kurnool", "Rajahmundry", "Tirupati", "Kakinada", "Kadapa", "Anantapur"],
     "Punjab": ["Ludhiana", "Amritsar", "Jalandhar", "Patiala", "Bathinda", "Mohali", "Pathankot", "Hoshiarpur", "Batala", "Moga"],
     "Haryana": ["Faridabad", "Gurgaon", "Panipat", "Ambala", "Yamunanagar", "Rohtak", "Hisar", "Karnal", "Sonipat", "Panchkula"],
     "Madhya Pradesh": ["Indore", "Bhopal", "Jabalpur", "Gwalior", "Ujjain", "Sagar", "Dewas", "Satna", "Ratlam", "Rewa"],
-    "Bihar": ["Patna", "Gaya", "Bhagalpur", "Muzaffarpur", "Darbhanga", "Arrah", "Begusarai", "Chhapra", "Katihar", "Munger"]
+    "Bihar": ["Patna", "Gaya", "Bhagalpur", "Muzaffarpur", "Darbhanga", "Arrah", "Begusarai", "Chhapra", "Katihar", "Munger"],
+    "Chhattisgarh": ["Raipur", "Bhilai", "Bilaspur", "Korba", "Durg", "Rajnandgaon", "Jagdalpur", "Raigarh", "Ambikapur", "Dhamtari"],
+    "Odisha": ["Bhubaneswar", "Cuttack", "Rourkela", "Berhampur", "Sambalpur", "Puri", "Balasore", "Bhadrak", "Baripada", "Jharsuguda"],
+    "Jharkhand": ["Ranchi", "Jamshedpur", "Dhanbad", "Bokaro", "Deoghar", "Hazaribagh", "Giridih", "Ramgarh", "Dumka", "Chaibasa"],
+    "Assam": ["Guwahati", "Silchar", "Dibrugarh", "Jorhat", "Nagaon", "Tinsukia", "Tezpur", "Bongaigaon", "Karimganj", "Sivasagar"],
+    "Uttarakhand": ["Dehradun", "Haridwar", "Roorkee", "Haldwani", "Rudrapur", "Kashipur", "Rishikesh", "Nainital", "Almora", "Pithoragarh"],
+    "Himachal Pradesh": ["Shimla", "Mandi", "Solan", "Dharamshala", "Kullu", "Una", "Palampur", "Nahan", "Chamba", "Kangra"],
+    "Jammu and Kashmir": ["Srinagar", "Jammu", "Anantnag", "Baramulla", "Sopore", "Kathua", "Udhampur"],
+    "Goa": ["Panaji", "Margao", "Vasco da Gama", "Mapusa", "Ponda"],
+    "Chandigarh": ["Chandigarh"]
 }
 
 # Business types and subcategories
@@ -216,14 +239,192 @@ LEAD_SOURCES = [
 # Sample lead statuses
 LEAD_STATUSES = ["New", "Contacted", "Qualified", "Proposal Sent", "Negotiation", "Won", "Lost"]
 
+# Words used for {name} in company name templates
+COMPANY_NAME_WORDS = ["Royal", "Global", "National", "Premier", "Elite", "Supreme", "Universal", "Imperial", "Prestige", "Excellence"]
+
+# Public email domains used when a contact does not use the company domain
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "company.com"]
+
+# Budget ranges by business type
+BUDGET_RANGES = {
+    "Educational": (50000, 500000),
+    "Industrial": (100000, 1000000),
+    "Technology": (75000, 750000),
+    "Healthcare": (100000, 1000000),
+    "Retail": (50000, 500000),
+    "Hospitality": (75000, 750000),
+    "Financial": (100000, 1000000)
+}
+DEFAULT_BUDGET_RANGE = (50000, 500000)
+
+# Reference tables, built once per process and shared by every session (read-only)
+STATE_OPTIONS = tuple(INDIAN_STATES_CITIES)
+STATE_CITIES = MappingProxyType({state: tuple(cities) for state, cities in INDIAN_STATES_CITIES.items()})
+CITY_STATE = MappingProxyType({city: state for state, cities in INDIAN_STATES_CITIES.items() for city in cities})
+CITY_OPTIONS = tuple(sorted(CITY_STATE))
+CITY_RECORDS = tuple(
+    MappingProxyType({"city": city, "state": state})
+    for state, cities in INDIAN_STATES_CITIES.items() for city in cities
+)
+BUSINESS_TYPE_OPTIONS = tuple(BUSINESS_TYPES)
+BUSINESS_SUBCATEGORIES = MappingProxyType({
+    business_type: tuple(subcategories) for business_type, subcategories in BUSINESS_TYPES.items()
+})
+SUBCATEGORY_OPTIONS = tuple(sorted({subcategory for subcategories in BUSINESS_TYPES.values() for subcategory in subcategories}))
+BUSINESS_PRODUCT_INTERESTS = MappingProxyType({
+    business_type: tuple(products) for business_type, products in PRODUCT_INTERESTS.items()
+})
+
+# Other names for cities in INDIAN_STATES_CITIES (old names, short forms, alternative spellings)
+CITY_ALIASES = {
+    "Bangalore": "Bengaluru", "Bengalooru": "Bengaluru", "Mysore": "Mysuru", "Mangalore": "Mangaluru",
+    "Hubballi": "Hubli", "Belagavi": "Belgaum", "Kalaburagi": "Gulbarga", "Davangere": "Davanagere",
+    "Shivamogga": "Shimoga", "Tumakuru": "Tumkur", "Gurugram": "Gurgaon", "Bombay": "Mumbai",
+    "Poona": "Pune", "Madras": "Chennai", "Trichy": "Tiruchirappalli", "Tiruchi": "Tiruchirappalli",
+    "Tuticorin": "Thoothukudi", "Calcutta": "Kolkata", "Burdwan": "Bardhaman",
+    "Allahabad": "Prayagraj", "Benares": "Varanasi", "Banaras": "Varanasi", "Kashi": "Varanasi",
+    "Baroda": "Vadodara", "Trivandrum": "Thiruvananthapuram", "Cochin": "Kochi",
+    "Calicut": "Kozhikode", "Trichur": "Thrissur", "Quilon": "Kollam", "Palghat": "Palakkad",
+    "Alleppey": "Alappuzha", "Cannanore": "Kannur", "Vizag": "Visakhapatnam", "Vishakhapatnam": "Visakhapatnam",
+    "Bezawada": "Vijayawada", "Rajamahendravaram": "Rajahmundry", "Cuddapah": "Kadapa",
+    "Ananthapuram": "Anantapur", "SAS Nagar": "Mohali", "Bhubaneshwar": "Bhubaneswar", "Brahmapur": "Berhampur", "Panjim": "Panaji",
+    "Madgaon": "Margao", "Dharamsala": "Dharamshala"
+}
+
+# Other names and abbreviations for states
+STATE_ALIASES = {
+    "MH": "Maharashtra", "DL": "Delhi", "NCT of Delhi": "Delhi", "National Capital Territory of Delhi": "Delhi",
+    "KA": "Karnataka", "TN": "Tamil Nadu", "UP": "Uttar Pradesh", "GJ": "Gujarat", "WB": "West Bengal",
+    "TS": "Telangana", "TG": "Telangana", "RJ": "Rajasthan", "KL": "Kerala", "AP": "Andhra Pradesh",
+    "PB": "Punjab", "HR": "Haryana", "MP": "Madhya Pradesh", "BR": "Bihar", "Orissa": "Odisha",
+    "CG": "Chhattisgarh", "Chattisgarh": "Chhattisgarh", "OD": "Odisha", "JH": "Jharkhand", "AS": "Assam",
+    "UK": "Uttarakhand", "Uttaranchal": "Uttarakhand", "HP": "Himachal Pradesh", "JK": "Jammu and Kashmir",
+    "J&K": "Jammu and Kashmir", "GA": "Goa", "CH": "Chandigarh"
+}
+
+PLACE_NAME_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_place_name(name):
+    """Normalize a city or state name for lookups (case, punctuation and spacing ignored)."""
+    return PLACE_NAME_SEPARATORS.sub("", str(name).lower())
+
+
+def _deletions(key, depth=1):
+    """All strings obtained by deleting up to depth characters from key, key included."""
+    variants = {key}
+    for _ in range(depth):
+        variants |= {variant[:i] + variant[i + 1:] for variant in variants for i in range(len(variant))}
+    return variants
+
+
+def _build_fuzzy_index(index):
+    """Map every key with up to two characters deleted to the keys it comes from."""
+    fuzzy_index = {}
+    for key in index:
+        for variant in _deletions(key, 2):
+            fuzzy_index.setdefault(variant, set()).add(key)
+    return {variant: frozenset(keys) for variant, keys in fuzzy_index.items()}
+
+
+def edit_distance(a, b):
+    """Insertions, deletions, substitutions and adjacent transpositions turning a into b."""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+
+# City and state lookup indexes, built once per process
+CITY_INDEX = MappingProxyType({
+    **{normalize_place_name(alias): city for alias, city in CITY_ALIASES.items()},
+    **{normalize_place_name(city): city for city in CITY_STATE}
+})
+STATE_INDEX = MappingProxyType({
+    **{normalize_place_name(alias): state for alias, state in STATE_ALIASES.items() if state in STATE_CITIES},
+    **{normalize_place_name(state): state for state in STATE_CITIES}
+})
+CITY_FUZZY_INDEX = MappingProxyType(_build_fuzzy_index(CITY_INDEX))
+
+# Typos are only matched in names at least this long
+FUZZY_MIN_LENGTH = 5
+
+
+@lru_cache(maxsize=65536)
+def resolve_city(name):
+    """Canonical city name for a city name or alias, or None."""
+    if not name:
+        return None
+    return CITY_INDEX.get(normalize_place_name(name))
+
+
+@lru_cache(maxsize=65536)
+def suggest_city(name):
+    """The city a name missing from the table is most likely a typo of, or None.
+
+    A typo is one inserted, deleted, substituted or transposed character. The name must
+    be one typo away from a single city and more than two away from every other city,
+    so a real town missing from the table is not taken for a similarly spelled city.
+    The suggestion is only used to fill in a missing state, never to rename a city.
+    """
+    if not name:
+        return None
+    key = normalize_place_name(name)
+    if len(key) < FUZZY_MIN_LENGTH or key in CITY_INDEX:
+        return None
+
+    # Every key within two typos shares a variant with up to two characters deleted
+    keys = set()
+    for variant in _deletions(key, 2):
+        keys |= CITY_FUZZY_INDEX.get(variant, frozenset())
+    distances = {}
+    for candidate in keys:
+        city = CITY_INDEX[candidate]
+        distances[city] = min(distances.get(city, 3), edit_distance(key, candidate))
+
+    close = [city for city, distance in distances.items() if distance <= 2]
+    return close[0] if len(close) == 1 and distances[close[0]] == 1 else None
+
+
+@lru_cache(maxsize=1024)
+def resolve_state(name):
+    """Canonical state name for a state name or abbreviation, or None."""
+    if not name:
+        return None
+    return STATE_INDEX.get(normalize_place_name(name))
+
+
+def get_state_for_city(city):
+    """Get the state of a city (names and aliases are resolved, typos go through suggest_city), or None."""
+    city = resolve_city(city) or suggest_city(city)
+    return CITY_STATE[city] if city else None
+
+
+def resolve_city_states(cities):
+    """Resolve many city names at once, returning a list of (city, state) pairs.
+
+    A name that is not a city or alias gives None as the city, and the state of the
+    city suggest_city matches, if any. Each distinct name is resolved once, so large
+    imports with repeated city names resolve quickly.
+    """
+    resolved = {}
+    pairs = []
+    for name in cities:
+        pair = resolved.get(name)
+        if pair is None:
+            city = resolve_city(name) if isinstance(name, str) else None
+            pair = resolved[name] = (city, get_state_for_city(name) if isinstance(name, str) else None)
+        pairs.append(pair)
+    return pairs
+
 # Helper functions
 def get_all_cities():
-    """Get a list of all cities with their states."""
-    cities = []
-    for state, city_list in INDIAN_STATES_CITIES.items():
-        for city in city_list:
-            cities.append({"city": city, "state": state})
-    return cities
+    """Get a list of all cities with their states (the records are shared and read-only)."""
+    return list(CITY_RECORDS)
 
 def get_all_business_types():
     """Get a dictionary of all business types and their subcategories."""
@@ -231,11 +432,11 @@ def get_all_business_types():
 
 def get_cities_by_state(state):
     """Get a list of cities for a given state."""
-    return INDIAN_STATES_CITIES.get(state, [])
+    return list(STATE_CITIES.get(state, ()))
 
 def get_states():
     """Get a list of all states."""
-    return list(INDIAN_STATES_CITIES.keys())
+    return list(STATE_OPTIONS)
 
 def generate_phone_number():
     """Generate a random Indian phone number."""
@@ -245,13 +446,12 @@ def generate_email(name, company):
     """Generate an email address based on name and company."""
     name_part = name.lower().replace(" ", ".")
     company_part = company.lower().replace(" ", "").replace("'", "")
-    domains = ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "company.com"]
     
     # 50% chance to use company domain
     if random.random() > 0.5:
         return f"{name_part}@{company_part}.com"
     else:
-        return f"{name_part}@{random.choice(domains)}"
+        return f"{name_part}@{random.choice(EMAIL_DOMAINS)}"
 
 def generate_company_name(business_type, city):
     """Generate a company name based on business type and city."""
@@ -259,23 +459,12 @@ def generate_company_name(business_type, city):
         business_type = random.choice(list(COMPANY_NAME_TEMPLATES.keys()))
     
     template = random.choice(COMPANY_NAME_TEMPLATES[business_type])
-    name_options = ["Royal", "Global", "National", "Premier", "Elite", "Supreme", "Universal", "Imperial", "Prestige", "Excellence"]
     
-    return template.format(city=city, name=random.choice(name_options))
+    return template.format(city=city, name=random.choice(COMPANY_NAME_WORDS))
 
 def generate_budget(business_type):
     """Generate a budget based on business type."""
-    base_budgets = {
-        "Educational": (50000, 500000),
-        "Industrial": (100000, 1000000),
-        "Technology": (75000, 750000),
-        "Healthcare": (100000, 1000000),
-        "Retail": (50000, 500000),
-        "Hospitality": (75000, 750000),
-        "Financial": (100000, 1000000)
-    }
-    
-    min_budget, max_budget = base_budgets.get(business_type, (50000, 500000))
+    min_budget, max_budget = BUDGET_RANGES.get(business_type, DEFAULT_BUDGET_RANGE)
     return random.randint(min_budget, max_budget)
 
 def generate_leads_by_city(city, count=5, business_type=None):
@@ -283,11 +472,7 @@ def generate_leads_by_city(city, count=5, business_type=None):
     leads = []
     
     # Find the state for this city
-    state = None
-    for s, cities in INDIAN_STATES_CITIES.items():
-        if city in cities:
-            state = s
-            break
+    state = CITY_STATE.get(city)
     
     if not state:
         return []
@@ -312,10 +497,7 @@ def generate_mock_lead(city=None, state=None, business_type=None, subcategory=No
     """Generate a mock lead with realistic data."""
     # If city is provided but not state, find the state
     if city and not state:
-        for s, cities in INDIAN_STATES_CITIES.items():
-            if city in cities:
-                state = s
-                break
+        state = CITY_STATE.get(city)
     
     # If state is provided but not city, pick a random city from that state
     if state and not city:
@@ -401,6 +583,209 @@ def generate_mock_lead(city=None, state=None, business_type=None, subcategory=No
     
     return lead
 
+def _choose_within(rng, groups, options):
+    """Draw one option per row from the option list of the row's group, as a Categorical (None is missing)."""
+    categories = {}
+    flat, offsets, sizes = [], [], []
+    for group_options in options:
+        offsets.append(len(flat))
+        sizes.append(len(group_options))
+        flat.extend(-1 if option is None else categories.setdefault(option, len(categories)) for option in group_options)
+    flat, offsets, sizes = np.array(flat), np.array(offsets), np.array(sizes)
+
+    picks = offsets[groups] + (rng.random(len(groups)) * sizes[groups]).astype(np.int64)
+    return pd.Categorical.from_codes(flat[picks], list(categories))
+
+
+def _categorical(codes, labels):
+    """Categorical of labels[code] per row; repeated labels share one category."""
+    categories = {}
+    remap = np.array([categories.setdefault(label, len(categories)) for label in labels])
+    return pd.Categorical.from_codes(remap[codes], list(categories))
+
+
+def format_categories(keys, format_key):
+    """Categorical of format_key(key) per row, formatting each distinct key once."""
+    inverse, unique_keys = pd.factorize(keys)
+    return _categorical(inverse, [format_key(key) for key in unique_keys.tolist()])
+
+
+def _ascii_column(matrix):
+    """Rows of an ASCII byte matrix as strings (an Arrow string array when pyarrow is available)."""
+    rows, width = matrix.shape
+    if pa is not None:
+        offsets = np.arange(0, rows * width + 1, width, dtype=np.int64)
+        array = pa.Array.from_buffers(pa.large_string(), rows, [None, pa.py_buffer(offsets), pa.py_buffer(matrix.tobytes())])
+        return pd.array(array.cast(pa.string()), dtype="string[pyarrow]")
+    return matrix.view(f"S{width}").ravel().astype(f"U{width}").astype(object)
+
+
+def _concat_columns(*columns):
+    """Row-wise concatenation of Categoricals (done by Arrow when pyarrow is available)."""
+    if pa is not None:
+        arrays = [pa.array(column.categories.tolist(), pa.string()).take(pa.array(column.codes)) for column in columns]
+        return pd.array(pc.binary_join_element_wise(*arrays, ""), dtype="string[pyarrow]")
+    result = np.asarray(columns[0], dtype=object)
+    for column in columns[1:]:
+        result = result + np.asarray(column, dtype=object)
+    return result
+
+
+def random_uuids(rng, n):
+    """Random version 4 UUID strings drawn from rng."""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hex_digits = np.frombuffer(raw.tobytes().hex().encode("ascii"), dtype=np.uint8).reshape(n, 32)
+    matrix = np.full((n, 36), ord("-"), dtype=np.uint8)
+    # 8-4-4-4-12 hex digit groups separated by dashes
+    for group, (start, end) in enumerate([(0, 8), (8, 12), (12, 16), (16, 20), (20, 32)]):
+        matrix[:, start + group:end + group] = hex_digits[:, start:end]
+    return _ascii_column(matrix)
+
+
+def _phone_column(rng, n):
+    """Random Indian phone numbers in the format of generate_phone_number() ("+91 9xxx xxx xxx")."""
+    matrix = np.full((n, 16), ord(" "), dtype=np.uint8)
+    matrix[:, :3] = np.frombuffer(b"+91", dtype=np.uint8)
+    matrix[:, 4] = rng.integers(ord("7"), ord("9") + 1, n, dtype=np.uint8)
+    for start in (5, 9, 13):
+        # A uniform number from 100 to 999 is a uniform leading digit 1-9 followed by two uniform digits
+        matrix[:, start] = rng.integers(ord("1"), ord("9") + 1, n, dtype=np.uint8)
+        matrix[:, start + 1:start + 3] = rng.integers(ord("0"), ord("9") + 1, (n, 2), dtype=np.uint8)
+    return _ascii_column(matrix)
+
+
+def generate_mock_leads_frame(n, seed=None, city=None, state=None, business_type=None, subcategory=None,
+                              reference_date=None, history_days=60, as_arrow=False):
+    """Generate n mock leads at once, as a DataFrame (or a pyarrow Table with as_arrow=True).
+
+    Fields follow generate_mock_lead(), but every field is drawn as an array from a
+    numpy Generator seeded with seed, so the same seed and reference_date always give
+    the same leads. Leads are created 1 to history_days days before reference_date.
+    Low-cardinality text columns are Categoricals, leads never contacted have a missing
+    last_contacted, and tags are left out (create_new_lead() defaults them).
+    """
+    rng = np.random.default_rng(seed)
+    reference_date = reference_date or datetime.now()
+
+    # Location: a random state, then a random city of that state (as in generate_mock_lead)
+    if city:
+        state = state or CITY_STATE.get(city)
+        cities = pd.Categorical.from_codes(np.zeros(n, dtype=np.int64), [city])
+        states = pd.Categorical.from_codes(np.zeros(n, dtype=np.int64) - (state is None), [state] if state else [])
+    else:
+        state_options = [state] if state in STATE_CITIES else list(STATE_OPTIONS)
+        state_codes = rng.integers(0, len(state_options), n)
+        states = pd.Categorical.from_codes(state_codes, state_options)
+        cities = _choose_within(rng, state_codes, [STATE_CITIES[option] for option in state_options])
+    city_names = cities.categories.tolist()
+    state_names = states.categories.tolist()
+    location_keys = cities.codes.astype(np.int64) * (len(state_names) + 1) + states.codes
+    locations = format_categories(location_keys, lambda key: "{}, {}".format(
+        city_names[key // (len(state_names) + 1)],
+        state_names[key % (len(state_names) + 1)] if key % (len(state_names) + 1) < len(state_names) else None
+    ))
+
+    # Business type and everything that depends on it
+    type_options = [business_type] if business_type else list(BUSINESS_TYPE_OPTIONS)
+    type_codes = rng.integers(0, len(type_options), n)
+    business_types = pd.Categorical.from_codes(type_codes, type_options)
+    if subcategory:
+        subcategories = pd.Categorical.from_codes(np.zeros(n, dtype=np.int64), [subcategory])
+    else:
+        subcategories = _choose_within(rng, type_codes, [BUSINESS_SUBCATEGORIES.get(option, [None])
+                                                         for option in type_options])
+    professions = _choose_within(rng, type_codes, [PROFESSIONS.get(option, PROFESSIONS["Educational"])
+                                                   for option in type_options])
+
+    # Company names from the type's templates, the city and a name word
+    template_options = list(COMPANY_NAME_TEMPLATES)
+    templates = _choose_within(rng, type_codes, [
+        COMPANY_NAME_TEMPLATES[option] if option in COMPANY_NAME_TEMPLATES else
+        [template for name in template_options for template in COMPANY_NAME_TEMPLATES[name]]
+        for option in type_options
+    ])
+    template_names = templates.categories.tolist()
+    city_count, word_count = len(city_names), len(COMPANY_NAME_WORDS)
+    company_keys = ((templates.codes.astype(np.int64) * city_count + cities.codes) * word_count
+                    + rng.integers(0, word_count, n))
+
+    def company_name(key):
+        key, word = divmod(key, word_count)
+        template, city_code = divmod(key, city_count)
+        return template_names[template].format(city=city_names[city_code], name=COMPANY_NAME_WORDS[word])
+
+    companies = format_categories(company_keys, company_name)
+
+    # Contact person and email
+    contacts = format_categories(rng.integers(0, len(FIRST_NAMES), n) * len(LAST_NAMES) + rng.integers(0, len(LAST_NAMES), n),
+                              lambda key: f"{FIRST_NAMES[key // len(LAST_NAMES)]} {LAST_NAMES[key % len(LAST_NAMES)]}")
+    mailboxes = _categorical(contacts.codes, [f"{name.lower().replace(' ', '.')}@" for name in contacts.categories.tolist()])
+    company_domains = [f"{name.lower().replace(' ', '').replace(chr(39), '')}.com" for name in companies.categories.tolist()]
+    domain_codes = np.where(rng.random(n) > 0.5, companies.codes,
+                            len(company_domains) + rng.integers(0, len(EMAIL_DOMAINS), n))
+    domains = _categorical(domain_codes, company_domains + EMAIL_DOMAINS)
+    emails = _concat_columns(mailboxes, domains)
+
+    # Product interest: 1 to 3 distinct products of the type, in random order
+    product_lists = [BUSINESS_PRODUCT_INTERESTS.get(option, BUSINESS_PRODUCT_INTERESTS["Educational"])
+                     for option in type_options]
+    max_products = np.array([min(3, len(products)) for products in product_lists])
+    counts = 1 + (rng.random(n) * max_products[type_codes]).astype(np.int64)
+    products = _choose_within(rng, type_codes * 3 + counts - 1, [
+        [", ".join(combination) for combination in permutations(products, count)]
+        for products in product_lists for count in (1, 2, 3)
+    ])
+    product_names = products.categories.tolist()
+    type_names = business_types.categories.tolist()
+    notes = format_categories(products.codes.astype(np.int64) * len(type_names) + type_codes,
+                           lambda key: f"This lead is interested in {product_names[key // len(type_names)]} "
+                                       f"for their {type_names[key % len(type_names)].lower()} business.")
+
+    # Budget within the type's range
+    ranges = np.array([BUDGET_RANGES.get(option, DEFAULT_BUDGET_RANGE) for option in type_options])
+    budgets = rng.integers(ranges[type_codes, 0], ranges[type_codes, 1] + 1)
+
+    # Source, status and dates
+    source_codes = rng.integers(0, len(LEAD_SOURCES), n)
+    created_dates = pd.Categorical.from_codes(rng.integers(0, history_days, n), [
+        (reference_date - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S") for days in range(1, history_days + 1)
+    ])
+    contacted_codes = np.where(rng.random(n) < 0.7, rng.integers(0, 31, n), -1)
+    last_contacted = pd.Categorical.from_codes(contacted_codes, [
+        (reference_date - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S") for days in range(31)
+    ])
+
+    frame = pd.DataFrame({
+        "id": random_uuids(rng, n),
+        "name": companies,
+        "contact_person": contacts,
+        "profession": professions,
+        "email": emails,
+        "phone": _phone_column(rng, n),
+        "city": cities,
+        "state": states,
+        "location": locations,
+        "business_type": business_types,
+        "business_subcategory": subcategories,
+        "product_interested": products,
+        "budget": budgets,
+        "source": pd.Categorical.from_codes(source_codes, LEAD_SOURCES),
+        "source_detail": pd.Categorical.from_codes(source_codes, [f"Generated from {source}" for source in LEAD_SOURCES]),
+        "status": pd.Categorical.from_codes(rng.integers(0, len(LEAD_STATUSES), n), LEAD_STATUSES),
+        "created_date": created_dates,
+        "last_contacted": last_contacted,
+        "notes": notes,
+        "score": rng.integers(1, 101, n)
+    })
+
+    if as_arrow:
+        if pa is None:
+            raise ImportError("as_arrow=True requires pyarrow")
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    return frame
+
 def fetch_leads_from_external_source(city=None, state=None, business_type=None, count=10):
     """Simulate fetching leads from an external source."""
     # In a real application, this would connect to an API or database
@@ -416,4 +801,39 @@ def fetch_leads_from_external_source(city=None, state=None, business_type=None,
 
 # Test function
 if __name__ == "__main__":
-    print("This module provides data about Indian cities and businesses for the EduRishi Sales Assistant.")
\ No newline at end of file
+    import time
+
+    print("This module provides data about Indian cities and businesses for the EduRishi Sales Assistant.")
+
+    for name in ["Bangalore", "gurugram", " new-delhi ", "Raipur", "Hyderbad", "Coimbatre", "Chenai", "Puen",
+                 "Atlantis"]:
+        print(f"{name!r:15} -> {resolve_city(name)!r}, typo of {suggest_city(name)!r} ({get_state_for_city(name)!r})")
+
+    # Towns missing from the table are not taken for a city one typo away
+    for name in ["Sirsa", "Bhind", "Nagaur", "Patan"]:
+        assert resolve_city(name) in (None, name) and suggest_city(name) is None, name
+
+    # Bulk resolution of messy city names
+    messy_names = [random.choice(["Bangalore", "bengaluru ", "MUMBAI", "Bombay", "Hyderbad", "Pune", "Gurugram",
+                                  "chennai", "Calcutta", "Unknown Town"]) + random.choice(["", " ", "."])
+                   for _ in range(500000)]
+    start = time.perf_counter()
+    resolve_city_states(messy_names)
+    elapsed = time.perf_counter() - start
+    print(f"Resolved {len(messy_names)} city names in {elapsed:.2f}s ({len(messy_names) / elapsed:,.0f} rows/s)")
+
+    # Synthetic leads for load tests, one at a time and as a frame
+    start = time.perf_counter()
+    leads = [generate_mock_lead() for _ in range(100000)]
+    elapsed = time.perf_counter() - start
+    print(f"generate_mock_lead: {len(leads)} leads in {elapsed:.2f}s ({len(leads) / elapsed:,.0f} rows/s)")
+
+    reference_date = datetime(2025, 1, 1)
+    for rows in [100000, 1000000]:
+        start = time.perf_counter()
+        frame = generate_mock_leads_frame(rows, seed=42, reference_date=reference_date)
+        elapsed = time.perf_counter() - start
+        print(f"generate_mock_leads_frame: {rows} leads in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+    # The same seed gives the same leads
+    assert frame.equals(generate_mock_leads_frame(rows, seed=42, reference_date=reference_date))
\ No newline at end of file
@@ -0,0 +1,528 @@
+"""
+Lead Processing Module
+
+This module prepares imported lead data before leads are created. It works on whole
+pandas columns at once, so an import chunk is cleaned with a handful of vectorized
+operations instead of per-row Python code. Business types are inferred with keyword
+classifiers compiled into single regular expressions, and duplicate leads are found
+with blocking indexes on phone, email and city plus a rare word of the company name, so
+only leads sharing a key are ever compared.
+"""
+
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import pandas as pd
+
+from indian_cities_data import resolve_city_states, resolve_state
+
+# Location strings look like "City, State 123456", "City - 123456" or just "City"
+PINCODE_PATTERN = r"(?<!\d)(\d{3}\s?\d{3})(?!\d)"
+
+# Keywords for inferring the business type from a profession, in priority order
+PROFESSION_KEYWORDS = [
+    ("Educational", ["principal", "teacher", "academic", "school", "college", "university", "education"]),
+    ("Industrial", ["engineer", "manufacturing", "production", "industrial"]),
+    ("Publishers", ["editor", "publisher", "publication", "content", "media"]),
+    ("Technology", ["software", "tech", "it", "digital", "computer"]),
+    ("Healthcare", ["doctor", "medical", "health", "hospital", "clinic"]),
+    ("Retail", ["retail", "store", "shop", "sales", "merchant"]),
+    ("Government", ["government", "official", "public", "municipal", "department"]),
+    ("Hospitality", ["hotel", "restaurant", "chef", "hospitality", "travel", "tourism", "guest"]),
+    ("Financial", ["bank", "financial", "finance", "insurance", "investment", "accounting", "tax", "wealth",
+                   "credit"])
+]
+
+# Keywords for inferring the business type from a company name, in priority order
+COMPANY_KEYWORDS = [
+    ("Educational", ["school", "college", "university", "academy", "institute", "education"]),
+    ("Industrial", ["industry", "industries", "manufacturing", "factory", "production", "mill"]),
+    ("Publishers", ["publication", "press", "media", "publisher", "news"]),
+    ("Technology", ["tech", "software", "digital", "computer", "it solutions"]),
+    ("Healthcare", ["hospital", "clinic", "medical", "healthcare", "pharmacy"]),
+    ("Retail", ["store", "retail", "shop", "mart", "supermarket"]),
+    ("Government", ["government", "department", "ministry", "municipal", "corporation"]),
+    ("Hospitality", ["hotel", "resort", "restaurant", "cafe", "catering", "travels", "tourism", "hospitality"]),
+    ("Financial", ["bank", "finance", "financial", "insurance", "investments", "capital", "accounting"])
+]
+
+# Keywords this short must be a whole word ("it" must not match "credit")
+SHORT_KEYWORD_LENGTH = 3
+
+# What to do with an imported lead that duplicates an existing or earlier one
+DUPLICATE_POLICIES = ["skip", "merge", "update", "keep"]
+
+# Minimum score for two leads to be considered the same
+DUPLICATE_THRESHOLD = 0.7
+
+# Words ignored when comparing company names
+COMPANY_STOPWORDS = {"the", "pvt", "private", "ltd", "limited", "llp", "inc", "co", "company", "and", "of"}
+
+COMPANY_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Company words too generic to block on; they still count towards the name similarity
+GENERIC_COMPANY_WORDS = {"school", "public", "college", "academy", "institute", "university", "international",
+                         "hospital", "clinic", "hotel", "services", "solutions", "group", "india", "enterprises",
+                         "industries", "centre", "center", "technologies"}
+
+# A company is blocked under its rarest words, the ones after the first only while they
+# appear in at most COMMON_WORD_LEADS leads (so blocks stay small)
+BLOCKING_WORDS = 2
+COMMON_WORD_LEADS = 1000
+
+# Lead fields that are never merged or updated from an import
+PROTECTED_FIELDS = {"id", "source", "created_date", "last_contacted", "score", "status", "status_color", "owner"}
+
+# Lead fields holding comma-separated lists, merged as sets
+LIST_FIELDS = {"product_interested", "product_pitched"}
+
+
+def find_column(frame, name):
+    """The column of a DataFrame matching name case-insensitively, or None."""
+    name = name.lower()
+    for column in frame.columns:
+        if str(column).strip().lower() == name:
+            return column
+    return None
+
+
+def text_column(frame, name):
+    """A column as stripped strings with missing values as "", or all "" if absent."""
+    column = find_column(frame, name)
+    if column is None:
+        return pd.Series("", index=frame.index, dtype=object)
+    values = frame[column]
+    return values.where(values.notna(), "").astype(str).str.strip()
+
+
+def parse_locations(locations):
+    """Split a Series of location strings into city, state and pincode columns."""
+    locations = locations.where(locations.notna(), "").astype(str)
+
+    pincodes = locations.str.extract(PINCODE_PATTERN, expand=False).fillna("").str.replace(" ", "", regex=False)
+    without_pincodes = locations.str.replace(PINCODE_PATTERN, "", regex=True)
+
+    parts = without_pincodes.str.split(",", n=2, expand=True).reindex(columns=[0, 1], fill_value="")
+    parts = parts.fillna("").apply(lambda column: column.str.strip(" -\t"))
+
+    return pd.DataFrame({"city": parts[0], "state": parts[1], "pincode": pincodes}, index=locations.index)
+
+
+def map_unique(values, resolve):
+    """Apply resolve to each distinct value of a Series and map the results back."""
+    codes, uniques = pd.factorize(values)
+    resolved = resolve(pd.Series(uniques, dtype=object))
+    return resolved.iloc[codes].set_axis(values.index) if len(uniques) else resolved.reindex(values.index)
+
+
+def resolve_cities(cities):
+    """Canonical city and state for a Series of distinct city names."""
+    pairs = resolve_city_states(cities)
+    return pd.DataFrame(pairs, columns=["city", "state"], index=cities.index, dtype=object)
+
+
+def resolve_states(states):
+    """Canonical state for a Series of distinct state names."""
+    return pd.Series([resolve_state(state) for state in states], index=states.index, dtype=object)
+
+
+class KeywordClassifier:
+    """Labels text by keywords, compiled into a single regular expression.
+
+    rules is a list of (label, keywords) in priority order. A keyword matches at the start
+    of a word ("tech" matches "Technologies"); keywords of up to three letters must match a
+    whole word. Where keywords overlap the longest one matches ("hospitality" rather than
+    "hospital"), and when keywords of several labels occur the label listed first wins.
+    Results are cached, since the same professions and names repeat across leads.
+    """
+
+    def __init__(self, rules, cache_size=65536):
+        self.labels = [label for label, _ in rules]
+        self.priorities = {}
+        for priority, (_, keywords) in enumerate(rules):
+            for keyword in keywords:
+                self.priorities.setdefault(keyword.lower(), priority)
+
+        patterns = []
+        for keyword in sorted(self.priorities, key=len, reverse=True):
+            pattern = r"\b" + re.escape(keyword)
+            if len(keyword) <= SHORT_KEYWORD_LENGTH:
+                pattern += r"\b"
+            patterns.append(pattern)
+        self.pattern = re.compile("|".join(patterns), re.IGNORECASE)
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, text):
+        """The highest-priority label whose keywords occur in text, or None."""
+        if not isinstance(text, str) or not text:
+            return None
+        best = None
+        for match in self.pattern.finditer(text):
+            priority = self.priorities[match.group(0).lower()]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return None if best is None else self.labels[best]
+
+    def classify_series(self, texts):
+        """Labels for a Series of texts, classifying each distinct text once."""
+        texts = texts.where(texts.notna(), "").astype(str)
+        return map_unique(texts, lambda unique: unique.map(self._classify))
+
+
+# Business type classifiers, compiled once per process
+PROFESSION_CLASSIFIER = KeywordClassifier(PROFESSION_KEYWORDS)
+COMPANY_CLASSIFIER = KeywordClassifier(COMPANY_KEYWORDS)
+
+
+def classify_business_type(profession, company_name=""):
+    """Infer a business type from a profession, then from a company name ("" if unknown)."""
+    return PROFESSION_CLASSIFIER.classify(profession) or COMPANY_CLASSIFIER.classify(company_name) or ""
+
+
+def classify_business_types(professions, company_names):
+    """Infer business types for Series of professions and company names ("" if unknown)."""
+    business_types = PROFESSION_CLASSIFIER.classify_series(professions)
+    business_types = business_types.fillna(COMPANY_CLASSIFIER.classify_series(company_names))
+    return business_types.fillna("")
+
+
+def normalize_phones(phones):
+    """Phone numbers as their last 10 digits ("" when there are fewer)."""
+    digits = phones.where(phones.notna(), "").astype(str).str.replace(r"\.0$", "", regex=True)
+    digits = digits.str.replace(r"\D", "", regex=True).str[-10:]
+    return digits.where(digits.str.len() == 10, "")
+
+
+def normalize_emails(emails):
+    """Email addresses in lower case ("" when not an address)."""
+    emails = emails.where(emails.notna(), "").astype(str).str.strip().str.lower()
+    return emails.where(emails.str.contains("@", regex=False), "")
+
+
+def company_tokens(name):
+    """Significant words of a company name."""
+    return frozenset(COMPANY_WORD_PATTERN.findall(str(name).lower())) - COMPANY_STOPWORDS
+
+
+def name_similarity(tokens, other_tokens):
+    """Dice similarity of two sets of company words (0.0 to 1.0)."""
+    total = len(tokens) + len(other_tokens)
+    return 2 * len(tokens & other_tokens) / total if total else 0.0
+
+
+def company_keys(tokens, city, word_counts):
+    """Blocking keys of a company in a city: (word, city) for its rarest specific words.
+
+    Generic words are only used when a name has no other words. Word frequencies come
+    from word_counts; words missing from it count as unique.
+    """
+    if not tokens or not city:
+        return []
+    words = sorted(tokens - GENERIC_COMPANY_WORDS or tokens, key=lambda word: (word_counts.get(word, 0), word))
+    words = words[:1] + [word for word in words[1:BLOCKING_WORDS] if word_counts.get(word, 0) <= COMMON_WORD_LEADS]
+    city = city.lower()
+    return [(word, city) for word in words]
+
+
+def count_company_words(names):
+    """How many of the names each company word appears in."""
+    word_counts = Counter()
+    for name in names:
+        word_counts.update(company_tokens(name))
+    return word_counts
+
+
+def is_empty(value):
+    """Whether a lead field value is empty (None, NaN, blank, or an empty list/dict)."""
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return value != value
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, (list, dict, set, tuple)):
+        return not value
+    return False
+
+
+class LeadIndex:
+    """Blocking indexes for finding duplicate leads.
+
+    Leads are indexed by normalized phone, email and city plus their rarest company
+    words (see company_keys), every lead sharing a key in the same block. A company
+    block keeps the first lead per distinct name, as later leads with the same name in
+    the same city cannot score higher. A candidate found through any block is scored: a
+    shared phone or email scores 0.6 plus 0.4 times the company name similarity, and a
+    shared city scores the name similarity.
+    """
+
+    def __init__(self, word_counts=None):
+        self.word_counts = word_counts if word_counts is not None else Counter()
+        self.entries = []
+        self.by_phone = defaultdict(list)
+        self.by_email = defaultdict(list)
+        self.by_company = defaultdict(dict)
+
+    @classmethod
+    def from_leads(cls, leads, word_counts=None):
+        """Index a list of existing lead dicts, with company word frequencies for blocking."""
+        index = cls(word_counts)
+        if leads:
+            frame = pd.DataFrame(leads)
+            refs = frame["id"].tolist() if "id" in frame.columns else frame.index.tolist()
+            for ref, name, phone, email, city in zip(refs, text_column(frame, "name").tolist(),
+                                                     normalize_phones(text_column(frame, "phone")).tolist(),
+                                                     normalize_emails(text_column(frame, "email")).tolist(),
+                                                     text_column(frame, "city").tolist()):
+                index.add(ref, name, phone, email, city)
+        return index
+
+    def add(self, ref, name, phone, email, city):
+        """Index a lead under ref."""
+        tokens = company_tokens(name)
+        entry = len(self.entries)
+        self.entries.append((ref, tokens, phone, email, city.lower()))
+        if phone:
+            self.by_phone[phone].append(entry)
+        if email:
+            self.by_email[email].append(entry)
+        for key in company_keys(tokens, city, self.word_counts):
+            self.by_company[key].setdefault(tokens, entry)
+        return entry
+
+    def find(self, name, phone, email, city):
+        """The best matching indexed lead as (ref, score), or (None, 0.0)."""
+        candidates = set()
+        if phone and phone in self.by_phone:
+            candidates.update(self.by_phone[phone])
+        if email and email in self.by_email:
+            candidates.update(self.by_email[email])
+        tokens = company_tokens(name)
+        for key in company_keys(tokens, city, self.word_counts):
+            block = self.by_company.get(key)
+            if block:
+                candidates.update(block.values())
+
+        best_ref, best_score = None, 0.0
+        # Earliest entries first, so ties go to the lead indexed first
+        for entry in sorted(candidates):
+            ref, other_tokens, other_phone, other_email, other_city = self.entries[entry]
+            similarity = name_similarity(tokens, other_tokens)
+            if (phone and phone == other_phone) or (email and email == other_email):
+                score = 0.6 + 0.4 * similarity
+            elif other_city == city.lower():
+                score = similarity
+            else:
+                score = 0.0
+            if score > best_score:
+                best_ref, best_score = ref, score
+                if best_score >= 1.0:
+                    break
+        return best_ref, best_score
+
+
+def merge_lead_fields(target, source, policy):
+    """Copy fields from source into target according to the duplicate policy.
+
+    "merge" only fills empty fields (list fields get the union); "update" overwrites
+    fields with every non-empty source value. Returns the names of changed fields.
+    """
+    changed = []
+    for field, value in source.items():
+        if field in PROTECTED_FIELDS or is_empty(value):
+            continue
+        current = target.get(field)
+        if field in LIST_FIELDS and not is_empty(current) and policy == "merge":
+            items = [item.strip() for item in f"{current},{value}".split(",") if item.strip()]
+            value = ", ".join(dict.fromkeys(items))
+        elif field == "tags" and isinstance(current, list) and isinstance(value, list):
+            value = current + [tag for tag in value if tag not in current]
+        elif policy == "merge" and not is_empty(current):
+            continue
+        if value != current:
+            target[field] = value
+            changed.append(field)
+    return changed
+
+
+def dedupe_leads(frame, existing_leads=(), policy="skip", threshold=DUPLICATE_THRESHOLD):
+    """Find duplicates in an import chunk, within the chunk and against existing leads.
+
+    Run it after normalize_locations() so cities are canonical. Returns (new_rows, report):
+    new_rows holds the rows to create as leads, with rows merged or updated from their
+    in-chunk duplicates. report counts the duplicates and maps existing lead ids to the
+    fields their import duplicates bring in ("updates"), for the caller to apply with
+    merge_lead_fields(). With the "keep" policy nothing is dropped.
+    """
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy: {policy}")
+
+    report = {"rows": len(frame), "new": len(frame), "duplicates": 0, "within_import": 0,
+              "matched_existing": 0, "updates": {}}
+    if policy == "keep" or frame.empty:
+        return frame, report
+
+    names = text_column(frame, "name").tolist()
+    word_counts = count_company_words(names + [str(lead.get("name") or "") for lead in existing_leads])
+    index = LeadIndex.from_leads(existing_leads, word_counts)
+    existing_ids = {entry[0] for entry in index.entries}
+    phones = normalize_phones(text_column(frame, "phone")).tolist()
+    emails = normalize_emails(text_column(frame, "email")).tolist()
+    cities = text_column(frame, "city").tolist()
+
+    records = frame.to_dict("records")
+    keep = []
+    for position, record in enumerate(records):
+        ref, score = index.find(names[position], phones[position], emails[position], cities[position])
+        if score < threshold:
+            index.add(("import", position), names[position], phones[position], emails[position], cities[position])
+            keep.append(position)
+            continue
+
+        report["duplicates"] += 1
+        if ref in existing_ids:
+            report["matched_existing"] += 1
+            if policy != "skip":
+                merge_lead_fields(report["updates"].setdefault(ref, {}), record, policy)
+        else:
+            report["within_import"] += 1
+            if policy != "skip":
+                merge_lead_fields(records[ref[1]], record, policy)
+
+    new_rows = pd.DataFrame([records[position] for position in keep], index=frame.index[keep],
+                            columns=frame.columns)
+    report["new"] = len(new_rows)
+    return new_rows, report
+
+
+def normalize_locations(frame, location_column="location"):
+    """Fill canonical city, state and pincode columns for a chunk of imported leads.
+
+    Existing city, state and pincode values (in columns of any case, which are replaced
+    by lower-case ones) win over what is parsed from the location column. City and state
+    names are resolved to their canonical spelling (aliases included) and a missing state
+    is taken from the city, or from the city a misspelled name is a typo of. Unresolved
+    names are kept as given. Each distinct location, city and state string is parsed or
+    resolved once. Returns a new DataFrame.
+    """
+    frame = frame.copy()
+    parsed = map_unique(text_column(frame, location_column), parse_locations)
+
+    cities = text_column(frame, "city")
+    cities = cities.where(cities != "", parsed["city"])
+    states = text_column(frame, "state")
+    states = states.where(states != "", parsed["state"])
+    pincodes = text_column(frame, "pincode").str.replace(r"\.0$", "", regex=True)
+    pincodes = pincodes.where(pincodes != "", parsed["pincode"])
+
+    resolved_cities = map_unique(cities, resolve_cities)
+    resolved_states = map_unique(states, resolve_states)
+
+    # The values are written to lower-case columns; other spellings ("City") would go stale
+    frame = frame.drop(columns=[column for column in frame.columns
+                                if str(column).strip().lower() in ("city", "state", "pincode")
+                                and column not in ("city", "state", "pincode")])
+    frame["city"] = resolved_cities["city"].fillna(cities)
+    frame["state"] = resolved_states.fillna(states.where(states != "")).fillna(resolved_cities["state"]).fillna("")
+    frame["pincode"] = pincodes
+    return frame
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    sample = pd.DataFrame({
+        "name": ["A School", "B College", "C Academy", "D Institute", "E School"],
+        "location": ["Bangalore, KA 560001", "Gurugram", "Mumbai - 400 001", None, "Hyderbad, Telangana"],
+        "city": [None, None, None, "Chenai", None],
+        "state": [None, None, "", None, None]
+    })
+    print(normalize_locations(sample)[["location", "city", "state", "pincode"]])
+
+    # A given state is kept even when it or the city is not in the table
+    unlisted = normalize_locations(pd.DataFrame({"location": ["Raipur, Chhattisgarh 492001", "Sirsa, Haryana",
+                                                              "Jaipur, Rajputana", "Jaipur"]}))
+    assert unlisted["city"].tolist() == ["Raipur", "Sirsa", "Jaipur", "Jaipur"]
+    assert unlisted["state"].tolist() == ["Chhattisgarh", "Haryana", "Rajputana", "Rajasthan"]
+
+    # Throughput on a large import chunk
+    places = ["Bangalore, Karnataka", "bengaluru", "Mumbai, MH 400001", "Pune - 411001", "Gurugram, Haryana",
+              "Chennai 600001", "Hyderbad", "Kolkata, West Bengal", "New Delhi, DL 110001", "Unknown Town"]
+    rows = 1000000
+    chunk = pd.DataFrame({"location": [random.choice(places) for _ in range(rows)]})
+    start = time.perf_counter()
+    normalize_locations(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"Normalized {rows} locations in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+    # Duplicate detection on a large import against an existing book of leads
+    book = pd.DataFrame({
+        "id": [f"lead-{i}" for i in range(200000)],
+        "name": [f"School Number {i}" for i in range(200000)],
+        "phone": [f"+91 98{i:08d}" for i in range(200000)],
+        "email": [f"contact{i}@school{i}.in" for i in range(200000)],
+        "city": [random.choice(places).split(",")[0] for _ in range(200000)]
+    })
+    existing = book.to_dict("records")
+    incoming = pd.concat([book.sample(50000, random_state=1).drop(columns="id"),
+                          book.sample(50000, random_state=2).drop(columns="id").assign(phone=""),
+                          book.drop(columns="id").assign(
+                              name=[f"New School {i}" for i in range(200000)],
+                              phone=[f"+91 87{i:08d}" for i in range(200000)],
+                              email="")], ignore_index=True)
+    start = time.perf_counter()
+    new_rows, report = dedupe_leads(incoming, existing, policy="merge")
+    elapsed = time.perf_counter() - start
+    print(f"Deduplicated {len(incoming)} rows against {len(existing)} leads in {elapsed:.2f}s: "
+          f"{report['new']} new, {report['matched_existing']} existing, {report['within_import']} within import")
+
+    # Business type inference compared with the previous chain of substring checks
+    from indian_cities_data import generate_mock_lead
+
+    def legacy_business_type(profession, company_name):
+        profession = profession.lower()
+        company_name = company_name.lower()
+        for business_type, keywords in PROFESSION_KEYWORDS[:7]:
+            if any(term in profession for term in keywords):
+                return business_type
+        for business_type, keywords in COMPANY_KEYWORDS[:7]:
+            if any(term in company_name for term in keywords):
+                return business_type
+        return ""
+
+    leads = pd.DataFrame([generate_mock_lead() for _ in range(20000)])
+    leads = pd.concat([leads] * 10, ignore_index=True)
+    professions = leads["profession"].tolist()
+    company_names = leads["name"].tolist()
+
+    start = time.perf_counter()
+    legacy = [legacy_business_type(p, c) for p, c in zip(professions, company_names)]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    uncached = [PROFESSION_CLASSIFIER._classify(p) or COMPANY_CLASSIFIER._classify(c) or ""
+                for p, c in zip(professions, company_names)]
+    uncached_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [classify_business_type(p, c) for p, c in zip(professions, company_names)]
+    compiled_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = classify_business_types(leads["profession"], leads["name"])
+    vectorized_time = time.perf_counter() - start
+
+    assert uncached == compiled == vectorized.tolist()
+    truth = leads["business_type"]
+    print(f"{len(leads)} leads")
+    print(f"Substring chain: {legacy_time:.2f}s, accuracy {(truth == pd.Series(legacy)).mean():.1%}")
+    print(f"Compiled regex:  {uncached_time:.2f}s uncached, {compiled_time:.2f}s cached, "
+          f"accuracy {(truth == pd.Series(compiled)).mean():.1%}")
+    print(f"Vectorized:      {vectorized_time:.2f}s")
+    for profession in ["Hospitality Director", "Credit Manager", "IT Manager", "Admin Dept"]:
+        print(f"{profession!r}: chain {legacy_business_type(profession, '')!r}, "
+              f"compiled {classify_business_type(profession)!r}")
@@ -0,0 +1,260 @@
+"""
+LLM Client Module
+
+This module wraps calls to the language model so a single transient failure does not
+cost the user a response and a slow or failing backend does not block the app. Each
+call gets a timeout, retryable errors (rate limits, overloaded or unavailable backends,
+timeouts) are retried with jittered exponential backoff, and a circuit breaker fails fast
+while the backend is down.
+
+The wrapper only needs a callable, so it can be exercised against FakeBackend without
+network access.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Defaults for calls to the model
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+
+# Defaults for the circuit breaker
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# HTTP status codes and exception names that are worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted", "LLMTimeoutError",
+    "ConnectionError", "TimeoutError"
+}
+
+
+class LLMCallError(Exception):
+    """Raised when a call fails after all retries."""
+
+    def __init__(self, message, attempts=1, last_error=None):
+        super().__init__(message)
+        self.attempts = attempts
+        self.last_error = last_error
+
+
+class LLMTimeoutError(LLMCallError):
+    """Raised when a single attempt takes longer than the timeout."""
+
+
+class CircuitOpenError(LLMCallError):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+def is_retryable(error):
+    """Whether an error is transient and the call should be retried."""
+    code = getattr(error, "code", None)
+    code = code() if callable(code) else code
+    code = getattr(code, "value", code)
+    if isinstance(code, tuple):
+        code = code[0]
+    if code in RETRYABLE_STATUS_CODES:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, rng=random):
+    """Delay before retry number attempt (1-based), with full jitter."""
+    return rng.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets a single trial call through after a cool-down.
+
+    States are "closed" (calls go through), "open" (calls fail fast) and "half_open" (one
+    trial call is allowed; success closes the circuit, failure opens it again).
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go to the backend now."""
+        with self._lock:
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_running = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = self.clock()
+            self._trial_running = False
+
+    def retry_after(self):
+        """Seconds until the breaker lets a trial call through (0 when closed)."""
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+
+class ResilientCaller:
+    """Calls a function with a timeout, retries and a circuit breaker.
+
+    Attempts run on a worker thread so a hung call cannot block the caller past the
+    timeout; the abandoned attempt finishes in the background and its result is dropped.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, breaker=None, retryable=is_retryable, sleep=time.sleep,
+                 max_workers=8):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.retryable = retryable
+        self.sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+
+    def _attempt(self, fn, args, kwargs, timeout):
+        future = self._executor.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise LLMTimeoutError(f"LLM call timed out after {timeout:.0f}s")
+
+    def call(self, fn, *args, timeout=None, on_retry=None, **kwargs):
+        """Call fn(*args, **kwargs) and return its result.
+
+        on_retry, if given, is called as on_retry(attempt, error, delay) before each retry.
+        Raises CircuitOpenError, LLMTimeoutError or LLMCallError on failure.
+        """
+        timeout = timeout or self.timeout
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.breaker.allow():
+                raise CircuitOpenError(
+                    f"LLM backend unavailable, retry in {self.breaker.retry_after():.0f}s",
+                    attempts=attempt - 1
+                )
+
+            try:
+                result = self._attempt(fn, args, kwargs, timeout)
+            except Exception as error:
+                retryable = self.retryable(error)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    # The backend answered; a bad request says nothing about its health
+                    self.breaker.record_success()
+
+                if not retryable or attempt > self.max_retries:
+                    if isinstance(error, LLMCallError):
+                        error.attempts = attempt
+                        raise
+                    raise LLMCallError(str(error), attempts=attempt, last_error=error) from error
+
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                if on_retry:
+                    on_retry(attempt, error, delay)
+                self.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+
+class FakeBackendError(Exception):
+    """Error raised by FakeBackend, carrying an HTTP status code."""
+
+    def __init__(self, code, message=""):
+        super().__init__(message or f"HTTP {code}")
+        self.code = code
+
+
+class FakeBackend:
+    """Local stand-in for the model backend, for exercising the wrapper.
+
+    script is a list of steps consumed one per call: an int status code raises
+    FakeBackendError, a float sleeps that many seconds, and anything else is returned.
+    Once the script is used up every call returns default.
+    """
+
+    def __init__(self, script=None, default="OK"):
+        self.script = list(script or [])
+        self.default = default
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt=""):
+        with self._lock:
+            self.calls += 1
+            step = self.script.pop(0) if self.script else self.default
+        if isinstance(step, bool) or not isinstance(step, (int, float)):
+            return step
+        if isinstance(step, int):
+            raise FakeBackendError(step)
+        time.sleep(step)
+        return self.default
+
+
+if __name__ == "__main__":
+    # Transient errors are retried
+    caller = ResilientCaller(timeout=0.5, base_delay=0.01)
+    backend = FakeBackend([429, 503])
+    print("Retried:", caller.call(backend, "hello"), f"after {backend.calls} calls")
+
+    # A bad request is not retried
+    backend = FakeBackend([400])
+    try:
+        caller.call(backend)
+    except LLMCallError as error:
+        print(f"Not retried: {error} after {error.attempts} attempt(s)")
+
+    # A slow call times out, then the retry succeeds
+    backend = FakeBackend([1.0])
+    print("After timeout:", caller.call(backend), f"after {backend.calls} calls")
+
+    # A backend that keeps failing opens the breaker, which then fails fast
+    fake_time = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: fake_time[0])
+    caller = ResilientCaller(max_retries=1, base_delay=0.0, breaker=breaker)
+    backend = FakeBackend([503] * 10)
+    for _ in range(3):
+        try:
+            caller.call(backend)
+        except LLMCallError as error:
+            print(f"{type(error).__name__}: {error} (breaker {breaker.state}, backend calls {backend.calls})")
+
+    # After the cool-down a trial call closes the breaker again
+    fake_time[0] = 11
+    backend.script = []
+    print("After cool-down:", caller.call(backend), f"(breaker {breaker.state})")
@@ -0,0 +1,230 @@
+"""
+LLM Call Metrics Module
+
+This module records token counts and latency for every call made to the language model.
+Calls are kept in a fixed-size ring buffer so memory use does not grow with the number of
+calls, and summaries (percentiles and histograms) are computed from the buffer on demand.
+The summaries can be exported as JSON for capacity planning.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Number of calls kept in the ring buffer
+DEFAULT_CAPACITY = 1000
+
+# Fields recorded for each call
+CALL_FIELDS = [
+    "timestamp", "model", "prompt_tokens", "output_tokens", "time_to_first_token",
+    "latency", "cache_hit", "retries", "error"
+]
+
+# Numeric fields that get percentile summaries
+SUMMARY_FIELDS = ["latency", "time_to_first_token", "prompt_tokens", "output_tokens"]
+
+# Default percentiles and histogram buckets (upper bounds, in seconds or tokens)
+PERCENTILES = [50, 95, 99]
+HISTOGRAM_BUCKETS = {
+    "latency": [0.5, 1, 2, 4, 8, 16, 32],
+    "time_to_first_token": [0.25, 0.5, 1, 2, 4, 8],
+    "prompt_tokens": [250, 500, 1000, 2000, 4000, 8000],
+    "output_tokens": [100, 250, 500, 1000, 2000, 4000]
+}
+
+
+def percentile(sorted_values, q):
+    """Percentile q (0-100) of already sorted values, interpolating between ranks."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * q / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return sorted_values[int(rank)]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+class CallTimer:
+    """Times a single call; used through LLMMetrics.track()."""
+
+    def __init__(self, metrics, model="", prompt_tokens=0):
+        self.metrics = metrics
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = 0
+        self.cache_hit = False
+        self.retries = 0
+        self.error = None
+        self.started = None
+        self.first_token_at = None
+
+    def first_token(self):
+        """Mark the arrival of the first streamed token."""
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def retry(self):
+        """Count a retry; a first token streamed by the failed attempt no longer counts."""
+        self.retries += 1
+        self.first_token_at = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ended = time.perf_counter()
+        if exc_type is not None and self.error is None:
+            self.error = exc_type.__name__
+        first_token_at = self.first_token_at or ended
+        self.metrics.record(
+            model=self.model,
+            prompt_tokens=self.prompt_tokens,
+            output_tokens=self.output_tokens,
+            time_to_first_token=first_token_at - self.started,
+            latency=ended - self.started,
+            cache_hit=self.cache_hit,
+            retries=self.retries,
+            error=self.error
+        )
+        return False
+
+
+class LLMMetrics:
+    """Ring buffer of per-call LLM metrics with percentile and histogram summaries."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, on_record=None):
+        self.capacity = capacity
+        self._calls = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.total_calls = 0
+        # Called with every recorded call, e.g. to feed process-wide metrics
+        self.on_record = on_record
+
+    def record(self, model="", prompt_tokens=0, output_tokens=0, time_to_first_token=None,
+               latency=0.0, cache_hit=False, retries=0, error=None):
+        """Record one call; the oldest call is dropped once the buffer is full."""
+        call = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "model": model,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "output_tokens": int(output_tokens or 0),
+            "time_to_first_token": latency if time_to_first_token is None else time_to_first_token,
+            "latency": latency,
+            "cache_hit": bool(cache_hit),
+            "retries": int(retries or 0),
+            "error": error
+        }
+        with self._lock:
+            self._calls.append(call)
+            self.total_calls += 1
+        if self.on_record is not None:
+            self.on_record(call)
+        return call
+
+    def track(self, model="", prompt_tokens=0):
+        """Context manager timing a call and recording it on exit."""
+        return CallTimer(self, model, prompt_tokens)
+
+    def calls(self):
+        """Snapshot of the calls in the buffer, oldest first."""
+        with self._lock:
+            return list(self._calls)
+
+    def clear(self):
+        """Drop all recorded calls."""
+        with self._lock:
+            self._calls.clear()
+            self.total_calls = 0
+
+    def summary(self, percentiles=PERCENTILES):
+        """Counts, rates and percentiles over the calls in the buffer."""
+        calls = self.calls()
+        succeeded = [call for call in calls if not call["error"]]
+
+        summary = {
+            "calls": len(calls),
+            "total_calls": self.total_calls,
+            "capacity": self.capacity,
+            "errors": len(calls) - len(succeeded),
+            "error_rate": (len(calls) - len(succeeded)) / len(calls) if calls else 0.0,
+            "cache_hit_rate": sum(call["cache_hit"] for call in calls) / len(calls) if calls else 0.0,
+            "retries": sum(call["retries"] for call in calls),
+            "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+            "output_tokens": sum(call["output_tokens"] for call in calls),
+            "percentiles": {}
+        }
+
+        # Percentiles cover successful calls only, failures are counted above
+        for field in SUMMARY_FIELDS:
+            values = sorted(call[field] for call in succeeded)
+            summary["percentiles"][field] = {f"p{q}": percentile(values, q) for q in percentiles}
+            summary["percentiles"][field]["mean"] = sum(values) / len(values) if values else None
+
+        return summary
+
+    def histogram(self, field, buckets=None):
+        """Bucket counts for a numeric field as a list of (label, count)."""
+        buckets = buckets or HISTOGRAM_BUCKETS[field]
+        counts = [0] * (len(buckets) + 1)
+        for call in self.calls():
+            if call["error"]:
+                continue
+            value = call[field]
+            index = 0
+            while index < len(buckets) and value > buckets[index]:
+                index += 1
+            counts[index] += 1
+
+        labels = [f"≤{bound:g}" for bound in buckets] + [f">{buckets[-1]:g}"]
+        return list(zip(labels, counts))
+
+    def export(self, include_calls=True):
+        """Machine-readable export of the summary, histograms and (optionally) raw calls."""
+        export = {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "summary": self.summary(),
+            "histograms": {field: dict(self.histogram(field)) for field in HISTOGRAM_BUCKETS}
+        }
+        if include_calls:
+            export["calls"] = self.calls()
+        return export
+
+    def export_json(self, include_calls=True):
+        """Export as a JSON string."""
+        return json.dumps(self.export(include_calls), ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    import random
+
+    # Simulated calls to show the summary and the cost of recording
+    metrics = LLMMetrics(capacity=500)
+    for _ in range(2000):
+        latency = random.lognormvariate(0.5, 0.6)
+        metrics.record(
+            model="gemini-1.5-flash",
+            prompt_tokens=random.randint(400, 1500),
+            output_tokens=random.randint(150, 600),
+            time_to_first_token=latency * random.uniform(0.2, 0.5),
+            latency=latency,
+            cache_hit=random.random() < 0.1,
+            retries=1 if random.random() < 0.05 else 0,
+            error="ResourceExhausted" if random.random() < 0.02 else None
+        )
+
+    summary = metrics.summary()
+    print(f"Buffered {summary['calls']} of {summary['total_calls']} calls, error rate {summary['error_rate']:.1%}")
+    for field, values in summary["percentiles"].items():
+        print(f"{field:20s} p50={values['p50']:8.2f} p95={values['p95']:8.2f} p99={values['p99']:8.2f}")
+    print("Latency histogram:", metrics.histogram("latency"))
+
+    start = time.perf_counter()
+    for _ in range(100000):
+        metrics.record(latency=1.0)
+    elapsed = time.perf_counter() - start
+    print(f"Recording cost: {elapsed / 100000 * 1e6:.2f} µs per call")
@@ -0,0 +1,252 @@
+"""
+Product Catalog Module
+
+This module holds the single EduRishi product catalog used across the app. Product codes
+are looked up through a normalized alias index, so "AI_Tutor", "ai tutor" and "AI Tutor"
+all resolve to the same product, and the category and bundle groupings are built once
+when the module is imported, so every session in the process shares them.
+"""
+
+import re
+
+# Product catalog, keyed by canonical product code
+PRODUCT_CATALOG = {
+    "ELAP": {
+        "name": "ELAP (Experiential Learning and Assessment Program)",
+        "description": "Comprehensive experiential learning program designed for schools",
+        "brochure": "EduRishi Final Brochures/ELAP_Brochure.pdf",
+        "pricing": "₹800 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=elapoverview"
+    },
+    "MDL": {
+        "name": "MDL (Multi-Dimensional Learning)",
+        "description": "Multi-dimensional approach to learning that enhances student engagement",
+        "brochure": "EduRishi Final Brochures/MDL_Brochure.pdf",
+        "pricing": "₹1,200 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=mdloverview"
+    },
+    "PBL": {
+        "name": "PBL (Project-Based Learning)",
+        "description": "Project-based learning methodology for practical skill development",
+        "brochure": "EduRishi Final Brochures/PBL_Brochure.pdf",
+        "pricing": "₹950 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=pbloverview"
+    },
+    "ICT": {
+        "name": "ICT (Information and Communication Technology)",
+        "description": "Technology integration in education for digital literacy",
+        "brochure": "EduRishi Final Brochures/ICT_Brochure.pdf",
+        "pricing": "₹1,500 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=ictoverview"
+    },
+    "AI Workshop": {
+        "name": "AI Workshop",
+        "description": "Hands-on workshops introducing artificial intelligence concepts",
+        "brochure": "AI_Workshop_Brochure.pdf",
+        "pricing": "₹15,000 per workshop (up to 30 participants)",
+        "video": "https://www.youtube.com/watch?v=aiworkshopoverview"
+    },
+    "LMS": {
+        "name": "Learning Management System",
+        "description": "Comprehensive platform for managing digital learning content",
+        "brochure": "LMS_Brochure.pdf",
+        "pricing": "₹25,000 per school (annual license)",
+        "video": "https://www.youtube.com/watch?v=lmsoverview"
+    },
+    "AI software": {
+        "name": "AI-Powered Educational Software",
+        "description": "Advanced software using AI to personalize learning experiences",
+        "brochure": "AI_Software_Brochure.pdf",
+        "pricing": "₹1,800 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=aisoftwareoverview"
+    },
+    "AI tutor": {
+        "name": "AI Tutor",
+        "description": "Virtual tutoring system powered by artificial intelligence",
+        "brochure": "AI_Tutor_Brochure.pdf",
+        "pricing": "₹1,200 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=aitutoroverview"
+    },
+    "Simulation": {
+        "name": "Educational Simulations",
+        "description": "Interactive simulations for science, math, and other subjects",
+        "brochure": "Simulations_Brochure.pdf",
+        "pricing": "₹900 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=simulationsoverview"
+    },
+    "E2MP": {
+        "name": "E2MP (Education to Market Place)",
+        "description": "Program connecting education with real-world market skills",
+        "brochure": "E2MP_Brochure.pdf",
+        "pricing": "₹1,500 per student (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=e2mpoverview"
+    },
+    "Franchise Proposal": {
+        "name": "EduRishi Franchise Opportunity",
+        "description": "Become an EduRishi franchise partner and expand educational reach",
+        "brochure": "Franchise_Proposal.pdf",
+        "pricing": "Starting from ₹5,00,000 (investment)",
+        "video": "https://www.youtube.com/watch?v=franchiseoverview"
+    },
+    "Tech Franchise": {
+        "name": "Technology Franchise",
+        "description": "Franchise focused on technology education and AI integration",
+        "brochure": "Tech_Franchise_Brochure.pdf",
+        "pricing": "Starting from ₹7,50,000 (investment)",
+        "video": "https://www.youtube.com/watch?v=techfranchiseoverview"
+    },
+    "Entrepreneurship_Workshop": {
+        "name": "Entrepreneurship Workshop",
+        "description": "Workshops focused on developing entrepreneurial skills",
+        "brochure": "Entrepreneurship_Workshop_Brochure.pdf",
+        "pricing": "₹20,000 per workshop (up to 30 participants)",
+        "video": "https://www.youtube.com/watch?v=entrepreneurshipoverview"
+    },
+    "E2MP workshop": {
+        "name": "E2MP Workshop",
+        "description": "Hands-on workshops delivering the Education to Market Place program",
+        "brochure": "E2MP_Brochure.pdf",
+        "video": "https://www.youtube.com/watch?v=e2mpoverview"
+    },
+    "E2MP software": {
+        "name": "E2MP Software",
+        "description": "Software platform supporting the Education to Market Place program",
+        "brochure": "E2MP_Brochure.pdf",
+        "video": "https://www.youtube.com/watch?v=e2mpoverview"
+    },
+    "Book Publisher": {
+        "name": "Book Publisher",
+        "description": "Educational book publishing services for schools",
+        "brochure": "Book_Publisher_Brochure.pdf",
+        "video": "https://www.youtube.com/watch?v=bookpublisher"
+    },
+    "AI_Simulation": {
+        "name": "AI Simulation",
+        "description": "Advanced AI simulations for interactive learning experiences",
+        "brochure": "AI_Simulation_Brochure.pdf",
+        "pricing": "₹1500 per classroom (annual subscription)",
+        "video": "https://www.youtube.com/watch?v=aisimulation"
+    },
+    "AI_Integration_Workshop": {
+        "name": "AI Integration in Teaching Workshop",
+        "description": "Comprehensive workshop for educators on integrating AI in teaching methodologies",
+        "brochure": "AI_Integration_Workshop_Brochure.pdf",
+        "pricing": "₹25,000 per workshop (up to 30 participants)",
+        "video": "https://www.youtube.com/watch?v=aiintegration"
+    }
+}
+
+# Alternative spellings that normalization alone does not resolve
+PRODUCT_ALIASES = {
+    "Simulations": "Simulation",
+    "Educational Simulations": "Simulation",
+    "AI Tutor": "AI tutor",
+    "E2MP workshops": "E2MP workshop",
+    "Entrepreneurship Workshop": "Entrepreneurship_Workshop",
+    "Entrepreneurship and Mentorship Workshop": "Entrepreneurship_Workshop",
+    "Franchise": "Franchise Proposal",
+    "Learning Management System": "LMS",
+    "AI Integration Workshop": "AI_Integration_Workshop"
+}
+
+# Product categories shown in the catalog
+PRODUCT_CATEGORIES = {
+    "Core Educational Programs": ["ELAP", "MDL", "PBL", "ICT", "LMS"],
+    "AI & Technology Solutions": ["AI Workshop", "AI software", "AI tutor", "Simulation", "AI_Simulation",
+                                  "AI_Integration_Workshop"],
+    "Educational Materials & Programs": ["Book Publisher", "E2MP", "E2MP workshop", "E2MP software"],
+    "Business & Entrepreneurship": ["Franchise Proposal", "Tech Franchise", "Entrepreneurship_Workshop"]
+}
+
+# Product bundles
+PRODUCT_BUNDLES = {
+    "School Starter Package": ["ELAP", "MDL", "ICT"],
+    "Advanced Learning Suite": ["ELAP", "PBL", "AI Workshop"],
+    "Complete School Transformation": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop"],
+    "LMS Integration Package": ["LMS", "ELAP", "MDL"],
+    "AI Education Bundle": ["AI tutor", "AI software", "AI Workshop"],
+    "Simulation Learning Package": ["Simulation", "AI_Simulation", "PBL"],
+    "E2MP Complete Solution": ["E2MP", "E2MP workshop", "E2MP software"],
+    "University Package": ["E2MP software", "Simulation", "AI tutor"]
+}
+
+CODE_SEPARATORS = re.compile(r"[\s_\-]+")
+
+
+def normalize_code(text):
+    """Normalize a product code or name for lookups (case, spacing and underscores ignored)."""
+    return CODE_SEPARATORS.sub("", str(text).lower())
+
+
+def build_alias_index(catalog, aliases):
+    """Map normalized codes, product names and aliases to canonical product codes."""
+    index = {}
+    for code, details in catalog.items():
+        index.setdefault(normalize_code(details["name"]), code)
+    for alias, code in aliases.items():
+        index[normalize_code(alias)] = code
+    # Canonical codes always win over names and aliases
+    for code in catalog:
+        index[normalize_code(code)] = code
+    return index
+
+
+# Lookup tables, built once per process
+PRODUCT_ALIAS_INDEX = build_alias_index(PRODUCT_CATALOG, PRODUCT_ALIASES)
+PRODUCT_CATEGORY_BY_CODE = {
+    code: category for category, codes in PRODUCT_CATEGORIES.items() for code in codes
+}
+
+
+def resolve_product_code(text):
+    """The canonical code for a product code, name or alias, or None if unknown."""
+    if text is None:
+        return None
+    return PRODUCT_ALIAS_INDEX.get(normalize_code(text))
+
+
+def resolve_product_codes(text):
+    """Canonical codes for a comma-separated list of products, skipping unknown ones."""
+    codes = []
+    for part in str(text or "").split(","):
+        code = resolve_product_code(part)
+        if code and code not in codes:
+            codes.append(code)
+    return codes
+
+
+def get_product(text):
+    """Product details for a product code, name or alias, or None if unknown."""
+    code = resolve_product_code(text)
+    return PRODUCT_CATALOG[code] if code else None
+
+
+def get_products_in_category(category):
+    """(code, details) pairs for the products in a category."""
+    return [(code, PRODUCT_CATALOG[code]) for code in PRODUCT_CATEGORIES.get(category, [])]
+
+
+def get_product_category(text):
+    """The category of a product, or None."""
+    return PRODUCT_CATEGORY_BY_CODE.get(resolve_product_code(text))
+
+
+if __name__ == "__main__":
+    import time
+
+    for text in ["AI_Tutor", "ai tutor", "Simulations", "E2MP workshop",
+                 "ELAP (Experiential Learning and Assessment Program)", "Unknown product"]:
+        print(f"{text!r:60} -> {resolve_product_code(text)!r}")
+
+    # Every category and bundle entry resolves to a catalog product
+    for grouping in (PRODUCT_CATEGORIES, PRODUCT_BUNDLES):
+        for name, codes in grouping.items():
+            missing = [code for code in codes if code not in PRODUCT_CATALOG]
+            assert not missing, f"{name}: {missing}"
+
+    start = time.perf_counter()
+    for _ in range(100000):
+        resolve_product_code("AI_Tutor")
+    elapsed = time.perf_counter() - start
+    print(f"{len(PRODUCT_CATALOG)} products, {len(PRODUCT_ALIAS_INDEX)} index keys, "
+          f"{elapsed / 100000 * 1e6:.2f} µs per lookup")
@@ -0,0 +1,418 @@
+"""
+Prompt Builder Module
+
+This module assembles the Gemini prompt used by the EduRishi Sales Assistant to draft
+sales responses. The fixed instruction sections are built once at import, customer and
+product data are serialized as compact JSON with empty and NaN fields left out, and the
+JSON block for each product is cached, so building a prompt is cheap and the prompt
+itself is as short as it can be.
+
+Long conversation histories are compacted before they go into the prompt: the most
+recent turns are kept word for word and older turns are folded into a rolling summary
+that is cached, so the history section stays within a token budget however long the
+deal has been running.
+"""
+
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import pandas as pd
+
+# Fixed sections of the prompt, built once per process
+PROMPT_HEADER = (
+    "You are an AI sales agent for EDURISHI EDUVENTURES PVT LTD, an educational technology company.\n"
+    "Your task is to generate a personalized sales response based on the customer data and enquiry details provided.\n"
+)
+
+HISTORY_SECTION = (
+    "## Previous Conversation History:\n"
+    "{history}\n"
+    "Please continue the conversation based on this history.\n"
+)
+
+INTEREST_SECTION = (
+    "## Products Customer Is Interested In:\n"
+    "The customer has expressed specific interest in: {products}\n"
+    "Focus your response on these products, highlighting their benefits for the customer's specific needs.\n"
+)
+
+BUDGET_SECTION = (
+    "## Budget Information:\n"
+    "The customer has indicated a budget of: {budget}\n"
+    "Tailor your recommendations to align with this budget constraint.\n"
+)
+
+RESPONSE_FORMAT_SECTION = (
+    "## Response Format:\n"
+    "1. Start with a friendly greeting using the customer's name.\n"
+    "2. Provide a brief summary of their enquiry to show understanding.\n"
+    "3. Create a tailored sales pitch based on their data (profession, interests, etc.).\n"
+    "4. Specifically mention the recommended EDURISHI EDUVENTURES PVT LTD's educational solutions that would benefit them.\n"
+    "5. If they have expressed interest in specific products, emphasize those products.\n"
+    "6. If they have budget constraints, acknowledge them and explain how our solutions provide value within their budget.\n"
+    "7. End with a clear call to action (schedule a call, visit website, etc.).\n"
+    "\n"
+    "Make your response conversational, professional, and persuasive. "
+    "Focus on how EDURISHI's educational products/services solve their specific needs.\n"
+)
+
+PERSONALIZE_SECTION = (
+    "## Draft Response:\n"
+    "The draft below was written for a very similar enquiry from another customer with the same role and "
+    "product interest. Rewrite it for this customer: use their name and details, match any numbers "
+    "(students, budget, dates) in their enquiry, and keep the product facts and pricing unchanged.\n"
+    "{draft}\n"
+)
+
+# Pattern used to approximate the tokenizer when counting prompt tokens
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# Defaults for sales history compaction
+HISTORY_KEEP_TURNS = 6
+HISTORY_TOKEN_BUDGET = 600
+HISTORY_CHUNK_TURNS = 4
+
+# A line starting with a short label and a colon (e.g. "Customer:") begins a new turn
+TURN_PATTERN = re.compile(r"^\s*[A-Za-z][\w .'()-]{0,30}:\s")
+
+# Words that mark a sentence worth keeping in a summary
+SUMMARY_KEYWORDS = {
+    "price", "pricing", "cost", "budget", "quote", "discount", "students", "demo", "meeting",
+    "deadline", "decision", "approve", "approved", "agree", "agreed", "sign", "contract",
+    "trial", "concern", "interested", "follow", "next", "board", "payment"
+}
+
+
+def is_missing(value):
+    """Check whether a field value is empty (None, NaN/NaT or a blank string)."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, float):
+        return math.isnan(value)
+    if isinstance(value, (list, tuple, set, dict)):
+        return False
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def compact_json(data):
+    """Serialize data as JSON without indentation or extra spaces."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def clean_customer_data(customer_data):
+    """Drop empty and NaN fields from a customer record."""
+    return {key: value for key, value in customer_data.items() if not is_missing(value)}
+
+
+@lru_cache(maxsize=1024)
+def _product_block(name, description, pricing):
+    return compact_json({"name": name, "description": description, "pricing": pricing})
+
+
+def serialize_products(product_info):
+    """Serialize product summaries as a compact JSON list, reusing cached product blocks."""
+    blocks = [
+        _product_block(product.get("name"), product.get("description"),
+                       product.get("pricing", "Contact for pricing"))
+        for product in product_info
+    ]
+    return "[" + ",".join(blocks) + "]"
+
+
+def build_sales_prompt(customer_data, enquiry_details, product_info, sales_history=""):
+    """Build the prompt for a personalized sales response."""
+    sections = [
+        PROMPT_HEADER,
+        "## Customer Data:\n" + compact_json(clean_customer_data(customer_data)) + "\n",
+        "## Enquiry Details:\n" + str(enquiry_details).strip() + "\n",
+        "## Recommended Products:\n" + serialize_products(product_info) + "\n"
+    ]
+
+    if sales_history:
+        sections.append(HISTORY_SECTION.format(history=str(sales_history).strip()))
+
+    if not is_missing(customer_data.get("product_interested")):
+        sections.append(INTEREST_SECTION.format(products=customer_data["product_interested"]))
+
+    if not is_missing(customer_data.get("budget")):
+        sections.append(BUDGET_SECTION.format(budget=customer_data["budget"]))
+
+    sections.append(RESPONSE_FORMAT_SECTION)
+    return "\n".join(sections)
+
+
+def build_personalization_prompt(customer_data, enquiry_details, draft):
+    """Build a short prompt asking the model to personalize a cached draft response."""
+    return "\n".join([
+        PROMPT_HEADER,
+        "## Customer Data:\n" + compact_json(clean_customer_data(customer_data)) + "\n",
+        "## Enquiry Details:\n" + str(enquiry_details).strip() + "\n",
+        PERSONALIZE_SECTION.format(draft=str(draft).strip())
+    ])
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in text without calling the model.
+
+    Roughly one token per four letters of a word, per three digits of a number and per
+    punctuation mark, plus one per four characters of indentation or blank lines.
+    """
+    tokens = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        tokens += max(1, math.ceil(len(piece) / 4)) if piece.isalpha() else max(1, math.ceil(len(piece) / 3))
+    # Indentation and blank lines are not free either
+    tokens += sum(len(run) // 4 for run in re.findall(r"\s{2,}", text))
+    return tokens
+
+
+def keep_last_tokens(text, max_tokens, count_tokens=estimate_tokens):
+    """The longest end of text (cut at a word boundary) that fits in max_tokens.
+
+    The text itself is not changed, only cut: the start offset is found with a binary
+    search over count_tokens.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high) // 2
+        if count_tokens(text[middle:]) <= max_tokens:
+            high = middle
+        else:
+            low = middle + 1
+    # Start at the next word rather than in the middle of one
+    if 0 < low < len(text) and not text[low - 1].isspace():
+        boundary = re.search(r"\s", text[low:])
+        low = low + boundary.end() if boundary else len(text)
+    return text[low:].lstrip()
+
+
+def split_turns(history):
+    """Split a pasted conversation into turns.
+
+    Lines starting with a speaker label such as "Customer:" begin a new turn; when the
+    text has no speaker labels, blank lines separate the turns instead.
+    """
+    lines = str(history).strip().splitlines()
+    if any(TURN_PATTERN.match(line) for line in lines):
+        turns = []
+        for line in lines:
+            if TURN_PATTERN.match(line) or not turns:
+                turns.append(line.strip())
+            elif line.strip():
+                turns[-1] += "\n" + line.strip()
+        return turns
+    return [turn.strip() for turn in re.split(r"\n\s*\n", str(history)) if turn.strip()]
+
+
+def split_sentences(text):
+    """Split text into sentences, keeping each turn's speaker label on its sentences."""
+    sentences = []
+    for turn in text.splitlines():
+        label = ""
+        match = TURN_PATTERN.match(turn)
+        if match:
+            label, turn = turn[:match.end()].strip() + " ", turn[match.end():]
+        for sentence in re.split(r"(?<=[.!?])\s+", turn.strip()):
+            if sentence:
+                sentences.append(label + sentence)
+    return sentences
+
+
+def summarize_turns(previous_summary, turns, max_tokens, count_tokens=estimate_tokens):
+    """Fold turns into a running summary by keeping their most informative sentences.
+
+    Sentences with numbers, questions, product codes or deal keywords score highest;
+    the best ones are kept in their original order until max_tokens is reached.
+    """
+    sentences = split_sentences(previous_summary) + split_sentences("\n".join(turns))
+
+    scored = []
+    for position, sentence in enumerate(sentences):
+        words = set(re.findall(r"[a-z]+", sentence.lower()))
+        score = 0
+        score += 2 if re.search(r"\d|₹", sentence) else 0
+        score += 1 if "?" in sentence else 0
+        score += 1 if re.search(r"\b[A-Z]{2,}\d*\b", sentence) else 0
+        score += len(words & SUMMARY_KEYWORDS)
+        scored.append((score, position, sentence))
+
+    kept = []
+    used_tokens = 0
+    for score, position, sentence in sorted(scored, key=lambda item: (-item[0], -item[1])):
+        sentence_tokens = count_tokens(sentence)
+        if used_tokens + sentence_tokens > max_tokens:
+            continue
+        kept.append((position, sentence))
+        used_tokens += sentence_tokens
+
+    return "\n".join(sentence for _, sentence in sorted(kept))
+
+
+class HistoryCompactor:
+    """Keeps a conversation history within a token budget.
+
+    The last keep_turns turns are kept verbatim. Older turns are summarized in fixed
+    chunks of chunk_turns, each chunk folded into the summary of the chunks before it.
+    Chunks start at the beginning of the conversation, so as the history grows the
+    earlier summaries are served from the cache and only new chunks are summarized.
+
+    summarize is called as summarize(previous_summary, turns, max_tokens) and can be
+    replaced, for example with a function asking the model for a summary.
+    """
+
+    def __init__(self, keep_turns=HISTORY_KEEP_TURNS, token_budget=HISTORY_TOKEN_BUDGET,
+                 chunk_turns=HISTORY_CHUNK_TURNS, summarize=None, count_tokens=estimate_tokens,
+                 cache_size=512):
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.chunk_turns = chunk_turns
+        self.summarize = summarize or summarize_turns
+        self.count_tokens = count_tokens
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _summarize_chunk(self, previous_summary, turns, max_tokens):
+        key = hashlib.sha1("\x00".join([previous_summary, str(max_tokens)] + turns).encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._cache[key]
+            self.cache_misses += 1
+
+        summary = self.summarize(previous_summary, turns, max_tokens)
+
+        with self._lock:
+            self._cache[key] = summary
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
+
+    def compact(self, history, token_budget=None):
+        """Compact a history so it fits within the token budget."""
+        token_budget = token_budget or self.token_budget
+        if not history or self.count_tokens(history) <= token_budget:
+            return history
+
+        turns = split_turns(history)
+        recent = turns[-self.keep_turns:]
+        older = turns[:-self.keep_turns] if len(turns) > self.keep_turns else []
+
+        # Keep a quarter of the budget for the summary and its headers
+        recent_budget = token_budget * 3 // 4
+        while len(recent) > 1 and sum(self.count_tokens(turn) for turn in recent) > recent_budget:
+            older.append(recent.pop(0))
+        # A single very long turn keeps its end, which is the latest part
+        if self.count_tokens(recent[0]) > recent_budget:
+            marker = "... "
+            recent[0] = marker + keep_last_tokens(recent[0], recent_budget - self.count_tokens(marker),
+                                                  self.count_tokens)
+        # The summary budget does not depend on the recent turns so cached chunks stay valid
+        summary_budget = token_budget - recent_budget - 20
+
+        summary = ""
+        for start in range(0, len(older), self.chunk_turns):
+            summary = self._summarize_chunk(summary, older[start:start + self.chunk_turns], summary_budget)
+
+        sections = []
+        if summary:
+            sections.append("Summary of earlier conversation:\n" + summary)
+        sections.append("Most recent turns:\n" + "\n".join(recent))
+
+        return "\n\n".join(sections)
+
+
+# Process-wide compactor so summaries are shared between sessions
+default_history_compactor = HistoryCompactor()
+
+
+def compact_sales_history(sales_history, token_budget=None):
+    """Compact a sales history with the shared compactor."""
+    return default_history_compactor.compact(sales_history, token_budget)
+
+
+def prompt_size_report(customer_data, enquiry_details, product_info, sales_history="", count_tokens=None,
+                       history_token_budget=None):
+    """Size of the sales prompt and how much compacting the history saved.
+
+    count_tokens, if given, is used instead of the local estimate (for example a
+    function calling the model's token counting endpoint).
+    """
+    count_tokens = count_tokens or estimate_tokens
+    compacted_history = compact_sales_history(sales_history, history_token_budget)
+    prompt = build_sales_prompt(customer_data, enquiry_details, product_info, compacted_history)
+
+    history_tokens = count_tokens(sales_history) if sales_history else 0
+    compacted_history_tokens = count_tokens(compacted_history) if compacted_history else 0
+    return {
+        "prompt_chars": len(prompt),
+        "prompt_tokens": count_tokens(prompt),
+        "history_tokens": history_tokens,
+        "compacted_history_tokens": compacted_history_tokens,
+        "history_reduction": 1 - compacted_history_tokens / history_tokens if history_tokens else 0.0
+    }
+
+
+# Report for a sample customer
+if __name__ == "__main__":
+    sample_customer = {
+        "name": "ABC School",
+        "contact_name": "John Doe",
+        "profession": "Principal",
+        "email": "john@abcschool.com",
+        "phone": "9876543210",
+        "contact_person": float("nan"),
+        "product_pitched": float("nan"),
+        "product_interested": "ELAP, MDL",
+        "budget": "100000",
+        "City": "Mumbai",
+        "State": "Maharashtra",
+        "Address": float("nan"),
+        "Pincode": float("nan")
+    }
+    sample_products = [
+        {"name": "ELAP (Experiential Learning and Assessment Program)",
+         "description": "Comprehensive experiential learning program designed for schools",
+         "pricing": "₹800 per student (annual subscription)"},
+        {"name": "MDL (Multi-Dimensional Learning)",
+         "description": "Multi-dimensional approach to learning that enhances student engagement",
+         "pricing": "₹1,200 per student (annual subscription)"},
+        {"name": "PBL (Project-Based Learning)",
+         "description": "Project-based learning methodology for practical skill development",
+         "pricing": "₹950 per student (annual subscription)"}
+    ]
+
+    # The comparison with the prompt this replaced is in benchmark_suite.py --compare-legacy
+    enquiry = "What is the pricing of ELAP for 500 students?"
+    report = prompt_size_report(sample_customer, enquiry, sample_products)
+    print(f"Prompt: {report['prompt_chars']} chars, ~{report['prompt_tokens']} tokens")
+
+    # Compact a long running conversation
+    long_history = []
+    for week in range(1, 41):
+        long_history.append(f"Customer: Week {week}, we discussed the ELAP rollout for {400 + week} students. "
+                            f"Can you share the updated pricing?")
+        long_history.append(f"Sales: Sure, the quote is ₹{800 - week} per student and a demo is scheduled "
+                            f"for next week. Thanks for your time.")
+    long_history = "\n".join(long_history)
+    compactor = HistoryCompactor()
+    compacted = compactor.compact(long_history)
+    print(f"History: ~{estimate_tokens(long_history)} tokens -> ~{estimate_tokens(compacted)} tokens "
+          f"(budget {compactor.token_budget})")
+    compactor.compact(long_history + "\nCustomer: Please send the contract.")
+    print(f"Summary cache: {compactor.cache_hits} hits, {compactor.cache_misses} misses")
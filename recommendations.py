@@ -0,0 +1,222 @@
+"""
+Product Recommendations Module
+
+This module recommends EduRishi products for customers. Product codes are resolved through
+the product catalog's alias index, the role table and the product detail records are built
+once when a Recommender is created, and recommendations are memoized on the customer's
+product interest, pitched products and profession, so the many customers sharing those
+fields cost one computation. recommend_batch() computes recommendations for a whole
+DataFrame at once, resolving each distinct combination of those fields once.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from product_catalog import PRODUCT_CATALOG, resolve_product_code
+
+# Number of products recommended per customer
+RECOMMENDATION_LIMIT = 3
+
+# Role-based recommendations
+ROLE_PRODUCTS = {
+    # School role-based recommendations from the CSV file
+    "School Relationship Manager": ["ELAP", "MDL", "PBL", "ICT", "AI tutor", "Simulation", "E2MP"],
+    "Admin Dept": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "LMS", "AI software", "AI tutor"],
+    "Admin Head": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "AI tutor", "Simulation", "Franchise Proposal"],
+    "CEO": ["AI software", "E2MP", "Franchise Proposal", "Tech Franchise", "Entrepreneurship_Workshop"],
+    "VC": ["AI tutor", "E2MP workshop", "E2MP software", "Simulations", "AI software"],
+
+    # Additional roles that might be in other CSV files
+    "Principal": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "Franchise Proposal", "Tech Franchise"],
+    "Teacher": ["ELAP", "PBL", "AI Workshop", "E2MP", "AI tutor", "Simulation"],
+    "IT Director": ["AI software", "LMS", "ICT", "Simulations", "E2MP software"],
+    "Academic Coordinator": ["ELAP", "MDL", "PBL", "AI tutor", "E2MP workshop"],
+
+    # Generic profession-based recommendations
+    "software_engineer": ["AI software", "E2MP software", "Entrepreneurship_Workshop"],
+    "marketing_manager": ["Digital Marketing Masterclass", "LMS", "Entrepreneurship_Workshop"],
+    "business_owner": ["AI software", "Entrepreneurship_Workshop", "Franchise Proposal"],
+    "education_consultant": ["ELAP", "MDL", "PBL", "ICT", "AI Workshop", "LMS", "E2MP"]
+}
+
+# Products recommended when nothing more specific is known
+GENERIC_PRODUCTS = [
+    "ELAP", "MDL", "PBL", "ICT", "AI Workshop", "AI_Tutor", "AI_Simulation", "AI_Integration_Workshop",
+    "Entrepreneurship_Workshop"
+]
+
+# Customer fields the recommendations depend on
+RECOMMENDATION_FIELDS = ["product_interested", "product_pitched", "profession"]
+
+
+def normalize_role(role):
+    """Normalize a role or profession for lookups ("Admin Head" -> "admin_head")."""
+    return "_".join(str(role).lower().split())
+
+
+def field_value(value):
+    """A customer field as a string, with empty and NaN values as ""."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value != value:
+        return ""
+    return str(value)
+
+
+def build_product_record(code, details=None):
+    """The recommendation record for a product code."""
+    if details is None:
+        return {
+            "code": code,
+            "name": code,
+            "description": "Custom educational solution",
+            "brochure": "",
+            "video": "",
+            "pricing": "Contact for pricing"
+        }
+    return {
+        "code": code,
+        "name": details["name"],
+        "description": details["description"],
+        "brochure": details["brochure"],
+        "video": details["video"],
+        "pricing": details.get("pricing", "Contact for pricing")
+    }
+
+
+class Recommender:
+    """Recommends products from a product catalog (the EduRishi catalog by default), with precomputed tables."""
+
+    def __init__(self, product_details=None, role_products=None, generic_products=None,
+                 limit=RECOMMENDATION_LIMIT, cache_size=65536, resolve=None):
+        product_details = PRODUCT_CATALOG if product_details is None else product_details
+        self.limit = limit
+        if resolve is None and product_details is not PRODUCT_CATALOG:
+            # Other catalogs are matched on their exact codes
+            resolve = lambda product: product if product in product_details else None
+        self.resolve = resolve or resolve_product_code
+        self.records = {code: build_product_record(code, details) for code, details in product_details.items()}
+        self.role_products = {
+            normalize_role(role): self._resolve_all(products)
+            for role, products in (role_products or ROLE_PRODUCTS).items()
+        }
+        self.generic_products = self._resolve_all(generic_products or GENERIC_PRODUCTS)
+        self._recommend_codes = lru_cache(maxsize=cache_size)(self._compute_codes)
+
+    def _resolve_all(self, products):
+        """Canonical codes of a product list, keeping unknown products as they are."""
+        codes = []
+        for product in products:
+            code = self.resolve(product) or product
+            if code not in codes:
+                codes.append(code)
+        return tuple(codes)
+
+    def _compute_codes(self, product_interested, product_pitched, profession):
+        recommendations = []
+        seen = set()
+
+        def add(products):
+            for product in products:
+                if len(recommendations) >= self.limit:
+                    return
+                if product is None or product in seen:
+                    continue
+                recommendations.append(product)
+                seen.add(product)
+
+        # Products the customer is interested in come first, then pitched products
+        add(self.resolve(product.strip()) for product in product_interested.split(","))
+        if len(recommendations) < self.limit:
+            add(self.resolve(product.strip()) for product in product_pitched.split(","))
+
+        # Then products for the customer's role, then generic products
+        if len(recommendations) < self.limit:
+            add(self.role_products.get(normalize_role(profession), ()))
+        if len(recommendations) < self.limit:
+            add(self.generic_products)
+
+        return tuple(recommendations)
+
+    def recommend_codes(self, customer_data):
+        """Recommended product codes for a customer."""
+        return self._recommend_codes(*(field_value(customer_data.get(field)) for field in RECOMMENDATION_FIELDS))
+
+    def product_record(self, code):
+        """The (shared) recommendation record for a product code."""
+        record = self.records.get(code)
+        return record if record is not None else build_product_record(code)
+
+    def recommend(self, customer_data):
+        """Recommended products for a customer, as records the caller may modify."""
+        return [dict(self.product_record(code)) for code in self.recommend_codes(customer_data)]
+
+    def recommend_batch(self, customers):
+        """Recommended products for every row of a DataFrame.
+
+        Returns a Series aligned with the DataFrame's index. Rows with the same product
+        interest, pitched products and profession share one list of records, so treat the
+        records as read-only.
+        """
+        # Number the distinct (interest, pitched, profession) combinations, one field at a time
+        codes = np.zeros(len(customers), dtype=np.int64)
+        columns = []
+        for field in RECOMMENDATION_FIELDS:
+            if field in customers.columns:
+                column = customers[field]
+                column = column.astype(object).where(column.notna(), "").astype(str)
+            else:
+                column = pd.Series("", index=customers.index, dtype=object)
+            field_codes, uniques = pd.factorize(column)
+            codes, _ = pd.factorize(codes * len(uniques) + field_codes)
+            columns.append(column.to_numpy())
+
+        # Recommend once per combination, from its first row
+        _, first_rows = np.unique(codes, return_index=True)
+        products = np.empty(len(first_rows), dtype=object)
+        for combination, row in enumerate(first_rows):
+            key = tuple(column[row] for column in columns)
+            products[combination] = [self.product_record(code) for code in self._recommend_codes(*key)]
+
+        return pd.Series(products[codes], index=customers.index, dtype=object)
+
+    def cache_info(self):
+        """Hit and miss counts of the recommendation memo."""
+        return self._recommend_codes.cache_info()
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    # 100k customers with interests spelled the ways they arrive in imports, against the
+    # EduRishi catalog (the comparison with the old code is in benchmark_suite.py)
+    rng = random.Random(42)
+    spellings = list(PRODUCT_CATALOG) + ["ai tutor", "AI_Tutor", "Simulations", "Entrepreneurship Workshop",
+                                         "learning management system", "Unknown product"]
+    roles = list(ROLE_PRODUCTS) + ["principal", "IT director", "Parent", "Student"]
+    rows = 100000
+    customers = pd.DataFrame({
+        "name": [f"School {i}" for i in range(rows)],
+        "product_interested": [", ".join(rng.sample(spellings, rng.randint(0, 2))) for _ in range(rows)],
+        "product_pitched": [", ".join(rng.sample(spellings, rng.randint(0, 2))) for _ in range(rows)],
+        "profession": [rng.choice(roles) for _ in range(rows)]
+    })
+    records = customers.to_dict("records")
+
+    recommender = Recommender()
+    start = time.perf_counter()
+    single = [recommender.recommend(customer) for customer in records]
+    single_time = time.perf_counter() - start
+
+    recommender = Recommender()
+    start = time.perf_counter()
+    batch = recommender.recommend_batch(customers)
+    batch_time = time.perf_counter() - start
+
+    assert single == batch.tolist()
+    print(f"{rows} customers, {recommender.cache_info().currsize} distinct combinations")
+    print(f"Per customer: {single_time:.2f}s")
+    print(f"Batch:        {batch_time:.2f}s ({single_time / batch_time:.1f}x)")
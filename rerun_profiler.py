@@ -0,0 +1,228 @@
+"""
+Rerun Profiler Module
+
+This module times Streamlit reruns. A rerun is wrapped with RerunProfiler.rerun() and the
+parts of the script (the sidebar, each tab) with RerunProfiler.section(); sections can be
+nested and are named by their path ("Leads & Deals / Leads"). Outside a profiled rerun a
+section costs one attribute check, so the sections can stay in the script.
+
+The timings of recent reruns are kept for a per-section table (last, mean and worst
+time and share of the rerun). A rerun can also be captured with cProfile, or with
+pyinstrument when it is installed, and the capture of the last rerun downloaded.
+
+Profiling is opt-in: set EDURISHI_PROFILE (1, timers, cprofile or pyinstrument) or turn
+it on in the app's sidebar.
+"""
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+# Environment variable that turns profiling on for every session
+PROFILE_ENV_VAR = "EDURISHI_PROFILE"
+
+# Profiling modes: timers only, or timers plus a profile capture
+PROFILE_MODES = ["timers", "cprofile", "pyinstrument"]
+
+# Number of reruns kept for the timing table
+DEFAULT_HISTORY = 50
+
+# Functions listed in the text summary of a cProfile capture
+STATS_LINES = 30
+
+# Name of the row timing the whole rerun
+TOTAL_SECTION = "Total"
+
+
+def available_modes():
+    """Profiling modes that can run here (pyinstrument is optional)."""
+    return [mode for mode in PROFILE_MODES if mode != "pyinstrument" or pyinstrument is not None]
+
+
+def mode_from_env(environ=None):
+    """Profiling mode requested through EDURISHI_PROFILE, or None."""
+    value = (environ if environ is not None else os.environ).get(PROFILE_ENV_VAR, "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    if value in PROFILE_MODES:
+        return value
+    return "timers"
+
+
+class RerunProfiler:
+    """Section timings of recent reruns and the profile capture of the last one."""
+
+    def __init__(self, history=DEFAULT_HISTORY):
+        self.reruns = deque(maxlen=history)
+        self.last_capture = None
+        self._sections = None
+        self._path = []
+
+    @contextmanager
+    def rerun(self, mode="timers"):
+        """Profile one rerun, recording it even when the script stops early (st.rerun, st.stop)."""
+        if mode == "pyinstrument" and pyinstrument is None:
+            mode = "cprofile"
+
+        self._sections = {}
+        self._path = []
+        profiler = None
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        elif mode == "pyinstrument":
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+
+        started = time.perf_counter()
+        completed = False
+        try:
+            yield self
+            completed = True
+        finally:
+            total = time.perf_counter() - started
+            if mode == "cprofile":
+                profiler.disable()
+            elif mode == "pyinstrument":
+                profiler.stop()
+
+            sections = self._sections
+            self._sections = None
+            self.reruns.append({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "mode": mode,
+                "completed": completed,
+                "total": total,
+                "sections": sections
+            })
+            if profiler is not None:
+                self.last_capture = self._capture(mode, profiler)
+
+    def section(self, name):
+        """Context manager timing a part of the rerun; a no-op when no rerun is profiled."""
+        if self._sections is None:
+            return nullcontext()
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        self._path.append(name)
+        path = " / ".join(self._path)
+        # Registered on entry so parents are listed before their nested sections
+        self._sections.setdefault(path, 0.0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._path.pop()
+            if self._sections is not None:
+                # A section entered more than once in a rerun adds up
+                self._sections[path] = self._sections.get(path, 0.0) + elapsed
+
+    def _capture(self, mode, profiler):
+        """Downloadable profile and text summary of a finished capture."""
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if mode == "pyinstrument":
+            return {
+                "mode": mode,
+                "data": profiler.output_html().encode("utf-8"),
+                "file_name": f"rerun_profile_{stamp}.html",
+                "mime": "text/html",
+                "text": profiler.output_text(unicode=True)
+            }
+
+        # The .prof file is the marshalled stats, the same as pstats.Stats.dump_stats() writes
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        data = marshal.dumps(stats.stats)
+        stats.sort_stats("cumulative").print_stats(STATS_LINES)
+        return {
+            "mode": mode,
+            "data": data,
+            "file_name": f"rerun_profile_{stamp}.prof",
+            "mime": "application/octet-stream",
+            "text": stats.stream.getvalue()
+        }
+
+    def timing_table(self):
+        """Per-section timings over the recorded reruns, in the order of the last rerun.
+
+        Each row has the section, its time in the last rerun, its mean and worst time
+        over the reruns that ran it (seconds), its share of the last rerun and the number
+        of reruns that ran it.
+        """
+        if not self.reruns:
+            return []
+
+        last = self.reruns[-1]
+        names = [TOTAL_SECTION] + list(last["sections"])
+        for rerun in self.reruns:
+            for name in rerun["sections"]:
+                if name not in names:
+                    names.append(name)
+
+        rows = []
+        for name in names:
+            if name == TOTAL_SECTION:
+                times = [rerun["total"] for rerun in self.reruns]
+                last_time = last["total"]
+            else:
+                times = [rerun["sections"][name] for rerun in self.reruns if name in rerun["sections"]]
+                last_time = last["sections"].get(name)
+            rows.append({
+                "section": name,
+                "last": last_time,
+                "mean": sum(times) / len(times),
+                "max": max(times),
+                "share": last_time / last["total"] if last_time is not None and last["total"] else None,
+                "reruns": len(times)
+            })
+        return rows
+
+    def clear(self):
+        """Drop the recorded reruns and the last capture."""
+        self.reruns.clear()
+        self.last_capture = None
+
+
+if __name__ == "__main__":
+    # Profile a few simulated reruns and print the timing table
+    def render_tab(seconds, work=20000):
+        time.sleep(seconds)
+        return sum(i * i for i in range(work))
+
+    profiler = RerunProfiler()
+    for mode in ["timers", "timers", "cprofile"]:
+        with profiler.rerun(mode):
+            with profiler.section("Sidebar"):
+                render_tab(0.005)
+            with profiler.section("CRM Dashboard"):
+                render_tab(0.02, work=200000)
+            with profiler.section("Leads & Deals"):
+                with profiler.section("Leads"):
+                    render_tab(0.01)
+                with profiler.section("Deals"):
+                    render_tab(0.002)
+
+    print(f"{'section':<30}{'last':>10}{'mean':>10}{'max':>10}{'share':>8}")
+    for row in profiler.timing_table():
+        print(f"{row['section']:<30}{row['last']:>10.4f}{row['mean']:>10.4f}{row['max']:>10.4f}{row['share']:>8.0%}")
+    print(profiler.last_capture["text"].strip().splitlines()[0])
+
+    # Cost of a section when no rerun is profiled
+    start = time.perf_counter()
+    for _ in range(100000):
+        with profiler.section("Sidebar"):
+            pass
+    print(f"Inactive section: {(time.perf_counter() - start) * 10:.3f} µs")
@@ -0,0 +1,200 @@
+"""
+Response Cache Module
+
+This module keeps generated sales responses so a near-identical enquiry from another
+customer can reuse one as a draft. Enquiries are embedded locally with hashed word and
+bigram features (numbers are folded into one token, so "ELAP for 500 students" matches
+"ELAP for 800 students"), and a previous response is only offered when it was written
+for the same product set and the same role and its enquiry is similar enough.
+
+The cache tracks its hit rate and how much generation time the drafts saved.
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Defaults for the cache
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_DIMENSIONS = 2048
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_MAX_GROUPS = 500
+
+# Words that carry no meaning for matching enquiries
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "for", "to", "in", "on", "at", "by", "with", "is", "are",
+    "be", "we", "our", "us", "i", "me", "my", "you", "your", "it", "this", "that", "can", "could",
+    "would", "please", "kindly", "hi", "hello", "dear", "sir", "madam", "regarding", "about"
+}
+
+WORD_PATTERN = re.compile(r"[a-z]+|\d+(?:[.,]\d+)*")
+
+
+def enquiry_features(text):
+    """Words and bigrams of an enquiry, with numbers folded into a single token."""
+    words = [
+        "<num>" if word[0].isdigit() else word
+        for word in WORD_PATTERN.findall(str(text).lower())
+        if word not in STOPWORDS
+    ]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def embed_enquiry(text, dimensions=DEFAULT_DIMENSIONS):
+    """Unit-length hashed feature vector of an enquiry."""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature in enquiry_features(text):
+        digest = zlib.crc32(feature.encode("utf-8"))
+        # The top bit picks the sign so hash collisions tend to cancel out
+        vector[digest % dimensions] += 1.0 if digest & 0x80000000 else -1.0
+
+    # Sublinear term frequency, then normalize so a dot product is the cosine similarity
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def cache_group_key(product_interested, profession):
+    """Key of the group of cached responses: the product set and the role."""
+    if isinstance(product_interested, (list, tuple, set)):
+        products = product_interested
+    else:
+        products = str(product_interested or "").split(",")
+    product_set = ",".join(sorted({str(product).strip().upper() for product in products if str(product).strip()}))
+    role = " ".join(str(profession or "").lower().split())
+    if role in ("nan", "none"):
+        role = ""
+    if product_set == "NAN":
+        product_set = ""
+    return product_set, role
+
+
+class _ResponseGroup:
+    """Cached responses for one product set and role, with their stacked vectors."""
+
+    def __init__(self, dimensions):
+        self.entries = []
+        self.matrix = np.zeros((0, dimensions), dtype=np.float32)
+
+
+class SemanticResponseCache:
+    """Near-duplicate cache of generated responses, grouped by product set and role."""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, dimensions=DEFAULT_DIMENSIONS,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_groups=DEFAULT_MAX_GROUPS):
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self.max_groups = max_groups
+
+        self._groups = OrderedDict()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.saved_latency = 0.0
+
+    def lookup(self, enquiry, product_interested, profession, threshold=None):
+        """Most similar cached response for the same products and role, or None.
+
+        A hit is a dict with the cached response, its enquiry, the similarity and the
+        latency of the original generation.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        key = cache_group_key(product_interested, profession)
+        vector = embed_enquiry(enquiry, self.dimensions)
+
+        with self._lock:
+            self.lookups += 1
+            group = self._groups.get(key)
+            if group is None or not group.entries:
+                return None
+            self._groups.move_to_end(key)
+
+            similarities = group.matrix @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < threshold:
+                return None
+
+            self.hits += 1
+            entry = group.entries[best]
+            return dict(entry, similarity=similarity)
+
+    def store(self, enquiry, product_interested, profession, response, latency=0.0):
+        """Cache a freshly generated response."""
+        key = cache_group_key(product_interested, profession)
+        vector = embed_enquiry(enquiry, self.dimensions)
+        entry = {"enquiry": enquiry, "response": response, "latency": latency}
+
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _ResponseGroup(self.dimensions)
+                while len(self._groups) > self.max_groups:
+                    self._groups.popitem(last=False)
+            self._groups.move_to_end(key)
+
+            group.entries.append(entry)
+            group.matrix = np.vstack([group.matrix, vector])
+            if len(group.entries) > self.max_entries:
+                group.entries = group.entries[-self.max_entries:]
+                group.matrix = group.matrix[-self.max_entries:]
+
+    def record_saving(self, hit, latency):
+        """Record the time saved by personalizing a cached draft instead of generating."""
+        saved = max(0.0, hit.get("latency", 0.0) - latency)
+        with self._lock:
+            self.saved_latency += saved
+        return saved
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(group.entries) for group in self._groups.values())
+
+    def stats(self):
+        """Hit rate and saved latency."""
+        with self._lock:
+            return {
+                "entries": sum(len(group.entries) for group in self._groups.values()),
+                "groups": len(self._groups),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "saved_latency": self.saved_latency
+            }
+
+
+if __name__ == "__main__":
+    import time
+
+    cache = SemanticResponseCache()
+    cache.store("What is the pricing for ELAP for 500 students?", "ELAP, MDL", "Principal",
+                "Dear Principal, ELAP costs ₹800 per student...", latency=4.2)
+    cache.store("Can you schedule a demo of MDL next week?", "ELAP, MDL", "Principal",
+                "Dear Principal, we would be glad to arrange a demo...", latency=3.8)
+
+    enquiries = [
+        ("Pricing for ELAP for 800 students please", "MDL, ELAP", "principal"),
+        ("Could you schedule an MDL demo next week?", "ELAP,MDL", "Principal"),
+        ("Do you offer teacher training?", "ELAP, MDL", "Principal"),
+        ("What is the pricing for ELAP for 500 students?", "ELAP", "Principal"),
+    ]
+    for enquiry, products, role in enquiries:
+        hit = cache.lookup(enquiry, products, role)
+        if hit:
+            cache.record_saving(hit, latency=1.5)
+            print(f"HIT  {hit['similarity']:.2f}  {enquiry!r} -> {hit['enquiry']!r}")
+        else:
+            print(f"MISS       {enquiry!r}")
+    print(cache.stats())
+
+    # Lookup cost with a full group
+    for i in range(cache.max_entries):
+        cache.store(f"Enquiry number {i} about ELAP workshops and teacher sessions {i * 7}", "ELAP", "Teacher", "...")
+    start = time.perf_counter()
+    for _ in range(1000):
+        cache.lookup("Enquiry about ELAP workshops for teachers", "ELAP", "Teacher")
+    print(f"Lookup cost: {(time.perf_counter() - start):.3f} ms per lookup with {cache.max_entries} entries")
@@ -0,0 +1,130 @@
+"""
+View Cache Module
+
+This module memoizes the DataFrames and figures the dashboards derive from the CRM data.
+Each session has a data version that is bumped whenever its leads, deals, tasks, meetings
+or activity log change. A cached view is reused for as long as the version it was built
+from is current, so reruns that change nothing (switching tabs, typing in a form) skip
+rebuilding the dashboards.
+
+Unlike st.cache_data, the cache is kept per session and the data is never hashed: only
+the version and the (small, hashable) arguments of a view make up its key. Cached views
+are shared between reruns, so callers must not modify them.
+"""
+
+import functools
+import threading
+
+import streamlit as st
+
+# Session state keys of the data version and the cache
+DATA_VERSION_KEY = "data_version"
+VIEW_CACHE_KEY = "view_cache"
+
+
+def data_version():
+    """Current version of the session's CRM data."""
+    return st.session_state.get(DATA_VERSION_KEY, 0)
+
+
+def bump_data_version():
+    """Mark the session's CRM data as changed, so cached views are rebuilt."""
+    st.session_state[DATA_VERSION_KEY] = data_version() + 1
+
+
+class ViewCache:
+    """Views built from one version of the data, keyed by view and arguments."""
+
+    def __init__(self):
+        self.version = None
+        self.views = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build):
+        """The cached view for key at this version, building it on a miss.
+
+        Views of older versions are dropped as soon as a newer version is asked for.
+        """
+        with self._lock:
+            if version != self.version:
+                self.views.clear()
+                self.version = version
+            if key in self.views:
+                self.hits += 1
+                return self.views[key]
+            self.misses += 1
+
+        view = build()
+        with self._lock:
+            if version == self.version:
+                self.views[key] = view
+        return view
+
+    def stats(self):
+        """Hit and miss counts."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "views": len(self.views),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+def get_view_cache():
+    """The session's view cache."""
+    cache = st.session_state.get(VIEW_CACHE_KEY)
+    if cache is None:
+        cache = st.session_state[VIEW_CACHE_KEY] = ViewCache()
+    return cache
+
+
+def cached_view(function):
+    """Decorator memoizing a view builder on the data version and its arguments."""
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        return get_view_cache().get(data_version(), key, lambda: function(*args, **kwargs))
+
+    return wrapper
+
+
+if __name__ == "__main__":
+    import time
+
+    import pandas as pd
+
+    # Session state works in-process outside `streamlit run`, with a warning on every access
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+
+    # Rebuild a view over 100k leads on every call, or once per data version
+    st.session_state.leads = [{"city": f"City {i % 500}", "amount": i} for i in range(100000)]
+
+    def city_totals():
+        return pd.DataFrame(st.session_state.leads).groupby("city")["amount"].sum().nlargest(10)
+
+    cached_city_totals = cached_view(city_totals)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        city_totals()
+    uncached_time = (time.perf_counter() - start) / 20
+
+    cached_city_totals()
+    start = time.perf_counter()
+    for _ in range(20):
+        cached_city_totals()
+    cached_time = (time.perf_counter() - start) / 20
+
+    st.session_state.leads.append({"city": "City 0", "amount": 10 ** 9})
+    bump_data_version()
+    assert cached_city_totals().index[0] == "City 0"
+
+    print(f"Uncached view: {uncached_time * 1000:.2f} ms per rerun")
+    print(f"Cached view:   {cached_time * 1000:.3f} ms per rerun ({get_view_cache().stats()})")